@@ -11,6 +11,8 @@ import pandas as pd
 import numpy as np
 from collections import defaultdict
 
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miercoles', 'Jueves', 'Viernes']
+
 class AnalizadorMovimientos:
     """Analiza movimientos y optimización de profesores"""
     
@@ -23,6 +25,18 @@ class AnalizadorMovimientos:
         self.planta_alta = {'FF8', 'FF9', 'FFA', 'FFB', 'FFC', 'FFD'}
         self.labs_p1 = {'LR', 'LSO', 'LIA', 'LCG1', 'LCG2'}
         self.labs_p2 = {'LBD', 'LCA', 'LBD2', 'LCG3'}
+        
+        # Versión entera de la matriz para el análisis vectorizado:
+        # un ID por salón conocido y un último ID compartido por cualquier otro salón
+        self.salones_conocidos = sorted({s for par in self.distancias for s in par})
+        self.id_salon = {s: i for i, s in enumerate(self.salones_conocidos)}
+        desconocido = len(self.salones_conocidos)
+        self.matriz_distancias = np.full((desconocido + 1, desconocido + 1), 15, dtype=np.int64)
+        for i, s1 in enumerate(self.salones_conocidos):
+            for j, s2 in enumerate(self.salones_conocidos):
+                self.matriz_distancias[i, j] = self.obtener_distancia(s1, s2)
+        pisos = [self.obtener_piso(s) for s in self.salones_conocidos] + ['Inválido']
+        self.piso_salon = pd.factorize(pd.Series(pisos))[0]
     
     def _inicializar_distancias(self):
         """
@@ -87,6 +101,19 @@ class AnalizadorMovimientos:
         # Si no está en la matriz, asumir distancia grande (salones inválidos)
         return 15
     
+    def costo_par(self, salon_anterior, salon_actual):
+        """
+        Costo de pasar de un salón a otro entre clases consecutivas
+        
+        Returns:
+            tuple: (movimiento 0/1, cambio de piso 0/1, distancia)
+        """
+        if salon_anterior == salon_actual:
+            return 0, 0, 0
+        a = self.id_salon.get(salon_anterior, len(self.salones_conocidos))
+        b = self.id_salon.get(salon_actual, len(self.salones_conocidos))
+        return 1, int(self.piso_salon[a] != self.piso_salon[b]), int(self.matriz_distancias[a, b])
+    
     def obtener_piso(self, salon):
         """Obtiene el piso de un salón"""
         if salon in self.planta_baja:
@@ -100,6 +127,69 @@ class AnalizadorMovimientos:
         else:
             return 'Inválido'
     
+    def _metricas_por_profesor(self, df, codigos: np.ndarray, n_profesores: int) -> list:
+        """
+        Métricas de movimientos de todos los profesores en una sola pasada
+        
+        Ordena una vez por (profesor, día, bloque) y compara cada clase con la
+        anterior: mismo profesor y día + salón distinto = movimiento; la
+        distancia sale de `matriz_distancias` y el cambio de piso de `piso_salon`.
+        
+        Args:
+            df: DataFrame con columnas Profesor, Dia, Bloque_Horario, Salon
+            codigos: Código de profesor por fila (0..n_profesores-1)
+            n_profesores: Número de profesores
+        
+        Returns:
+            list: Métricas (mismo formato que analizar_profesor) por código de profesor
+        """
+        dias = DIAS_SEMANA
+        salon = df['Salon'].to_numpy(dtype=object)
+        id_salon = df['Salon'].map(self.id_salon).fillna(len(self.salones_conocidos)).to_numpy(dtype=np.intp)
+        dia = df['Dia'].map({d: i for i, d in enumerate(dias)}).fillna(-1).to_numpy(dtype=np.intp)
+        bloque = df['Bloque_Horario'].to_numpy()
+        
+        # Solo días hábiles, ordenados (estable) por profesor, día y bloque
+        orden = np.lexsort((bloque, dia, codigos))
+        orden = orden[dia[orden] >= 0]
+        prof, dia, salon, id_salon = codigos[orden], dia[orden], salon[orden], id_salon[orden]
+        
+        # Pares de clases consecutivas del mismo profesor en el mismo día
+        mismo_dia = (prof[1:] == prof[:-1]) & (dia[1:] == dia[:-1])
+        movimiento = mismo_dia & (salon[1:] != salon[:-1])
+        distancia = np.where(movimiento, self.matriz_distancias[id_salon[:-1], id_salon[1:]], 0)
+        piso = self.piso_salon[id_salon]
+        cambio_piso = movimiento & (piso[1:] != piso[:-1])
+        
+        prof_par = prof[1:]
+        movimientos = np.bincount(prof_par, weights=movimiento, minlength=n_profesores).astype(np.int64)
+        cambios_piso = np.bincount(prof_par, weights=cambio_piso, minlength=n_profesores).astype(np.int64)
+        distancias = np.bincount(prof_par, weights=distancia, minlength=n_profesores).astype(np.int64)
+        por_dia = np.bincount(prof_par * len(dias) + dia[1:], weights=movimiento,
+                              minlength=n_profesores * len(dias)).astype(np.int64).reshape(n_profesores, len(dias))
+        total_clases = np.bincount(codigos, minlength=n_profesores)
+        
+        por_salon = df['Salon'].groupby(codigos, sort=True)
+        salones_usados = por_salon.unique()
+        salones_diferentes = por_salon.nunique()
+        
+        resultados = []
+        for k in range(n_profesores):
+            movimientos_por_dia = defaultdict(int)
+            for d, n in zip(dias, por_dia[k]):
+                if n:
+                    movimientos_por_dia[d] = int(n)
+            resultados.append({
+                'total_clases': int(total_clases[k]),
+                'salones_diferentes': int(salones_diferentes.get(k, 0)),
+                'movimientos': int(movimientos[k]),
+                'cambios_piso': int(cambios_piso[k]),
+                'distancia_total': int(distancias[k]),
+                'movimientos_por_dia': movimientos_por_dia,
+                'salones_usados': list(salones_usados.get(k, []))
+            })
+        return resultados
+    
     def analizar_profesor(self, df_profesor):
         """
         Analiza movimientos de un profesor
@@ -110,51 +200,7 @@ class AnalizadorMovimientos:
         Returns:
             dict: Métricas del profesor
         """
-        # Ordenar por día y hora
-        df_sorted = df_profesor.sort_values(['Dia', 'Bloque_Horario'])
-        
-        metricas = {
-            'total_clases': len(df_profesor),
-            'salones_diferentes': df_profesor['Salon'].nunique(),
-            'movimientos': 0,
-            'cambios_piso': 0,
-            'distancia_total': 0,
-            'movimientos_por_dia': defaultdict(int),
-            'salones_usados': list(df_profesor['Salon'].unique())
-        }
-        
-        # Analizar por día
-        for dia in ['Lunes', 'Martes', 'Miercoles', 'Jueves', 'Viernes']:
-            clases_dia = df_sorted[df_sorted['Dia'] == dia].sort_values('Bloque_Horario')
-            
-            if len(clases_dia) <= 1:
-                continue
-            
-            salon_anterior = None
-            piso_anterior = None
-            
-            for idx, row in clases_dia.iterrows():
-                salon_actual = row['Salon']
-                piso_actual = self.obtener_piso(salon_actual)
-                
-                if salon_anterior is not None:
-                    # Contar movimiento
-                    if salon_actual != salon_anterior:
-                        metricas['movimientos'] += 1
-                        metricas['movimientos_por_dia'][dia] += 1
-                        
-                        # Calcular distancia
-                        distancia = self.obtener_distancia(salon_anterior, salon_actual)
-                        metricas['distancia_total'] += distancia
-                        
-                        # Contar cambio de piso
-                        if piso_actual != piso_anterior:
-                            metricas['cambios_piso'] += 1
-                
-                salon_anterior = salon_actual
-                piso_anterior = piso_actual
-        
-        return metricas
+        return self._metricas_por_profesor(df_profesor, np.zeros(len(df_profesor), dtype=np.intp), 1)[0]
     
     def analizar_todos_profesores(self, df):
         """
@@ -166,7 +212,8 @@ class AnalizadorMovimientos:
         Returns:
             dict: Métricas agregadas y por profesor
         """
-        profesores = df['Profesor'].unique()
+        codigos, profesores = pd.factorize(df['Profesor'].astype(str))
+        metricas_profesores = self._metricas_por_profesor(df, codigos.astype(np.intp), len(profesores))
         
         resultados = {
             'por_profesor': {},
@@ -184,13 +231,10 @@ class AnalizadorMovimientos:
         
         movimientos_lista = []
         
-        for profesor in profesores:
+        for profesor, metricas in zip(profesores, metricas_profesores):
             if 'SIN' in profesor or 'PROFESOR' not in profesor:
                 continue
             
-            df_prof = df[df['Profesor'] == profesor]
-            metricas = self.analizar_profesor(df_prof)
-            
             resultados['por_profesor'][profesor] = metricas
             
             # Agregar a totales
@@ -284,6 +328,117 @@ class AnalizadorMovimientos:
         
         print("\n" + "="*80 + "\n")
 
+class SeguimientoMovimientos:
+    """
+    Métricas de movimientos mantenidas de forma incremental
+    
+    Carga el horario una vez, guarda por (profesor, día) la secuencia de
+    clases ordenada por bloque y actualiza movimientos, cambios de piso y
+    distancia cuando una sola clase cambia de salón, tocando solo sus dos
+    vecinos en el día. Usa el mismo modelo de distancias/pisos y el mismo
+    filtro de profesores que AnalizadorMovimientos.analizar_todos_profesores.
+    """
+    
+    def __init__(self, df, analizador: AnalizadorMovimientos = None):
+        """
+        Args:
+            df: DataFrame con columnas Profesor, Dia, Bloque_Horario, Salon
+            analizador: Analizador con el modelo de distancias (se crea si no se da)
+        """
+        self.analizador = analizador if analizador is not None else AnalizadorMovimientos()
+        self.indices = df.index.tolist()
+        self.posicion = {idx: i for i, idx in enumerate(self.indices)}
+        self.salon = df['Salon'].tolist()
+        
+        codigos, profesores = pd.factorize(df['Profesor'].astype(str))
+        self.profesores = list(profesores)
+        self.profesor = codigos
+        self.cuenta = np.array([not ('SIN' in p or 'PROFESOR' not in p) for p in self.profesores], dtype=bool)
+        
+        # Secuencias por (profesor, día) en el mismo orden que el análisis completo
+        dia = df['Dia'].map({d: i for i, d in enumerate(DIAS_SEMANA)}).fillna(-1).to_numpy(dtype=np.intp)
+        orden = np.lexsort((df['Bloque_Horario'].to_numpy(), dia, codigos))
+        self.secuencias = {}
+        self.lugar = {}  # posición -> (clave de secuencia, índice dentro de ella)
+        for pos in orden:
+            if dia[pos] < 0:
+                continue
+            secuencia = self.secuencias.setdefault((codigos[pos], dia[pos]), [])
+            self.lugar[pos] = ((codigos[pos], dia[pos]), len(secuencia))
+            secuencia.append(pos)
+        
+        # Métricas por profesor
+        n = len(self.profesores)
+        self.movimientos = np.zeros(n, dtype=np.int64)
+        self.cambios_piso = np.zeros(n, dtype=np.int64)
+        self.distancia = np.zeros(n, dtype=np.int64)
+        for (k, _), secuencia in self.secuencias.items():
+            for a, b in zip(secuencia[:-1], secuencia[1:]):
+                mov, piso, dist = self.analizador.costo_par(self.salon[a], self.salon[b])
+                self.movimientos[k] += mov
+                self.cambios_piso[k] += piso
+                self.distancia[k] += dist
+    
+    def _costo_local(self, pos: int, salon) -> tuple:
+        """Costo de los pares (anterior, pos) y (pos, siguiente) si pos estuviera en `salon`"""
+        if pos not in self.lugar:
+            return 0, 0, 0
+        clave, j = self.lugar[pos]
+        secuencia = self.secuencias[clave]
+        vecinos = []
+        if j > 0:
+            vecinos.append((self.salon[secuencia[j - 1]], salon))
+        if j + 1 < len(secuencia):
+            vecinos.append((salon, self.salon[secuencia[j + 1]]))
+        total = [0, 0, 0]
+        for a, b in vecinos:
+            for i, valor in enumerate(self.analizador.costo_par(a, b)):
+                total[i] += valor
+        return tuple(total)
+    
+    def _diferencia(self, pos: int, salon_nuevo) -> np.ndarray:
+        """(movimientos, cambios de piso, distancia) después - antes de mover pos a salon_nuevo"""
+        antes = self._costo_local(pos, self.salon[pos])
+        despues = self._costo_local(pos, salon_nuevo)
+        return np.subtract(despues, antes)
+    
+    def delta_cambio(self, idx, salon_nuevo) -> dict:
+        """
+        Cambio en los totales si la clase `idx` pasara a `salon_nuevo` (sin aplicarlo)
+        
+        Returns:
+            dict: {'movimientos', 'cambios_piso', 'distancia'} (diferencias)
+        """
+        pos = self.posicion[idx]
+        diferencia = self._diferencia(pos, salon_nuevo) * self.cuenta[self.profesor[pos]]
+        return dict(zip(('movimientos', 'cambios_piso', 'distancia'), diferencia.tolist()))
+    
+    def cambiar_salon(self, idx, salon_nuevo) -> dict:
+        """
+        Cambia el salón de una clase y actualiza las métricas
+        
+        Returns:
+            dict: Diferencias aplicadas a los totales (ver delta_cambio)
+        """
+        delta = self.delta_cambio(idx, salon_nuevo)
+        pos = self.posicion[idx]
+        k = self.profesor[pos]
+        movimientos, cambios_piso, distancia = self._diferencia(pos, salon_nuevo)
+        self.movimientos[k] += movimientos
+        self.cambios_piso[k] += cambios_piso
+        self.distancia[k] += distancia
+        self.salon[pos] = salon_nuevo
+        return delta
+    
+    def totales(self) -> dict:
+        """Totales de los profesores analizados (como 'agregado' de analizar_todos_profesores)"""
+        return {
+            'total_movimientos': int(self.movimientos[self.cuenta].sum()),
+            'total_cambios_piso': int(self.cambios_piso[self.cuenta].sum()),
+            'total_distancia': int(self.distancia[self.cuenta].sum())
+        }
+
+
 def main():
     """Función de prueba"""
     csv_inicial = "/Users/lic.ing.jesusolvera/Documents/PROYECTOS PERSONALES/Sistema-Salones-ISC/datos_estructurados/01_Horario_Inicial.csv"
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Control de ejecución de los optimizadores - Sistema de Salones ISC
+Presupuesto de tiempo (anytime: al agotarse se devuelve la mejor solución
+encontrada), puntos de control periódicos para reanudar corridas largas y
+reporte de progreso (callback con límite de frecuencia).
+"""
+
+import hashlib
+import os
+import pickle
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+import pandas as pd
+
+
+VERSION_PUNTO_CONTROL = 1
+
+
+def huella_horario(df: pd.DataFrame, *extras) -> str:
+    """
+    Huella de contenido de un horario (y de parámetros extra que determinen la corrida)
+
+    Un punto de control solo se reanuda si la huella coincide.
+    """
+    h = hashlib.sha256()
+    h.update(repr([str(c) for c in df.columns]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    h.update(repr(extras).encode())
+    return h.hexdigest()[:32]
+
+
+class ControlEjecucion:
+    """
+    Presupuesto de tiempo y puntos de control de una corrida
+
+    El límite efectivo es el más cercano entre `tiempo_limite_s` (contado
+    desde iniciar()) y `fecha_limite` (time.time() absoluto). Los puntos de
+    control se escriben de forma atómica (archivo temporal + os.replace), así
+    una interrupción nunca deja un archivo a medias.
+
+    El progreso se entrega a `progreso(evento)` a lo más una vez cada
+    `intervalo_progreso_s` (salvo eventos forzados de fin de fase), así el
+    costo de instrumentar queda fuera de los ciclos internos.
+    """
+
+    def __init__(self, tiempo_limite_s: Optional[float] = None, fecha_limite: Optional[float] = None,
+                 punto_control: Optional[str] = None, intervalo_control_s: float = 60.0,
+                 progreso: Optional[Callable[[Dict], None]] = None, intervalo_progreso_s: float = 0.5):
+        """
+        Args:
+            tiempo_limite_s: Presupuesto de tiempo en segundos (None = sin límite)
+            fecha_limite: Instante límite absoluto, como time.time() (None = sin límite)
+            punto_control: Archivo del punto de control (None = no guardar ni reanudar)
+            intervalo_control_s: Segundos mínimos entre dos guardados
+            progreso: Función que recibe cada evento de progreso (None = sin reporte)
+            intervalo_progreso_s: Segundos mínimos entre dos eventos de progreso
+        """
+        self.tiempo_limite_s = tiempo_limite_s
+        self.fecha_limite = fecha_limite
+        self.punto_control = Path(punto_control) if punto_control else None
+        self.intervalo_control_s = intervalo_control_s
+        self.progreso = progreso
+        self.intervalo_progreso_s = intervalo_progreso_s
+        self.iniciar()
+
+    def iniciar(self):
+        """Empieza a contar el presupuesto (al comenzar cada optimización)"""
+        self.inicio = time.time()
+        fin = float('inf')
+        if self.tiempo_limite_s is not None:
+            fin = self.inicio + self.tiempo_limite_s
+        if self.fecha_limite is not None:
+            fin = min(fin, self.fecha_limite)
+        self.fin = fin
+        self._ultimo_guardado = self.inicio
+        self._ultimo_reporte = float('-inf')
+
+    def agotado(self) -> bool:
+        """True si ya se alcanzó el límite de tiempo"""
+        return time.time() >= self.fin
+
+    def restante(self) -> float:
+        """Segundos restantes del presupuesto (inf si no hay límite)"""
+        return max(self.fin - time.time(), 0.0)
+
+    def toca_guardar(self) -> bool:
+        """True si hay punto de control y pasó el intervalo desde el último guardado"""
+        return (self.punto_control is not None
+                and time.time() - self._ultimo_guardado >= self.intervalo_control_s)
+
+    def toca_reportar(self) -> bool:
+        """True si hay callback de progreso y pasó el intervalo desde el último evento"""
+        return (self.progreso is not None
+                and time.time() - self._ultimo_reporte >= self.intervalo_progreso_s)
+
+    def reportar(self, fase: str, iteracion: int, total: Optional[int] = None, **datos):
+        """
+        Entrega un evento de progreso (sin revisar el intervalo: usar toca_reportar)
+
+        Args:
+            fase: Fase del optimizador ('construccion', 'hill_climbing', 'evolucion', ...)
+            iteracion: Iteración/generación/movimiento actual de la fase
+            total: Iteraciones máximas de la fase (None = desconocido)
+            **datos: Mejor energía o fitness, penalizaciones, etc.
+        """
+        if self.progreso is None:
+            return
+        self._ultimo_reporte = time.time()
+        evento = {
+            'fase': fase,
+            'iteracion': int(iteracion),
+            'total': total,
+            'progreso': min(iteracion / total, 1.0) if total else None,
+            'transcurrido_s': round(self._ultimo_reporte - self.inicio, 3),
+        }
+        evento.update(datos)
+        self.progreso(evento)
+
+    def guardar(self, metodo: str, huella: str, estado: Dict):
+        """
+        Escribe el punto de control (no hace nada si no hay archivo configurado)
+
+        Args:
+            metodo: Optimizador que lo escribe (solo ese puede reanudarlo)
+            huella: Huella de la entrada (ver huella_horario)
+            estado: Estado necesario para reanudar (serializable con pickle)
+        """
+        if self.punto_control is None:
+            return
+        self._ultimo_guardado = time.time()
+        datos = {
+            'version': VERSION_PUNTO_CONTROL,
+            'metodo': metodo,
+            'huella': huella,
+            'fecha': self._ultimo_guardado,
+            'estado': estado,
+        }
+        try:
+            self.punto_control.parent.mkdir(parents=True, exist_ok=True)
+            temporal = self.punto_control.with_suffix(f".{os.getpid()}.tmp")
+            with open(temporal, 'wb') as f:
+                pickle.dump(datos, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, self.punto_control)
+        except OSError as e:
+            print(f"⚠️  No se pudo guardar el punto de control: {e}")
+
+    def cargar(self, metodo: str, huella: str) -> Optional[Dict]:
+        """
+        Estado guardado para reanudar, o None si no hay punto de control compatible
+        (otro método, otra entrada, otra versión o archivo dañado)
+        """
+        if self.punto_control is None or not self.punto_control.exists():
+            return None
+        try:
+            with open(self.punto_control, 'rb') as f:
+                datos = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️  Punto de control dañado, se ignora: {e}")
+            return None
+        if (datos.get('version') != VERSION_PUNTO_CONTROL or datos.get('metodo') != metodo
+                or datos.get('huella') != huella):
+            return None
+        return datos['estado']
+
+    def eliminar(self):
+        """Borra el punto de control (la corrida terminó sin interrupción)"""
+        if self.punto_control is not None:
+            self.punto_control.unlink(missing_ok=True)
@@ -1,18 +1,45 @@
 #!/usr/bin/env python3
 """
 Script maestro para ejecutar todos los optimizadores con el nuevo sistema de prioridades
+
+Uso:
+    python3 ejecutar_todos.py                          # greedy, ml y genetico
+    python3 ejecutar_todos.py --metodos greedy sa tabu
 """
 
+import argparse
 import subprocess
 import time
 import pandas as pd
 
+# Métodos disponibles: nombre, comando y CSV de salida
+METODOS = {
+    'greedy': ("Optimizador Greedy + Hill Climbing", ["optimizador_greedy.py"],
+               "datos_estructurados/04_Horario_Optimizado_Greedy.csv"),
+    'ml': ("Optimizador ML", ["optimizador_ml.py"],
+           "datos_estructurados/05_Horario_Optimizado_ML.csv"),
+    'genetico': ("Optimizador Genético", ["optimizador_genetico.py"],
+                 "datos_estructurados/06_Horario_Optimizado_Genetico.csv"),
+    'sa': ("Optimizador Greedy + Recocido Simulado", ["optimizador_busqueda_local.py", "sa"],
+           "datos_estructurados/07_Horario_Optimizado_SA.csv"),
+    'tabu': ("Optimizador Greedy + Búsqueda Tabú", ["optimizador_busqueda_local.py", "tabu"],
+             "datos_estructurados/08_Horario_Optimizado_Tabu.csv"),
+    'multiarranque': ("Multi-arranque Greedy + Hill Climbing", ["optimizador_multiarranque.py"],
+                      "datos_estructurados/09_Horario_Optimizado_MultiArranque.csv"),
+}
+
+parser = argparse.ArgumentParser(description="Ejecuta los optimizadores seleccionados")
+parser.add_argument('--metodos', nargs='+', choices=list(METODOS), default=['greedy', 'ml', 'genetico'],
+                    help="Optimizadores a ejecutar (en orden)")
+args = parser.parse_args()
+
 print("="*80)
 print("🚀 EJECUCIÓN COMPLETA - TODOS LOS OPTIMIZADORES")
 print("="*80)
 print("\nSistema de Prioridades:")
 print("  ✅ PRIORIDAD 1: 100% (pre-asignado)")
 print("  📊 PRIORIDAD 2 y 3: Optimización")
+print(f"\nMétodos: {', '.join(args.metodos)}")
 print("="*80)
 
 # 1. Pre-asignación (ya está hecha, pero la ejecutamos por si acaso)
@@ -20,44 +47,25 @@ print("\n\n📍 PASO 1: Pre-asignación PRIORIDAD 1")
 print("-"*80)
 subprocess.run(["python3", "pre_asignar_p1.py"])
 
-# 2. Greedy
-print("\n\n📍 PASO 2: Optimizador Greedy + Hill Climbing")
-print("-"*80)
-start = time.time()
-subprocess.run(["python3", "optimizador_greedy.py"])
-tiempo_greedy = time.time() - start
-
-# 3. Corrección Greedy
-print("\n\n📍 PASO 3: Corrección Post-Optimización (Greedy)")
-print("-"*80)
-subprocess.run(["python3", "corregir_prioridades.py", "datos_estructurados/04_Horario_Optimizado_Greedy.csv"])
-
-# 4. ML
-print("\n\n📍 PASO 4: Optimizador ML")
-print("-"*80)
-start = time.time()
-subprocess.run(["python3", "optimizador_ml.py"])
-tiempo_ml = time.time() - start
-
-# 5. Corrección ML
-print("\n\n📍 PASO 5: Corrección Post-Optimización (ML)")
-print("-"*80)
-subprocess.run(["python3", "corregir_prioridades.py", "datos_estructurados/05_Horario_Optimizado_ML.csv"])
+# 2. Cada optimizador seguido de su corrección post-optimización
+paso = 2
+tiempos = {}
+for metodo in args.metodos:
+    nombre, comando, salida = METODOS[metodo]
 
-# 6. Genético
-print("\n\n📍 PASO 6: Optimizador Genético")
-print("-"*80)
-start = time.time()
-subprocess.run(["python3", "optimizador_genetico.py"])
-tiempo_genetico = time.time() - start
+    print(f"\n\n📍 PASO {paso}: {nombre}")
+    print("-"*80)
+    start = time.time()
+    subprocess.run(["python3"] + comando)
+    tiempos[metodo] = time.time() - start
 
-# 7. Corrección Genético
-print("\n\n📍 PASO 7: Corrección Post-Optimización (Genético)")
-print("-"*80)
-subprocess.run(["python3", "corregir_prioridades.py", "datos_estructurados/06_Horario_Optimizado_Genetico.csv"])
+    print(f"\n\n📍 PASO {paso + 1}: Corrección Post-Optimización ({metodo})")
+    print("-"*80)
+    subprocess.run(["python3", "corregir_prioridades.py", salida])
+    paso += 2
 
-# 8. Generar comparativas y gráficos
-print("\n\n📍 PASO 8: Generar Comparativas y Gráficos")
+# 3. Generar comparativas y gráficos
+print(f"\n\n📍 PASO {paso}: Generar Comparativas y Gráficos")
 print("-"*80)
 subprocess.run(["python3", "generar_comparativa_completa.py"])
 
@@ -66,15 +74,13 @@ print("\n\n" + "="*80)
 print("✅ EJECUCIÓN COMPLETADA")
 print("="*80)
 print(f"\n⏱️  Tiempos de ejecución:")
-print(f"   Greedy:    {tiempo_greedy:.1f}s")
-print(f"   ML:        {tiempo_ml:.1f}s")
-print(f"   Genético:  {tiempo_genetico:.1f}s")
-print(f"   TOTAL:     {tiempo_greedy + tiempo_ml + tiempo_genetico:.1f}s")
+for metodo, tiempo in tiempos.items():
+    print(f"   {metodo + ':':<15} {tiempo:.1f}s")
+print(f"   {'TOTAL:':<15} {sum(tiempos.values()):.1f}s")
 
 print(f"\n📁 Archivos generados:")
-print(f"   - datos_estructurados/04_Horario_Optimizado_Greedy.csv")
-print(f"   - datos_estructurados/05_Horario_Optimizado_ML.csv")
-print(f"   - datos_estructurados/06_Horario_Optimizado_Genetico.csv")
+for metodo in args.metodos:
+    print(f"   - {METODOS[metodo][2]}")
 
 print("\n🎯 Todos los optimizadores garantizan 100% en PRIORIDAD 1")
 print("="*80)
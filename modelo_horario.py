@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+Modelo Compilado del Horario - Sistema de Salones ISC
+Convierte el DataFrame del horario en arreglos NumPy una sola vez por corrida:
+- IDs enteros para profesor, grupo, materia, día, bloque y salón
+- Tipo requerido (teoría/lab), piso y bandera de 1er semestre precalculados
+- Decodificación única de regreso a DataFrame al final de la optimización
+- Dominios factibles de salón por clase (propagación de restricciones)
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils_restricciones import TablaPreferencias, salon_grupo_primer_semestre
+
+DIAS_SEMANA = ['Lunes', 'Martes', 'Miercoles', 'Jueves', 'Viernes']
+
+# Etiquetas de piso usadas en los CSV de salida de los optimizadores
+LABS_PRIMER_PISO = {'LR', 'LSO', 'LIA', 'LCG1', 'LCG2'}
+FF_PLANTA_BAJA = {'FF1', 'FF2', 'FF3', 'FF4', 'FF5', 'FF6', 'FF7'}
+
+
+def _internar(valores: pd.Series) -> Tuple[np.ndarray, List]:
+    """Asigna un ID entero a cada valor distinto (catálogo ordenado)"""
+    codigos, catalogo = pd.factorize(valores, sort=True)
+    return codigos.astype(np.int32), list(catalogo)
+
+
+class DominiosClases:
+    """
+    Salones factibles de cada clase, calculados una vez antes de buscar
+
+    `mascara[i, s]` indica si el salón s está en el dominio de la clase i;
+    `tabla[i, :tam[i]]` lista esos salones para sortear sin construir listas.
+    """
+
+    def __init__(self, mascara: np.ndarray):
+        self.mascara = mascara
+        self.tam = mascara.sum(axis=1)
+        ancho = max(int(self.tam.max()) if len(self.tam) else 0, 1)
+        self.tabla = np.argsort(~mascara, axis=1, kind='stable')[:, :ancho].astype(np.int16)
+        self.fijas = self.tam == 1
+
+    def salones(self, i: int) -> np.ndarray:
+        """IDs de salón del dominio de la clase i"""
+        return self.tabla[i, :self.tam[i]]
+
+    def contiene(self, posiciones: np.ndarray, salones: np.ndarray) -> np.ndarray:
+        """Si cada salón está en el dominio de su clase"""
+        return self.mascara[posiciones, salones]
+
+    def sortear(self, posiciones: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        """Un salón uniforme del dominio de cada clase indicada"""
+        posiciones = np.asarray(posiciones)
+        tam = self.tam[posiciones]
+        return self.tabla[posiciones, (rng.random(len(posiciones)) * tam).astype(np.intp)]
+
+
+class ModeloHorario:
+    """
+    Horario compilado a arreglos alineados por posición de fila
+
+    Todas las optimizaciones trabajan sobre vectores de salones (IDs enteros,
+    uno por clase); el DataFrame sólo se vuelve a construir en `a_dataframe`.
+    """
+
+    def __init__(self, df: pd.DataFrame, config_materias: Dict, preferencias_profesores: Dict,
+                 laboratorios: Iterable[str], salones_teoria: Iterable[str],
+                 salones_invalidos: Iterable[str], salones_extra: Iterable[str] = (),
+                 tabla_preferencias: Optional[TablaPreferencias] = None):
+        """
+        Args:
+            df: DataFrame con el horario (una fila por clase)
+            config_materias: Configuración de materias
+            preferencias_profesores: Preferencias de profesores
+            laboratorios: Salones considerados laboratorio por el optimizador
+            salones_teoria: Salones considerados de teoría por el optimizador
+            salones_invalidos: Salones no válidos
+            salones_extra: Otros salones que el optimizador puede asignar
+            tabla_preferencias: Preferencias ya compiladas (se compilan si no se dan)
+        """
+        self.origen = df
+        self.config_materias = config_materias
+        self.preferencias_profesores = preferencias_profesores
+        if tabla_preferencias is None:
+            tabla_preferencias = TablaPreferencias(preferencias_profesores)
+        self.tabla_preferencias = tabla_preferencias
+        self.n = len(df)
+        self.indices = df.index.tolist()
+        self.posicion = {idx: i for i, idx in enumerate(self.indices)}
+
+        # IDs internados
+        self.profesor, self.profesores = _internar(df['Profesor'].astype(str))
+        self.grupo, self.grupos = _internar(df['Grupo'].astype(str))
+        self.materia, self.materias = _internar(df['Materia'].astype(str))
+        self.dia, self.dias = _internar(df['Dia'].astype(str))
+        self.bloque, self.bloques = _internar(df['Bloque_Horario'])
+        self.n_bloques = max(len(self.bloques), 1)
+        self.slot = self.dia * self.n_bloques + self.bloque
+        self.n_slots = len(self.dias) * self.n_bloques
+
+        # Tipo requerido (mismo orden que el CSV: primeras N horas teoría, resto lab)
+        self._horas_teoria = np.array([self._horas_teoria_materia(m) for m in self.materias], dtype=np.float64)
+        self.requiere_lab = self.tipos_en_orden(np.arange(self.n), base=np.zeros(self.n, dtype=bool))
+        self.tipo_requerido = np.where(self.requiere_lab, 'Laboratorio', 'Teoría').astype(object)
+
+        # Primer semestre
+        if 'Es_Primer_Semestre' in df.columns:
+            self.es_primer_semestre = (df['Es_Primer_Semestre'] == 1).to_numpy()
+        else:
+            self.es_primer_semestre = (df['Grupo'].astype(str).str[0] == '1').to_numpy()
+
+        # Catálogo de salones
+        self.laboratorios = set(laboratorios)
+        self.salones_teoria = set(salones_teoria)
+        self.salones_invalidos = set(salones_invalidos)
+        salones_pref = set(tabla_preferencias.salones)
+        catalogo = (sorted(self.salones_teoria) + sorted(self.laboratorios) +
+                    sorted(set(salones_extra)) + sorted(self.salones_invalidos) +
+                    sorted(salones_pref) + sorted(df['Salon'].astype(str).unique()))
+        self.salones = list(dict.fromkeys(catalogo))
+        self.n_salones = len(self.salones)
+        self.codigo_salon = {s: i for i, s in enumerate(self.salones)}
+        self.dtype_salon = np.int8 if self.n_salones <= np.iinfo(np.int8).max else np.int16
+
+        self.salon_es_lab = np.array([s in self.laboratorios for s in self.salones])
+        self.salon_es_teoria = np.array([s in self.salones_teoria for s in self.salones])
+        self.salon_es_invalido = np.array([s in self.salones_invalidos for s in self.salones])
+        self.salon_inicial = self.codificar_salones(df['Salon'].astype(str))
+
+        self._preferencias = {}
+        self._pares = {}
+
+    def _horas_teoria_materia(self, materia: str) -> float:
+        """Horas de teoría de la materia (mismo criterio que determinar_tipo_hora)"""
+        if materia not in self.config_materias:
+            return np.inf
+        config = self.config_materias[materia]
+        return config.get('horas_teoria', config.get('total_horas', 0))
+
+    def tipos_en_orden(self, orden: np.ndarray, base: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Indica qué clases requieren laboratorio contando las horas de cada
+        (grupo, materia) en el orden dado
+
+        Args:
+            orden: Posiciones de las clases en el orden en que se cuentan las horas.
+                   Las posiciones no incluidas conservan el tipo de `base`.
+            base: Tipos de partida (None = los del orden del CSV, self.requiere_lab)
+
+        Returns:
+            np.ndarray: Máscara booleana (True = Laboratorio)
+        """
+        orden = np.asarray(orden, dtype=np.intp)
+        requiere_lab = (self.requiere_lab if base is None else base).copy()
+        if len(orden) == 0:
+            return requiere_lab
+
+        # Índice de hora dentro de (grupo, materia) = rango de aparición en `orden`
+        clave = self.grupo[orden].astype(np.int64) * len(self.materias) + self.materia[orden]
+        por_clave = np.argsort(clave, kind='stable')
+        claves = clave[por_clave]
+        inicio = np.r_[True, claves[1:] != claves[:-1]]
+        inicio_grupo = np.maximum.accumulate(np.where(inicio, np.arange(len(claves)), 0))
+        indice_hora = np.empty(len(orden), dtype=np.int64)
+        indice_hora[por_clave] = np.arange(len(claves)) - inicio_grupo
+
+        requiere_lab[orden] = indice_hora >= self._horas_teoria[self.materia[orden]]
+        return requiere_lab
+
+    # ------------------------------------------------------------------
+    # Codificación / decodificación
+    # ------------------------------------------------------------------
+
+    def codificar_salones(self, salones: Iterable[str]) -> np.ndarray:
+        """Convierte nombres de salón a IDs (alineados por posición)"""
+        return np.fromiter((self.codigo_salon[s] for s in salones),
+                           dtype=self.dtype_salon, count=self.n)
+
+    def codificar(self, solucion: Dict) -> np.ndarray:
+        """Convierte una solución {idx: salon} a vector de IDs de salón"""
+        salones = self.salon_inicial.copy()
+        for idx, salon in solucion.items():
+            salones[self.posicion[idx]] = self.codigo_salon[salon]
+        return salones
+
+    def decodificar(self, salones: np.ndarray, orden: Optional[np.ndarray] = None) -> Dict:
+        """
+        Convierte un vector de IDs de salón a solución {idx: salon}
+
+        Args:
+            salones: Vector de IDs de salón
+            orden: Orden de inserción de las posiciones (por defecto el del CSV)
+        """
+        if orden is None:
+            orden = np.arange(self.n)
+        salones = salones.tolist()
+        return {self.indices[pos]: self.salones[salones[pos]] for pos in np.asarray(orden).tolist()}
+
+    def a_dataframe(self, salones: np.ndarray, df_base: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Construye el DataFrame de salida con Salon, Tipo_Salon, Piso y Es_Invalido
+
+        Args:
+            salones: Vector de IDs de salón (uno por fila)
+            df_base: DataFrame con las mismas filas que el modelo (por defecto el original)
+        """
+        df = (self.origen if df_base is None else df_base).copy()
+        nombres = np.array(self.salones, dtype=object)[salones]
+
+        tipos = []
+        pisos = []
+        for salon in self.salones:
+            if salon in self.laboratorios or salon.startswith('L'):
+                tipos.append('Laboratorio')
+                pisos.append('Primer Piso' if salon in LABS_PRIMER_PISO else 'Segundo Piso')
+            elif salon in self.salones_invalidos:
+                tipos.append('INVÁLIDO')
+                pisos.append(None)
+            else:
+                tipos.append('Teoría')
+                pisos.append('Planta Baja' if salon in FF_PLANTA_BAJA else 'Planta Alta')
+        tiene_piso = np.array([p is not None for p in pisos])[salones]
+        pisos = np.array(pisos, dtype=object)[salones]
+        if 'Piso' in df.columns:
+            # Salones inválidos conservan el piso original
+            pisos = np.where(tiene_piso, pisos, df['Piso'].to_numpy(dtype=object))
+
+        df['Salon'] = nombres
+        df['Tipo_Salon'] = np.array(tipos, dtype=object)[salones]
+        df['Piso'] = pisos
+        df['Es_Invalido'] = self.salon_es_invalido[salones].astype(int)
+        return df
+
+    def slot_de(self, dia, bloque) -> int:
+        """ID de (día, bloque), o -1 si no existe en el horario"""
+        try:
+            return self.dias.index(dia) * self.n_bloques + self.bloques.index(bloque)
+        except ValueError:
+            return -1
+
+    # ------------------------------------------------------------------
+    # Tablas derivadas (se calculan una vez y se reutilizan)
+    # ------------------------------------------------------------------
+
+    def preferencias(self, por_materia: bool = False,
+                     requiere_lab: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Preferencia de salón por clase
+
+        Args:
+            por_materia: Si buscar la preferencia por materia (estructura nueva)
+                         o sólo por profesor (como en energía/fitness)
+            requiere_lab: Tipo de cada clase (por defecto el del orden del CSV)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (ID de salón preferido o -1, es prioritaria)
+        """
+        if por_materia not in self._preferencias:
+            # Fila 0: Teoría, fila 1: Laboratorio (IDs del catálogo de este modelo)
+            tabla = self.tabla_preferencias
+            p, m = tabla.ids(self.profesores, self.materias if por_materia else None)
+            p = p[self.profesor]
+            m = m[self.materia] if por_materia else np.zeros(self.n, dtype=np.intp)
+            a_codigo = np.array([self.codigo_salon[s] for s in tabla.salones] + [-1], dtype=np.int16)
+            pref_salon = a_codigo[tabla.salon[p, m, :].T]
+            prioritaria = tabla.prioritaria[p, m, :].T
+            self._preferencias[por_materia] = (pref_salon, prioritaria)
+
+        pref_salon, prioritaria = self._preferencias[por_materia]
+        tipo = (self.requiere_lab if requiere_lab is None else requiere_lab).astype(np.intp)
+        filas = np.arange(self.n)
+        return pref_salon[tipo, filas], prioritaria[tipo, filas]
+
+    def pares_consecutivos(self, por_dia: bool = True,
+                           solo_profesores_validos: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pares (i, j) de clases consecutivas del mismo profesor
+
+        Args:
+            por_dia: Ordenar por bloque dentro de cada día de la semana (como
+                     AnalizadorMovimientos). Si False, orden del CSV sin cortar por día.
+            solo_profesores_validos: Omitir 'SIN PROFESOR' y nombres sin 'PROFESOR'
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: posiciones origen y destino de cada par
+        """
+        key = (por_dia, solo_profesores_validos)
+        if key not in self._pares:
+            posiciones = np.arange(self.n)
+            mascara = np.ones(self.n, dtype=bool)
+            if solo_profesores_validos:
+                validos = np.array(['SIN' not in p and 'PROFESOR' in p for p in self.profesores], dtype=bool)
+                mascara &= validos[self.profesor]
+            if por_dia:
+                dias_validos = np.array([d in DIAS_SEMANA for d in self.dias], dtype=bool)
+                mascara &= dias_validos[self.dia]
+                orden = np.lexsort((posiciones, self.bloque, self.dia, self.profesor))
+            else:
+                orden = np.lexsort((posiciones, self.profesor))
+            orden = orden[mascara[orden]]
+
+            a, b = orden[:-1], orden[1:]
+            mismo = self.profesor[a] == self.profesor[b]
+            if por_dia:
+                mismo &= self.dia[a] == self.dia[b]
+            self._pares[key] = (a[mismo], b[mismo])
+        return self._pares[key]
+
+    def dominios(self, requiere_lab: Optional[np.ndarray] = None, salones: Optional[np.ndarray] = None,
+                 fijas: Optional[np.ndarray] = None,
+                 asignacion_grupos_1er: Optional[Dict] = None) -> DominiosClases:
+        """
+        Dominio factible de salón de cada clase (propagación antes de la búsqueda)
+
+        1. Salones del tipo requerido (teoría/lab), nunca salones inválidos
+        2. Salón fijo, por prioridad: clases `fijas` (su salón actual, si es
+           válido), preferencia prioritaria del profesor, `laboratorio_asignado`
+           de la materia y salón del grupo de 1er semestre (solo teoría)
+        3. Un salón fijo ocupa su celda (slot, salón): se quita del dominio de
+           las demás clases del slot. Si dos fijos chocan gana el de mayor
+           prioridad y el otro conserva su dominio por tipo.
+        4. Se repite 3 con los dominios que quedaron de un solo salón (punto fijo).
+           Un dominio nunca queda vacío: si se vaciaría, se conserva el anterior.
+
+        Args:
+            requiere_lab: Tipo de cada clase (por defecto el del orden del CSV)
+            salones: Vector de salones actual (por defecto el inicial)
+            fijas: Máscara de clases que conservan su salón actual (p. ej. inmutables P1)
+            asignacion_grupos_1er: Contenido de asignacion_grupos_1er_semestre.json
+
+        Returns:
+            DominiosClases
+        """
+        requiere_lab = self.requiere_lab if requiere_lab is None else requiere_lab
+        salones = self.salon_inicial if salones is None else salones
+        R = self.n_salones
+
+        # 1. Dominio por tipo
+        teoria = self.salon_es_teoria & ~self.salon_es_invalido
+        lab = self.salon_es_lab & ~self.salon_es_invalido
+        if not teoria.any():
+            teoria = ~self.salon_es_invalido
+        if not lab.any():
+            lab = ~self.salon_es_invalido
+        mascara = np.where(requiere_lab[:, None], lab[None, :], teoria[None, :])
+
+        # 2. Candidatos a salón fijo (de mayor a menor prioridad)
+        pref_salon, prioritaria = self.preferencias(por_materia=False, requiere_lab=requiere_lab)
+        lab_materia = np.array([self.codigo_salon.get((self.config_materias.get(m) or {}).get('laboratorio_asignado'), -1)
+                                for m in self.materias], dtype=np.int64)[self.materia]
+        salon_grupo = np.array([self.codigo_salon.get(salon_grupo_primer_semestre(g, asignacion_grupos_1er), -1)
+                                for g in self.grupos], dtype=np.int64)[self.grupo]
+        fijas = np.zeros(self.n, dtype=bool) if fijas is None else fijas
+        niveles = [
+            np.where(fijas & ~self.salon_es_invalido[salones], salones, -1),
+            np.where(prioritaria, pref_salon, -1),
+            np.where(requiere_lab, lab_materia, -1),
+            np.where(~requiere_lab & self.es_primer_semestre, salon_grupo, -1),
+        ]
+
+        ocupada = np.zeros(self.n_slots * R, dtype=bool)
+        fijada = np.zeros(self.n, dtype=bool)
+        for salon_fijo in niveles:
+            pos = np.flatnonzero((salon_fijo >= 0) & ~fijada)
+            celda = self.slot[pos].astype(np.int64) * R + salon_fijo[pos]
+            libre = ~ocupada[celda]
+            pos, celda = pos[libre], celda[libre]
+            _, primera = np.unique(celda, return_index=True)  # una clase por celda
+            pos, celda = pos[primera], celda[primera]
+            ocupada[celda] = True
+            fijada[pos] = True
+            mascara[pos] = False
+            mascara[pos, salon_fijo[pos]] = True
+
+        # 3-4. Quitar de cada slot los salones fijos de otras clases (hasta punto fijo)
+        while True:
+            unico = mascara.sum(axis=1) == 1
+            tomados = np.zeros((self.n_slots, R), dtype=np.int32)
+            np.add.at(tomados, (self.slot[unico], mascara[unico].argmax(axis=1)), 1)
+            reducida = mascara & ~(tomados[self.slot] > 0)
+            aplica = ~unico & reducida.any(axis=1) & (reducida != mascara).any(axis=1)
+            if not aplica.any():
+                break
+            mascara[aplica] = reducida[aplica]
+
+        return DominiosClases(mascara)
+
+    def matriz_salones(self, funcion: Callable[[str, str], float], dtype=np.float64) -> np.ndarray:
+        """Construye una matriz salón × salón evaluando `funcion(s1, s2)`"""
+        return np.array([[funcion(s1, s2) for s2 in self.salones] for s1 in self.salones], dtype=dtype)
+
+    def codificar_pisos(self, funcion_piso: Callable[[str], str]) -> np.ndarray:
+        """ID de piso por salón según `funcion_piso`"""
+        codigos, _ = pd.factorize(pd.Series([funcion_piso(s) for s in self.salones]))
+        return codigos.astype(np.int32)
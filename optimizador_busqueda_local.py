@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Recocido Simulado y Búsqueda Tabú - Sistema de Salones ISC
+Reutilizan el modelo del optimizador greedy: misma construcción voraz con
+pre-asignación prioritaria, mismos índices inmutables y misma energía con
+evaluación incremental (delta) de cada movimiento.
+
+Movimientos:
+- Swap: intercambiar los salones de dos clases del mismo tipo
+- Mover: reasignar una clase a otro salón de su tipo
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, List, Tuple, Union
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from analizar_movimientos import AnalizadorMovimientos
+from optimizador_greedy import OptimizadorGreedyHC
+
+
+# Esquemas de enfriamiento: temperatura en función del avance p ∈ [0, 1]
+ESQUEMAS_ENFRIAMIENTO = {
+    'geometrico': lambda p, t0, tf: t0 * (tf / t0) ** p,
+    'lineal': lambda p, t0, tf: t0 + (tf - t0) * p,
+    'coseno': lambda p, t0, tf: tf + 0.5 * (t0 - tf) * (1 + np.cos(np.pi * p)),
+}
+
+
+class _BusquedaLocal(OptimizadorGreedyHC):
+    """Base común: sorteo de movimientos sobre las clases no inmutables"""
+
+    def __init__(self, prob_swap=0.5, semilla=None, verbose=True, **control):
+        """
+        Args:
+            prob_swap: Probabilidad de proponer un swap (si no, un movimiento simple)
+            semilla: Semilla del generador aleatorio (None = no determinista)
+            verbose: Mostrar progreso
+            **control: tiempo_limite_s, fecha_limite, punto_control, intervalo_control_s,
+                       progreso, catalogos (ver OptimizadorGreedyHC)
+        """
+        super().__init__(verbose=verbose, semilla=semilla, **control)
+        self.prob_swap = prob_swap
+        self.rng = np.random.default_rng(semilla)
+    
+    def _estado_aleatorio(self) -> Dict:
+        return dict(super()._estado_aleatorio(), rng=self.rng.bit_generator.state)
+    
+    def _restaurar_aleatorio(self, estado: Dict):
+        super()._restaurar_aleatorio(estado)
+        self.rng.bit_generator.state = estado['rng']
+
+    def _iniciar_busqueda(self, solucion: Dict, df: pd.DataFrame) -> Tuple:
+        """
+        Codifica la solución, fija de entrada las clases prioritarias en su salón
+        (así la búsqueda repara los conflictos que eso cause) y prepara los movimientos
+        
+        Returns:
+            Tuple: (modelo, orden, salones, energía, ocupación)
+        """
+        m, orden, salones, _, _ = self._preparar_busqueda(solucion, df)
+        self._corregir_prioritarias(salones)
+        self._preparar_movimientos()
+        return m, orden, salones, self._energia(salones), self._ocupacion(salones)
+    
+    def _preparar_movimientos(self):
+        """Clases movibles por tipo (tras _preparar_busqueda; los salones salen de los dominios)"""
+        # Ni inmutables (P1), ni fijas en su salón, ni clases prioritarias (ya están en su salón)
+        movibles = self._es_movible.copy()
+        for idx in getattr(self, 'clases_prioritarias_info', {}):
+            movibles[self.modelo.posicion[idx]] = False
+        self._movibles = np.flatnonzero(movibles)
+        self._movibles_tipo = {
+            tipo: np.flatnonzero(movibles & (self._requiere_lab == tipo)) for tipo in (False, True)
+        }
+
+    def _proponer(self, salones: np.ndarray, ocupacion: np.ndarray) -> Tuple[float, List[Tuple[int, int]]]:
+        """
+        Sortea un movimiento y calcula su delta sin aplicarlo
+
+        Returns:
+            Tuple[float, List[Tuple[int, int]]]: (delta de energía, [(clase, salón nuevo)])
+        """
+        rng = self.rng
+        if len(self._movibles) == 0:
+            return 0.0, []
+        i = int(self._movibles[rng.integers(len(self._movibles))])
+        tipo = bool(self._requiere_lab[i])
+
+        if rng.random() < self.prob_swap:
+            pares = self._movibles_tipo[tipo]
+            j = int(pares[rng.integers(len(pares))])
+            if i == j:
+                return 0.0, []
+            # Sin filtro de dominio: una clase que quedó fuera de su tipo por saturación
+            # (salón de teoría con los labs llenos) puede ceder su salón
+            cambios = [(i, int(salones[j])), (j, int(salones[i]))]
+            return self._delta_swap(salones, ocupacion, i, j), cambios
+
+        candidatos = self._dominios.salones(i)
+        salon = int(candidatos[rng.integers(len(candidatos))])
+        return self._delta_mover(salones, ocupacion, i, salon), [(i, salon)]
+
+
+class OptimizadorSA(_BusquedaLocal):
+    TITULO = "🔥 GREEDY + RECOCIDO SIMULADO"
+
+    def __init__(self, max_movimientos=200000, temperatura_inicial=None, temperatura_final=0.5,
+                 enfriamiento: Union[str, Callable] = 'geometrico', prob_swap=0.5,
+                 semilla=None, verbose=True, **control):
+        """
+        Optimizador Greedy + Recocido Simulado
+
+        Args:
+            max_movimientos: Movimientos propuestos en total
+            temperatura_inicial: Temperatura inicial (None = estimada de los deltas iniciales)
+            temperatura_final: Temperatura al final del enfriamiento
+            enfriamiento: 'geometrico', 'lineal', 'coseno' o función (p, t0, tf) -> T
+            prob_swap: Probabilidad de proponer un swap (si no, un movimiento simple)
+            semilla: Semilla del generador aleatorio
+            verbose: Mostrar progreso
+            **control: Presupuesto de tiempo y punto de control (ver OptimizadorGreedyHC)
+        """
+        super().__init__(prob_swap=prob_swap, semilla=semilla, verbose=verbose, **control)
+        self.max_movimientos = max_movimientos
+        self.temperatura_inicial = temperatura_inicial
+        self.temperatura_final = temperatura_final
+        self.enfriamiento = ESQUEMAS_ENFRIAMIENTO[enfriamiento] if isinstance(enfriamiento, str) else enfriamiento
+
+    def _estimar_temperatura(self, salones: np.ndarray, ocupacion: np.ndarray, muestras=500) -> float:
+        """Temperatura que acepta con prob. 1/2 el empeoramiento mediano (sin contar conflictos)"""
+        deltas = [self._proponer(salones, ocupacion)[0] for _ in range(muestras)]
+        empeoran = [d for d in deltas if 0 < d < 5000]
+        if not empeoran:
+            return max(self.temperatura_final, 1.0)
+        return max(float(np.median(empeoran)) / np.log(2), self.temperatura_final)
+
+    def recocido_simulado(self, solucion: Dict, df: pd.DataFrame) -> Dict:
+        """Fase 2: Recocido Simulado (respetando inmutables)"""
+        self._log("\n🔥 Fase 2: Recocido Simulado...")
+
+        m, orden, salones, energia, ocupacion = self._iniciar_busqueda(solucion, df)
+        if len(self._movibles) == 0:
+            self._log("   Sin clases movibles (todas fijas): se conserva la solución inicial")
+            return m.decodificar(salones, orden)
+        mejor_solucion, mejor_energia = salones.copy(), energia
+
+        # Al reanudar se conserva la temperatura inicial de la corrida original
+        t0 = (self._reanudado.get('t0') or self.temperatura_inicial
+              or self._estimar_temperatura(salones, ocupacion))
+        self._extra_control = {'t0': t0}
+        tf = min(self.temperatura_final, t0)
+        self._log(f"   Temperatura: {t0:.1f} → {tf:.2f} ({self.max_movimientos} movimientos)")
+
+        aceptados = 0
+        reporte = max(self.max_movimientos // 10, 1)
+        uniformes = self.rng.random(self.max_movimientos)
+        for k in range(self._iteracion_reanudada, self.max_movimientos):
+            # Reloj y punto de control cada 1024 movimientos
+            if k % 1024 == 0:
+                if self._tiempo_agotado(mejor_solucion, orden, k):
+                    break
+                self._punto_control(mejor_solucion, orden, k)
+                self._reportar('recocido', k, self.max_movimientos, mejor_solucion, mejor_energia,
+                               energia_actual=float(energia))
+            
+            delta, cambios = self._proponer(salones, ocupacion)
+            if not cambios:
+                continue
+
+            if delta > 0:
+                temperatura = self.enfriamiento(k / self.max_movimientos, t0, tf)
+                if uniformes[k] >= np.exp(-delta / temperatura):
+                    continue
+
+            self._aplicar_cambios(salones, ocupacion, cambios)
+            energia += delta
+            aceptados += 1
+            if energia < mejor_energia - 1e-9:
+                mejor_solucion[:] = salones
+                mejor_energia = energia
+
+            if (k + 1) % reporte == 0:
+                self._log(f"   Mov {k+1}: Energía = {energia:.0f} (mejor {mejor_energia:.0f})")
+
+        self._log(f"   Aceptados: {aceptados}/{self.max_movimientos}")
+        self._log(f"   Energía final: {mejor_energia:.0f}")
+        self._reportar('recocido', self.max_movimientos, self.max_movimientos, mejor_solucion, mejor_energia,
+                       forzar=True, energia_actual=float(energia))
+
+        return m.decodificar(mejor_solucion, orden)
+
+    def mejorar(self, solucion: Dict, df: pd.DataFrame) -> Dict:
+        return self.recocido_simulado(solucion, df)
+
+
+class OptimizadorTabu(_BusquedaLocal):
+    TITULO = "🚫 GREEDY + BÚSQUEDA TABÚ"
+
+    def __init__(self, max_iter_tabu=2000, tam_vecindario=100, tenencia=(10, 30),
+                 max_sin_mejora=500, prob_swap=0.5, semilla=None, verbose=True, **control):
+        """
+        Optimizador Greedy + Búsqueda Tabú
+
+        Args:
+            max_iter_tabu: Iteraciones (un movimiento aplicado por iteración)
+            tam_vecindario: Movimientos muestreados y evaluados por iteración
+            tenencia: Iteraciones que una clase no puede volver al salón que dejó
+                      (int fijo o (mínimo, máximo) sorteado por movimiento)
+            max_sin_mejora: Iteraciones sin mejorar la mejor solución antes de parar
+            prob_swap: Probabilidad de proponer un swap (si no, un movimiento simple)
+            semilla: Semilla del generador aleatorio
+            verbose: Mostrar progreso
+            **control: Presupuesto de tiempo y punto de control (ver OptimizadorGreedyHC)
+        """
+        super().__init__(prob_swap=prob_swap, semilla=semilla, verbose=verbose, **control)
+        self.max_iter_tabu = max_iter_tabu
+        self.tam_vecindario = tam_vecindario
+        self.tenencia = (tenencia, tenencia) if isinstance(tenencia, int) else tuple(tenencia)
+        self.max_sin_mejora = max_sin_mejora
+
+    def busqueda_tabu(self, solucion: Dict, df: pd.DataFrame) -> Dict:
+        """Fase 2: Búsqueda Tabú (respetando inmutables)"""
+        self._log("\n🚫 Fase 2: Búsqueda Tabú...")
+
+        m, orden, salones, energia, ocupacion = self._iniciar_busqueda(solucion, df)
+        if len(self._movibles) == 0:
+            self._log("   Sin clases movibles (todas fijas): se conserva la solución inicial")
+            return m.decodificar(salones, orden)
+        mejor_solucion, mejor_energia = salones.copy(), energia
+
+        # tabu_hasta[clase, salón]: iteración hasta la que la clase no puede volver a ese salón
+        tabu_hasta = np.full((m.n, m.n_salones), -1, dtype=np.int64)
+        sin_mejora = 0
+        reporte = max(self.max_iter_tabu // 10, 1)
+
+        for iteracion in range(self._iteracion_reanudada, self.max_iter_tabu):
+            if self._tiempo_agotado(mejor_solucion, orden, iteracion):
+                break
+            self._punto_control(mejor_solucion, orden, iteracion)
+            
+            mejor_delta, mejor_cambios = np.inf, None
+            for _ in range(self.tam_vecindario):
+                delta, cambios = self._proponer(salones, ocupacion)
+                if not cambios or delta >= mejor_delta:
+                    continue
+                es_tabu = any(tabu_hasta[i, s] > iteracion for i, s in cambios)
+                # Criterio de aspiración: se permite si mejora la mejor solución conocida
+                if es_tabu and energia + delta >= mejor_energia - 1e-9:
+                    continue
+                mejor_delta, mejor_cambios = delta, cambios
+
+            if mejor_cambios is None:
+                sin_mejora += 1
+            else:
+                tenencia = self.rng.integers(self.tenencia[0], self.tenencia[1] + 1)
+                for i, _ in mejor_cambios:
+                    tabu_hasta[i, salones[i]] = iteracion + tenencia
+                self._aplicar_cambios(salones, ocupacion, mejor_cambios)
+                energia += mejor_delta
+
+                if energia < mejor_energia - 1e-9:
+                    mejor_solucion[:] = salones
+                    mejor_energia = energia
+                    sin_mejora = 0
+                else:
+                    sin_mejora += 1
+
+            if sin_mejora >= self.max_sin_mejora:
+                self._log(f"   Sin mejora en {sin_mejora} iteraciones, deteniendo en iteración {iteracion+1}")
+                break
+
+            if (iteracion + 1) % reporte == 0:
+                self._log(f"   Iter {iteracion+1}: Energía = {energia:.0f} (mejor {mejor_energia:.0f})")
+            self._reportar('tabu', iteracion + 1, self.max_iter_tabu, mejor_solucion, mejor_energia,
+                           energia_actual=float(energia))
+
+        self._log(f"   Energía final: {mejor_energia:.0f}")
+        self._reportar('tabu', self.max_iter_tabu, self.max_iter_tabu, mejor_solucion, mejor_energia,
+                       forzar=True, energia_actual=float(energia))
+
+        return m.decodificar(mejor_solucion, orden)
+
+    def mejorar(self, solucion: Dict, df: pd.DataFrame) -> Dict:
+        return self.busqueda_tabu(solucion, df)
+
+
+def main():
+    """Función principal: python3 optimizador_busqueda_local.py [sa|tabu]"""
+    metodo = sys.argv[1] if len(sys.argv) > 1 else 'sa'
+    if metodo not in ('sa', 'tabu'):
+        print(f"❌ Método desconocido: {metodo} (usar 'sa' o 'tabu')")
+        sys.exit(1)
+
+    nombre = "Recocido Simulado" if metodo == 'sa' else "Búsqueda Tabú"
+    print(f"\n🔎 Optimizador Greedy + {nombre} - Sistema de Salones ISC")
+    print("="*80)
+
+    # Cargar datos
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    datos_dir = os.path.join(script_dir, "datos_estructurados")
+    df_inicial = pd.read_csv(os.path.join(datos_dir, "01_Horario_Inicial.csv"))
+
+    # Optimizar
+    optimizador = OptimizadorSA(verbose=True) if metodo == 'sa' else OptimizadorTabu(verbose=True)
+    mejor_solucion, mejor_energia = optimizador.optimizar(df_inicial)
+    df_resultado = optimizador.aplicar_solucion(df_inicial, mejor_solucion)
+
+    # Analizar movimientos
+    analizador = AnalizadorMovimientos()
+    comparativa = analizador.comparar_horarios(df_inicial, df_resultado)
+    analizador.generar_reporte(comparativa)
+
+    # Guardar resultado
+    archivo = "07_Horario_Optimizado_SA.csv" if metodo == 'sa' else "08_Horario_Optimizado_Tabu.csv"
+    output_path = os.path.join(datos_dir, archivo)
+    df_resultado.to_csv(output_path, index=False)
+    print(f"💾 Resultado guardado: {output_path}")
+    print(f"⚡ Energía final: {mejor_energia:.0f}\n")
+
+
+if __name__ == "__main__":
+    main()
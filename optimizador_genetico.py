@@ -8,39 +8,178 @@ ACTUALIZADO: Integra restricciones de teoría/lab y preferencias de profesores
 
 import pandas as pd
 import numpy as np
-import random
-import copy
-from collections import defaultdict
+import multiprocessing as mp
+from multiprocessing import shared_memory
 import sys
 import os
+import time
+import queue
+import threading
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from analizar_movimientos import AnalizadorMovimientos
 from utils_restricciones import (
-    cargar_configuraciones,
-    determinar_tipo_hora,
-    obtener_preferencia_profesor,
-    es_preferencia_prioritaria,
+    Catalogos,
     filtrar_salones_por_tipo
 )
+from modelo_horario import ModeloHorario
+from control_ejecucion import ControlEjecucion, huella_horario
 import warnings
 warnings.filterwarnings('ignore')
 
+# ----------------------------------------------------------------------
+# Fitness por lotes (función de módulo para poder usarla en procesos)
+# ----------------------------------------------------------------------
+
+def _evaluar_lote(matriz, t, dimensiones, pesos):
+    """
+    Evalúa un lote de soluciones de una sola vez
+    
+    Args:
+        matriz: Arreglo (individuos, clases) de IDs de salón
+        t: Tablas estáticas del modelo (ver OptimizadorGenetico._compilar_modelo)
+        dimensiones: {'n_slots', 'n_salones', 'n_grupos'}
+        pesos: Pesos de cada criterio
+    
+    Returns:
+        (fitness, penalizaciones, costos): arreglo de fitness por fila y
+        dicts {criterio: arreglo por fila}
+    """
+    matriz = np.asarray(matriz)
+    P = len(matriz)
+    R = dimensiones['n_salones']
+    filas = np.arange(P, dtype=np.int64)[:, None]
+    penalizaciones = {}
+    costos = {}
+    
+    # P1: Salones inválidos
+    penalizaciones['invalidos'] = np.count_nonzero(t['salon_es_invalido'][matriz], axis=1)
+    
+    # P2: Conflictos de horario (mismo salón, mismo día/hora)
+    # (cada par de clases en la misma celda cuenta: c clases -> c*(c-1)/2 conflictos;
+    # solo se cuentan las celdas ocupadas, no la rejilla completa individuo x slot x salón)
+    celdas = dimensiones['n_slots'] * R
+    ocupadas, ocupacion = np.unique((filas * celdas + t['slot'] * R + matriz).ravel(), return_counts=True)
+    repetidas = ocupacion > 1
+    pares = ocupacion[repetidas] * (ocupacion[repetidas] - 1) // 2
+    penalizaciones['conflictos'] = np.bincount(ocupadas[repetidas] // celdas, weights=pares,
+                                               minlength=P).astype(np.int64)
+    
+    # P3: Tipo de salón incorrecto
+    penalizaciones['tipo_incorrecto'] = np.count_nonzero(t['salon_es_lab'][matriz] != t['requiere_lab'], axis=1)
+    
+    # P4: Preferencias de profesores
+    viola = (t['pref_salon'] >= 0) & (t['pref_salon'] != matriz)
+    penalizaciones['preferencia_prioritaria'] = np.count_nonzero(viola & t['pref_prioritaria'], axis=1)
+    penalizaciones['preferencia_opcional'] = np.count_nonzero(viola & ~t['pref_prioritaria'], axis=1)
+    
+    # P5: Grupos de primer semestre (más de un salón de teoría)
+    mascara = t['primer_semestre_teoria']
+    # (pares individuo-grupo-salón distintos; un grupo con más de uno penaliza a su individuo)
+    G = dimensiones['n_grupos']
+    usados = np.unique((filas * (G * R) + t['grupo'][mascara].astype(np.int64) * R + matriz[:, mascara]).ravel())
+    grupos, salones_por_grupo = np.unique(usados // R, return_counts=True)
+    penalizaciones['primer_semestre'] = np.bincount(grupos[salones_por_grupo > 1] // G, minlength=P)
+    
+    # P5: Capacidad (simplificado - asumimos capacidad suficiente por ahora)
+    penalizaciones['capacidad'] = np.zeros(P, dtype=np.int64)
+    
+    # C1, C2, C3: Movimientos, cambios de piso, distancia
+    # (mismo criterio que AnalizadorMovimientos: clases consecutivas del profesor por día)
+    a, b = t['pares_a'], t['pares_b']
+    sa, sb = matriz[:, a], matriz[:, b]
+    cambia = sa != sb
+    costos['movimientos'] = np.count_nonzero(cambia, axis=1)
+    costos['cambios_piso'] = np.count_nonzero(cambia & (t['pisos'][sa] != t['pisos'][sb]), axis=1)
+    costos['distancia'] = (t['distancias'][sa, sb] * cambia).sum(axis=1)
+    
+    # C4: Desbalance de uso de salones (varianza muestral de los salones usados)
+    uso = np.bincount((filas * R + matriz).ravel(), minlength=P * R).reshape(P, R)
+    usado = uso > 0
+    k = np.count_nonzero(usado, axis=1)
+    media = uso.sum(axis=1) / np.maximum(k, 1)
+    desvio = np.where(usado, uso - media[:, None], 0.0)
+    costos['balance'] = np.where(k > 1, (desvio ** 2).sum(axis=1) / np.maximum(k - 1, 1), 0.0)
+    
+    # Calcular fitness total (negativo de la suma ponderada)
+    fitness = -(
+        pesos['invalidos'] * penalizaciones['invalidos'] +
+        pesos['conflictos'] * penalizaciones['conflictos'] +
+        pesos['tipo_incorrecto'] * penalizaciones['tipo_incorrecto'] +
+        pesos['preferencia_prioritaria'] * penalizaciones['preferencia_prioritaria'] +
+        pesos['preferencia_opcional'] * penalizaciones['preferencia_opcional'] +
+        pesos['primer_semestre'] * penalizaciones['primer_semestre'] +
+        pesos['capacidad'] * penalizaciones['capacidad'] +
+        pesos['movimientos'] * costos['movimientos'] +
+        pesos['cambios_piso'] * costos['cambios_piso'] +
+        pesos['distancia'] * costos['distancia'] +
+        pesos['balance'] * costos['balance']
+    )
+    
+    return fitness, penalizaciones, costos
+
+
+# ----------------------------------------------------------------------
+# Evaluación en procesos (n_workers > 1)
+# ----------------------------------------------------------------------
+
+_TABLAS_TRABAJADOR = None
+
+
+def _publicar_tablas(tablas):
+    """Copia las tablas a memoria compartida; devuelve (bloques, descriptores)"""
+    bloques = []
+    descriptores = {}
+    for nombre, arreglo in tablas.items():
+        arreglo = np.ascontiguousarray(arreglo)
+        bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+        np.ndarray(arreglo.shape, dtype=arreglo.dtype, buffer=bloque.buf)[...] = arreglo
+        bloques.append(bloque)
+        descriptores[nombre] = (bloque.name, arreglo.shape, arreglo.dtype.str)
+    return bloques, descriptores
+
+
+def _inicializar_trabajador(descriptores, dimensiones, pesos):
+    """Inicializador del pool: se conecta a las tablas publicadas (sin copiarlas)"""
+    global _TABLAS_TRABAJADOR
+    bloques = []
+    tablas = {}
+    for nombre, (nombre_bloque, forma, dtype) in descriptores.items():
+        bloque = shared_memory.SharedMemory(name=nombre_bloque)
+        bloques.append(bloque)
+        tablas[nombre] = np.ndarray(forma, dtype=np.dtype(dtype), buffer=bloque.buf)
+    _TABLAS_TRABAJADOR = (bloques, tablas, dimensiones, pesos)
+
+
+def _evaluar_en_trabajador(matriz):
+    """Evalúa una parte de la población dentro de un proceso del pool"""
+    _, tablas, dimensiones, pesos = _TABLAS_TRABAJADOR
+    return _evaluar_lote(matriz, tablas, dimensiones, pesos)
+
+
 class Cromosoma:
-    """Representa una solución completa (asignación de todos los salones)"""
+    """
+    Representa una solución completa (asignación de todos los salones)
+    
+    Los datos de cada clase (grupo, profesor, día, bloque, tipo...) viven en
+    el ModeloHorario compartido; el cromosoma solo guarda el salón de cada
+    clase como ID del catálogo del modelo.
+    """
     
-    def __init__(self, genes):
-        self.genes = genes  # Lista de asignaciones
+    def __init__(self, salones):
+        self.salones = salones  # np.ndarray de IDs de salón (una entrada por clase)
         self.fitness = None
         self.penalizaciones = {}
         self.costos = {}
     
     def __len__(self):
-        return len(self.genes)
+        return len(self.salones)
     
     def copy(self):
-        """Crea una copia profunda del cromosoma"""
-        nuevo = Cromosoma(copy.deepcopy(self.genes))
+        """Crea una copia del cromosoma (solo se copia el vector de salones)"""
+        nuevo = Cromosoma(self.salones.copy())
         nuevo.fitness = self.fitness
+        nuevo.penalizaciones = self.penalizaciones
+        nuevo.costos = self.costos
         return nuevo
 
 class OptimizadorGenetico:
@@ -57,7 +196,21 @@ class OptimizadorGenetico:
     
     def __init__(self, tam_poblacion=150, num_generaciones=500, 
                  prob_cruzamiento=0.8, prob_mutacion=0.1, 
-                 tasa_elitismo=0.1, verbose=True):
+                 tasa_elitismo=0.1, verbose=True, semilla=None, n_workers=1,
+                 tiempo_limite_s=None, fecha_limite=None, punto_control=None, intervalo_control_s=60.0,
+                 progreso=None, intervalo_progreso_s=0.5, catalogos=None):
+        """
+        Args (además de los parámetros evolutivos):
+            tiempo_limite_s: Presupuesto de tiempo de evolucionar() en segundos; al
+                             agotarse se devuelve el mejor individuo encontrado
+            fecha_limite: Instante límite absoluto (time.time())
+            punto_control: Archivo para guardar la población y reanudar corridas interrumpidas
+            intervalo_control_s: Segundos entre puntos de control
+            progreso: Función que recibe eventos de progreso (generación, mejor fitness,
+                      penalizaciones, tiempo transcurrido)
+            intervalo_progreso_s: Segundos mínimos entre eventos de progreso
+            catalogos: Catálogos ya cargados (None = leerlos de disco)
+        """
         
         self.tam_poblacion = tam_poblacion
         self.num_generaciones = num_generaciones
@@ -65,24 +218,24 @@ class OptimizadorGenetico:
         self.prob_mutacion_inicial = prob_mutacion
         self.tasa_elitismo = tasa_elitismo
         self.verbose = verbose
+        self.semilla = semilla
+        self.rng = np.random.default_rng(semilla)
+        self.n_workers = n_workers  # >1: evaluar fitness en un pool de procesos
+        self.control = ControlEjecucion(tiempo_limite_s, fecha_limite, punto_control, intervalo_control_s,
+                                        progreso, intervalo_progreso_s)
+        self.interrumpido = False
         
-        # Cargar configuraciones de restricciones
-        self._log("📂 Cargando configuraciones de restricciones...")
-        self.config_materias, self.preferencias_profesores = cargar_configuraciones()
-        
-        # Cargar índices inmutables (PRIORIDAD 1)
-        import json
-        from pathlib import Path
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        inmutables_path = Path(script_dir) / "datos_estructurados" / "indices_inmutables_p1.json"
-        self.indices_inmutables = set()
-        if inmutables_path.exists():
-            try:
-                with open(inmutables_path, 'r') as f:
-                    self.indices_inmutables = set(json.load(f))
-                self._log(f"✅ Índices inmutables cargados: {len(self.indices_inmutables)} clases")
-            except Exception as e:
-                self._log(f"⚠️  Error cargando índices inmutables: {e}")
+        # Cargar configuraciones de restricciones, índices inmutables (PRIORIDAD 1) y
+        # asignación de grupos de 1er semestre, o reutilizar los ya cargados
+        if catalogos is None:
+            self._log("📂 Cargando configuraciones de restricciones...")
+            catalogos = Catalogos(verbose=verbose)
+        self.catalogos = catalogos
+        self.config_materias = catalogos.config_materias
+        self.preferencias_profesores = catalogos.preferencias_profesores
+        self.tabla_preferencias = catalogos.tabla_preferencias
+        self.indices_inmutables = catalogos.indices_inmutables
+        self.asignacion_grupos_1er = catalogos.asignacion_grupos_1er
         
         # Catálogos
         self.salones_validos = self._inicializar_salones()
@@ -106,11 +259,19 @@ class OptimizadorGenetico:
         }
         
         # Analizador de movimientos
-        self.analizador_mov = AnalizadorMovimientos()
+        self.analizador_mov = catalogos.analizador_mov
         
         # Historial
         self.historial_fitness = []
         self.mejor_global = None
+        
+        # Modelo compilado del horario (se crea en evolucionar)
+        self.modelo = None
+        
+        # Pool de evaluación (solo activo dentro de evolucionar con n_workers > 1;
+        # fuera de evolucionar siempre se evalúa en el proceso actual)
+        self._pool = None
+        self._usar_pool = False
     
     def _inicializar_salones(self):
         """Inicializa catálogo de salones válidos"""
@@ -132,287 +293,166 @@ class OptimizadorGenetico:
         if self.verbose:
             print(mensaje)
     
+    def _compilar_modelo(self, df):
+        """Compila el horario a arreglos y prepara las tablas usadas por el fitness"""
+        self.modelo = ModeloHorario(
+            df, self.config_materias, self.preferencias_profesores,
+            self.laboratorios, self.salones_teoria, self.salones_invalidos,
+            salones_extra=self.salones_validos, tabla_preferencias=self.tabla_preferencias
+        )
+        m = self.modelo
+        self._pref_salon, self._pref_prioritaria = m.preferencias(por_materia=False)
+        self._pares_profesor = m.pares_consecutivos(por_dia=True, solo_profesores_validos=True)
+        self._distancias = self.catalogos.distancias(m.salones).astype(np.int64)
+        self._pisos = m.codificar_pisos(self.analizador_mov.obtener_piso)
+        self._primer_semestre_teoria = m.es_primer_semestre & ~m.requiere_lab
+        
+        # Tablas estáticas del fitness (se publican en memoria compartida si hay pool)
+        a, b = self._pares_profesor
+        self._tablas = {
+            'salon_es_invalido': m.salon_es_invalido,
+            'salon_es_lab': m.salon_es_lab,
+            'requiere_lab': m.requiere_lab,
+            'slot': m.slot,
+            'grupo': m.grupo,
+            'pref_salon': self._pref_salon,
+            'pref_prioritaria': self._pref_prioritaria,
+            'primer_semestre_teoria': self._primer_semestre_teoria,
+            'pares_a': a,
+            'pares_b': b,
+            'pisos': self._pisos,
+            'distancias': self._distancias,
+        }
+        self._dimensiones = {'n_slots': m.n_slots, 'n_salones': m.n_salones, 'n_grupos': len(m.grupos)}
+        
+        # Dominios por clase: las asignaciones aleatorias solo sortean salones factibles
+        indices_inmutables = self.catalogos.inmutables_para(df)
+        inmutables = np.array([idx in indices_inmutables for idx in m.indices], dtype=bool)
+        self.dominios = m.dominios(fijas=inmutables, asignacion_grupos_1er=self.asignacion_grupos_1er)
+        self._todas = np.arange(m.n)
+        return m
+    
     def df_a_cromosoma(self, df):
-        """Convierte DataFrame a cromosoma"""
-        genes = []
-        for idx, row in df.iterrows():
-            gen = {
-                'idx': idx,
-                'grupo': row['Grupo'],
-                'materia': row['Materia'],
-                'dia': row['Dia'],
-                'bloque': row['Bloque_Horario'],
-                'profesor': row['Profesor'],
-                'salon': row['Salon'],
-                'tipo_requerido': row['Tipo_Salon'],
-                'es_primer_semestre': row['Es_Primer_Semestre'] == 1
-            }
-            genes.append(gen)
-        
-        return Cromosoma(genes)
+        """Convierte DataFrame a cromosoma (df debe ser el DataFrame compilado en el modelo)"""
+        return Cromosoma(self.modelo.codificar_salones(df['Salon']))
     
     def cromosoma_a_df(self, cromosoma, df_base):
         """Convierte cromosoma a DataFrame"""
-        df = df_base.copy()
-        for gen in cromosoma.genes:
-            df.at[gen['idx'], 'Salon'] = gen['salon']
-            
-            # Actualizar tipo y piso según salón
-            if gen['salon'].startswith('L'):
-                df.at[gen['idx'], 'Tipo_Salon'] = 'Laboratorio'
-                if gen['salon'] in ['LR', 'LSO', 'LIA', 'LCG1', 'LCG2']:
-                    df.at[gen['idx'], 'Piso'] = 'Primer Piso'
-                else:
-                    df.at[gen['idx'], 'Piso'] = 'Segundo Piso'
-            else:
-                df.at[gen['idx'], 'Tipo_Salon'] = 'Teoría'
-                if gen['salon'] in ['FF1', 'FF2', 'FF3', 'FF4', 'FF5', 'FF6', 'FF7']:
-                    df.at[gen['idx'], 'Piso'] = 'Planta Baja'
-                else:
-                    df.at[gen['idx'], 'Piso'] = 'Planta Alta'
-            
-            df.at[gen['idx'], 'Es_Invalido'] = 1 if gen['salon'] in self.salones_invalidos else 0
+        return self.modelo.a_dataframe(cromosoma.salones, df_base)
+    
+    def evaluar_matriz(self, matriz):
+        """
+        Evalúa un lote de soluciones (individuos, clases) de una sola vez
+        
+        Con n_workers > 1, dentro de evolucionar, el lote se reparte entre
+        procesos; el resultado es idéntico al de la evaluación en serie.
+        
+        Returns:
+            (fitness, penalizaciones, costos): arreglo de fitness por fila y
+            dicts {criterio: arreglo por fila}
+        """
+        if self._usar_pool and self._pool is None:
+            self._abrir_pool()
+        if self._pool is None or len(matriz) < 2 * self.n_workers:
+            return _evaluar_lote(matriz, self._tablas, self._dimensiones, self.pesos)
         
-        return df
+        # Solo viajan los vectores de salones; las tablas están en memoria compartida
+        partes = self._pool.map(_evaluar_en_trabajador, np.array_split(np.asarray(matriz), self.n_workers))
+        fitness = np.concatenate([f for f, _, _ in partes])
+        penalizaciones = {k: np.concatenate([p[k] for _, p, _ in partes]) for k in partes[0][1]}
+        costos = {k: np.concatenate([c[k] for _, _, c in partes]) for k in partes[0][2]}
+        return fitness, penalizaciones, costos
     
-    def calcular_fitness(self, cromosoma):
+    def calcular_fitness_poblacion(self, cromosomas):
         """
-        Calcula fitness del cromosoma
+        Calcula el fitness de varios cromosomas en una sola evaluación por lotes
         Mayor fitness = mejor solución
         """
-        penalizaciones = {}
-        costos = {}
-        
-        # P1: Salones inválidos
-        invalidos = sum(1 for g in cromosoma.genes if g['salon'] in self.salones_invalidos)
-        penalizaciones['invalidos'] = invalidos
-        
-        # P2: Conflictos de horario (mismo salón, mismo día/hora)
-        conflictos = 0
-        for i, g1 in enumerate(cromosoma.genes):
-            for g2 in cromosoma.genes[i+1:]:
-                if (g1['salon'] == g2['salon'] and 
-                    g1['dia'] == g2['dia'] and 
-                    g1['bloque'] == g2['bloque']):
-                    conflictos += 1
-        penalizaciones['conflictos'] = conflictos
-        
-        # P3: Tipo de salón incorrecto
-        tipo_incorrecto = 0
-        for g in cromosoma.genes:
-            es_lab = g['salon'] in self.laboratorios
-            requiere_lab = g['tipo_requerido'] == 'Laboratorio'
-            if es_lab != requiere_lab:
-                tipo_incorrecto += 1
-        penalizaciones['tipo_incorrecto'] = tipo_incorrecto
-        
-        # P4: Preferencias de profesores (NUEVO)
-        pref_prioritarias_violadas = 0
-        pref_opcionales_violadas = 0
-        
-        for g in cromosoma.genes:
-            profesor = g['profesor']
-            tipo_req = g['tipo_requerido']
-            salon = g['salon']
-            
-            pref_salon = obtener_preferencia_profesor(profesor, tipo_req, self.preferencias_profesores)
-            if pref_salon:
-                es_prioritaria = es_preferencia_prioritaria(profesor, tipo_req, self.preferencias_profesores)
-                if pref_salon != salon:
-                    if es_prioritaria:
-                        pref_prioritarias_violadas += 1
-                    else:
-                        pref_opcionales_violadas += 1
-        
-        penalizaciones['preferencia_prioritaria'] = pref_prioritarias_violadas
-        penalizaciones['preferencia_opcional'] = pref_opcionales_violadas
-        
-        # P5: Grupos de primer semestre (más de un salón de teoría)
-        grupos_1er = defaultdict(set)
-        for g in cromosoma.genes:
-            if g['es_primer_semestre'] and g['tipo_requerido'] == 'Teoría':
-                grupos_1er[g['grupo']].add(g['salon'])
-        
-        primer_sem_violaciones = sum(1 for salones in grupos_1er.values() if len(salones) > 1)
-        penalizaciones['primer_semestre'] = primer_sem_violaciones
-        
-        # P5: Capacidad (simplificado - asumimos capacidad suficiente por ahora)
-        penalizaciones['capacidad'] = 0
-        
-        # Convertir a DataFrame temporal para calcular costos
-        df_temp = pd.DataFrame([{
-            'Grupo': g['grupo'],
-            'Materia': g['materia'],
-            'Dia': g['dia'],
-            'Bloque_Horario': g['bloque'],
-            'Profesor': g['profesor'],
-            'Salon': g['salon']
-        } for g in cromosoma.genes])
-        
-        # C1, C2, C3: Movimientos, cambios de piso, distancia
-        metricas_mov = self.analizador_mov.analizar_todos_profesores(df_temp)
-        costos['movimientos'] = metricas_mov['agregado']['total_movimientos']
-        costos['cambios_piso'] = metricas_mov['agregado']['total_cambios_piso']
-        costos['distancia'] = metricas_mov['agregado']['total_distancia']
-        
-        # C4: Desbalance de uso de salones
-        uso_salones = df_temp['Salon'].value_counts()
-        if len(uso_salones) > 0:
-            costos['balance'] = uso_salones.var()
-        else:
-            costos['balance'] = 0
-        
-        # Calcular fitness total (negativo de la suma ponderada)
-        fitness = -(
-            self.pesos['invalidos'] * penalizaciones['invalidos'] +
-            self.pesos['conflictos'] * penalizaciones['conflictos'] +
-            self.pesos['tipo_incorrecto'] * penalizaciones['tipo_incorrecto'] +
-            self.pesos['preferencia_prioritaria'] * penalizaciones['preferencia_prioritaria'] +
-            self.pesos['preferencia_opcional'] * penalizaciones['preferencia_opcional'] +
-            self.pesos['primer_semestre'] * penalizaciones['primer_semestre'] +
-            self.pesos['capacidad'] * penalizaciones['capacidad'] +
-            self.pesos['movimientos'] * costos['movimientos'] +
-            self.pesos['cambios_piso'] * costos['cambios_piso'] +
-            self.pesos['distancia'] * costos['distancia'] +
-            self.pesos['balance'] * costos['balance']
-        )
+        if not cromosomas:
+            return np.zeros(0)
         
-        cromosoma.fitness = fitness
-        cromosoma.penalizaciones = penalizaciones
-        cromosoma.costos = costos
+        fitness, penalizaciones, costos = self.evaluar_matriz(np.stack([c.salones for c in cromosomas]))
+        
+        for i, cromosoma in enumerate(cromosomas):
+            cromosoma.fitness = float(fitness[i])
+            cromosoma.penalizaciones = {k: int(v[i]) for k, v in penalizaciones.items()}
+            cromosoma.costos = {k: (float(v[i]) if k == 'balance' else int(v[i])) for k, v in costos.items()}
         
         return fitness
     
+    def calcular_fitness(self, cromosoma):
+        """
+        Calcula fitness del cromosoma
+        Mayor fitness = mejor solución
+        """
+        return float(self.calcular_fitness_poblacion([cromosoma])[0])
+    
     def generar_individuo_aleatorio(self, base):
         """Genera un individuo con asignaciones aleatorias válidas"""
         individuo = base.copy()
         
-        for gen in individuo.genes:
-            # Elegir salón aleatorio válido
-            if gen['tipo_requerido'] == 'Laboratorio':
-                # Solo laboratorios
-                salones_candidatos = [s for s in self.salones_validos if s.startswith('L')]
-            else:
-                # Preferir teoría pero permitir labs
-                salones_candidatos = self.salones_validos
-            
-            gen['salon'] = random.choice(salones_candidatos)
+        # Cada clase sortea dentro de su dominio (tipo correcto, salones fijos respetados)
+        individuo.salones[:] = self.dominios.sortear(self._todas, self.rng)
         
         return individuo
     
     def seleccion_torneo(self, poblacion, k=3):
         """Selección por torneo"""
-        torneo = random.sample(poblacion, k)
+        torneo = [poblacion[i] for i in self.rng.choice(len(poblacion), size=k, replace=False)]
         return max(torneo, key=lambda ind: ind.fitness)
     
     def cruzamiento_uniforme(self, padre1, padre2):
         """Cruzamiento uniforme"""
-        hijo1 = padre1.copy()
-        hijo2 = padre2.copy()
-        
-        for i in range(len(padre1)):
-            if random.random() < 0.5:
-                hijo1.genes[i]['salon'] = padre2.genes[i]['salon']
-                hijo2.genes[i]['salon'] = padre1.genes[i]['salon']
+        intercambia = self.rng.random(len(padre1)) < 0.5
+        hijo1 = Cromosoma(np.where(intercambia, padre2.salones, padre1.salones))
+        hijo2 = Cromosoma(np.where(intercambia, padre1.salones, padre2.salones))
         
         return hijo1, hijo2
     
     def mutacion(self, cromosoma, prob_mutacion):
         """Mutación inteligente"""
-        for gen in cromosoma.genes:
-            if random.random() < prob_mutacion:
-                # Mutar a salón válido
-                if gen['tipo_requerido'] == 'Laboratorio':
-                    candidatos = [s for s in self.salones_validos if s.startswith('L')]
-                else:
-                    candidatos = self.salones_validos
-                
-                gen['salon'] = random.choice(candidatos)
+        # Mutar a un salón del dominio de la clase
+        muta = np.flatnonzero(self.rng.random(len(cromosoma)) < prob_mutacion)
+        if len(muta):
+            cromosoma.salones[muta] = self.dominios.sortear(muta, self.rng)
         
         return cromosoma
     
     def reparar_restricciones(self, cromosoma):
         """Repara violaciones de restricciones hard"""
         
-        # R0: FORZAR preferencias prioritarias (PRIMERO, antes que todo)
-        for gen in cromosoma.genes:
-            profesor = gen['profesor']
-            tipo_req = gen['tipo_requerido']
-            
-            pref_salon = obtener_preferencia_profesor(profesor, tipo_req, self.preferencias_profesores)
-            es_prioritaria = es_preferencia_prioritaria(profesor, tipo_req, self.preferencias_profesores)
-            
-            # Si hay preferencia PRIORITARIA, forzar ese salón (sin excepciones)
-            if es_prioritaria and pref_salon:
-                gen['salon'] = pref_salon
-        
-        # R1: Eliminar salones inválidos
-        for gen in cromosoma.genes:
-            if gen['salon'] in self.salones_invalidos:
-                # Verificar si tiene preferencia prioritaria
-                profesor = gen['profesor']
-                tipo_req = gen['tipo_requerido']
-                pref_salon = obtener_preferencia_profesor(profesor, tipo_req, self.preferencias_profesores)
-                es_prioritaria = es_preferencia_prioritaria(profesor, tipo_req, self.preferencias_profesores)
-                
-                # Si tiene preferencia prioritaria, usar esa
-                if es_prioritaria and pref_salon:
-                    gen['salon'] = pref_salon
-                else:
-                    # Buscar alternativa del tipo correcto
-                    if gen['tipo_requerido'] == 'Laboratorio':
-                        candidatos = [s for s in self.salones_validos if s in self.laboratorios]
-                    else:
-                        candidatos = [s for s in self.salones_validos if s in self.salones_teoria]
-                    
-                    if candidatos:
-                        gen['salon'] = random.choice(candidatos)
+        m = self.modelo
+        salones = cromosoma.salones
+        
+        # R0: FORZAR preferencias prioritarias (PRIMERO, antes que todo, sin excepciones)
+        forzar = (self._pref_salon >= 0) & self._pref_prioritaria
+        salones[forzar] = self._pref_salon[forzar]
+        
+        # R1: Salones inválidos o fuera del dominio (tipo incorrecto, salón fijo ajeno)
+        fuera = np.flatnonzero(~self.dominios.contiene(self._todas, salones) & ~forzar)
+        if len(fuera):
+            salones[fuera] = self.dominios.sortear(fuera, self.rng)
         
         # R2: Resolver conflictos de horario
         # (Simplificado - en versión completa se haría más exhaustivo)
         
-        # R3: Grupos de primer semestre
-        grupos_1er = defaultdict(list)
-        for gen in cromosoma.genes:
-            if gen['es_primer_semestre'] and gen['tipo_requerido'] == 'Teoría':
-                grupos_1er[gen['grupo']].append(gen)
-        
-        for grupo, genes in grupos_1er.items():
-            if len(genes) > 0:
-                # Unificar al salón más común
-                salones = [g['salon'] for g in genes]
-                salon_comun = max(set(salones), key=salones.count)
-                for g in genes:
-                    g['salon'] = salon_comun
+        # R3: Grupos de primer semestre: unificar teoría al salón más común del grupo
+        mascara = self._primer_semestre_teoria
+        if mascara.any():
+            grupos = m.grupo[mascara].astype(np.int64)
+            conteo = np.bincount(grupos * m.n_salones + salones[mascara],
+                                 minlength=len(m.grupos) * m.n_salones)
+            salones[mascara] = conteo.reshape(len(m.grupos), m.n_salones).argmax(axis=1)[grupos]
         
         return cromosoma
     
-    def evolucionar(self, df_inicial):
-        """
-        Ejecuta el algoritmo genético completo
-        """
-        self._log("\n" + "="*80)
-        self._log("🧬 ALGORITMO GENÉTICO - OPTIMIZACIÓN EVOLUTIVA")
-        self._log("="*80 + "\n")
-        
-        # 1. INICIALIZACIÓN
-        self._log("📊 Inicializando población...")
-        
-        # Agregar columna tipo_requerido basada en configuración
+    def _poblacion_inicial(self, df_inicial):
+        """Compila el modelo, crea y evalúa la población inicial (fija mejor_global)"""
+        # Compilar horario y sobrescribir Tipo_Salon con el tipo requerido por configuración
         df_trabajo = df_inicial.copy()
-        horas_asignadas = {}
-        tipos_requeridos = []
-        
-        for idx, row in df_trabajo.iterrows():
-            grupo = row['Grupo']
-            materia = row['Materia']
-            key = (grupo, materia)
-            indice_hora = horas_asignadas.get(key, 0)
-            tipo_req = determinar_tipo_hora(materia, indice_hora, self.config_materias)
-            horas_asignadas[key] = indice_hora + 1
-            tipos_requeridos.append(tipo_req)
-        
-        df_trabajo['Tipo_Salon'] = tipos_requeridos  # Sobrescribir con tipo correcto
+        modelo = self._compilar_modelo(df_trabajo)
+        df_trabajo['Tipo_Salon'] = modelo.tipo_requerido
+        
         poblacion = []
         
         # Individuo 1: Horario inicial
@@ -425,72 +465,186 @@ class OptimizadorGenetico:
             poblacion.append(individuo)
         
         # Evaluar población inicial
-        for ind in poblacion:
-            self.calcular_fitness(ind)
+        self.calcular_fitness_poblacion(poblacion)
         
         self.mejor_global = max(poblacion, key=lambda x: x.fitness)
         self.historial_fitness = [self.mejor_global.fitness]
         
+        return poblacion
+    
+    def _nueva_generacion(self, poblacion, generacion):
+        """Produce la siguiente generación (selección, cruce, mutación, reparación, elitismo)"""
+        # 2.1 SELECCIÓN
+        padres = []
+        for _ in range(self.tam_poblacion):
+            padre = self.seleccion_torneo(poblacion, k=3)
+            padres.append(padre)
+        
+        # 2.2 CRUZAMIENTO
+        hijos = []
+        for i in range(0, self.tam_poblacion - 1, 2):
+            if self.rng.random() < self.prob_cruzamiento:
+                hijo1, hijo2 = self.cruzamiento_uniforme(padres[i], padres[i+1])
+            else:
+                hijo1, hijo2 = padres[i].copy(), padres[i+1].copy()
+            
+            hijos.append(hijo1)
+            hijos.append(hijo2)
+        
+        # Si falta uno (población impar)
+        if len(hijos) < self.tam_poblacion:
+            hijos.append(padres[-1].copy())
+        
+        # 2.3 MUTACIÓN (adaptativa)
+        prob_mutacion = self.prob_mutacion_inicial * (1 - generacion / self.num_generaciones)
+        for hijo in hijos:
+            self.mutacion(hijo, prob_mutacion)
+        
+        # 2.4 REPARACIÓN
+        for hijo in hijos:
+            self.reparar_restricciones(hijo)
+        
+        # 2.5 EVALUACIÓN (toda la generación en un solo lote)
+        self.calcular_fitness_poblacion(hijos)
+        
+        # 2.6 ELITISMO
+        num_elite = int(self.tam_poblacion * self.tasa_elitismo)
+        elite = sorted(poblacion, key=lambda x: x.fitness, reverse=True)[:num_elite]
+        
+        # 2.7 REEMPLAZO
+        poblacion = elite + hijos[:(self.tam_poblacion - num_elite)]
+        
+        return poblacion
+    
+    def _actualizar_mejor(self, poblacion):
+        """Actualiza mejor_global con la población; devuelve True si mejoró"""
+        mejor_gen = max(poblacion, key=lambda x: x.fitness)
+        if mejor_gen.fitness > self.mejor_global.fitness:
+            self.mejor_global = mejor_gen.copy()
+            return True
+        return False
+    
+    def _abrir_pool(self):
+        """Publica las tablas del fitness en memoria compartida y lanza el pool"""
+        self._bloques, descriptores = _publicar_tablas(self._tablas)
+        self._pool = mp.Pool(self.n_workers, initializer=_inicializar_trabajador,
+                             initargs=(descriptores, self._dimensiones, self.pesos))
+        self._log(f"⚙️  Evaluación de fitness en {self.n_workers} procesos")
+    
+    def _cerrar_pool(self):
+        """Termina el pool y libera la memoria compartida"""
+        if self._pool is None:
+            return
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+        for bloque in self._bloques:
+            bloque.close()
+            bloque.unlink()
+        self._bloques = []
+    
+    def _guardar_control(self, huella, poblacion, generacion, sin_mejora):
+        """Guarda población, mejor individuo y estado del generador aleatorio"""
+        self.control.guardar('OptimizadorGenetico', huella, {
+            'poblacion': np.stack([c.salones for c in poblacion]),
+            'mejor': self.mejor_global.salones,
+            'generacion': generacion,
+            'sin_mejora': sin_mejora,
+            'historial_fitness': self.historial_fitness,
+            'rng': self.rng.bit_generator.state,
+        })
+    
+    def _huella_control(self, df_inicial):
+        """Huella del punto de control: entrada, parámetros evolutivos, pesos y restricciones"""
+        parametros = (self.tam_poblacion, self.num_generaciones, self.prob_cruzamiento,
+                      self.prob_mutacion_inicial, self.tasa_elitismo, self.semilla)
+        return huella_horario(df_inicial, parametros, sorted(self.pesos.items()), self.catalogos.huella())
+    
+    def _reanudar(self, estado, df_inicial):
+        """Compila el modelo y restaura la población del punto de control (re-evaluada)"""
+        self._compilar_modelo(df_inicial.copy())
+        poblacion = [Cromosoma(fila) for fila in estado['poblacion']]
+        self.calcular_fitness_poblacion(poblacion)
+        self.mejor_global = Cromosoma(estado['mejor'])
+        self.calcular_fitness(self.mejor_global)
+        self.historial_fitness = list(estado['historial_fitness'])
+        self.rng.bit_generator.state = estado['rng']
+        return poblacion
+    
+    def _reportar(self, generacion, forzar=False):
+        """Evento de progreso con el mejor individuo (limitado por intervalo salvo `forzar`)"""
+        if self.control.progreso is None or not (forzar or self.control.toca_reportar()):
+            return
+        mejor = self.mejor_global
+        self.control.reportar('evolucion', generacion, self.num_generaciones, metodo='OptimizadorGenetico',
+                              fitness=float(mejor.fitness), penalizaciones=dict(mejor.penalizaciones),
+                              costos=dict(mejor.costos))
+    
+    def evolucionar(self, df_inicial):
+        """
+        Ejecuta el algoritmo genético completo
+        """
+        self._usar_pool = self.n_workers > 1
+        try:
+            return self._evolucionar(df_inicial)
+        finally:
+            self._usar_pool = False
+            self._cerrar_pool()
+    
+    def _evolucionar(self, df_inicial):
+        self._log("\n" + "="*80)
+        self._log("🧬 ALGORITMO GENÉTICO - OPTIMIZACIÓN EVOLUTIVA")
+        self._log("="*80 + "\n")
+        
+        self.control.iniciar()
+        self.interrumpido = False
+        huella = self._huella_control(df_inicial)
+        
+        # 1. INICIALIZACIÓN (o reanudar desde el punto de control de la misma entrada y parámetros)
+        estado = self.control.cargar('OptimizadorGenetico', huella)
+        if estado is None:
+            self._log("📊 Inicializando población...")
+            poblacion = self._poblacion_inicial(df_inicial)
+            generacion_inicial = 1
+            generaciones_sin_mejora = 0
+        else:
+            poblacion = self._reanudar(estado, df_inicial)
+            generacion_inicial = estado['generacion'] + 1
+            generaciones_sin_mejora = estado['sin_mejora']
+            self._log(f"♻️  Reanudando desde {self.control.punto_control} (generación {estado['generacion']})")
+        
         self._log(f"✅ Población inicial: {self.tam_poblacion} individuos")
         self._log(f"   Mejor fitness inicial: {self.mejor_global.fitness:.0f}")
         self._log(f"   Inválidos: {self.mejor_global.penalizaciones['invalidos']}")
+        self._reportar(generacion_inicial - 1, forzar=True)
+        ultima_generacion = generacion_inicial - 1
         
         # 2. EVOLUCIÓN
         self._log(f"\n🔄 Iniciando evolución ({self.num_generaciones} generaciones máx)...\n")
         
-        generaciones_sin_mejora = 0
-        
-        for generacion in range(1, self.num_generaciones + 1):
-            # 2.1 SELECCIÓN
-            padres = []
-            for _ in range(self.tam_poblacion):
-                padre = self.seleccion_torneo(poblacion, k=3)
-                padres.append(padre)
-            
-            # 2.2 CRUZAMIENTO
-            hijos = []
-            for i in range(0, self.tam_poblacion - 1, 2):
-                if random.random() < self.prob_cruzamiento:
-                    hijo1, hijo2 = self.cruzamiento_uniforme(padres[i], padres[i+1])
-                else:
-                    hijo1, hijo2 = padres[i].copy(), padres[i+1].copy()
-                
-                hijos.append(hijo1)
-                hijos.append(hijo2)
-            
-            # Si falta uno (población impar)
-            if len(hijos) < self.tam_poblacion:
-                hijos.append(padres[-1].copy())
-            
-            # 2.3 MUTACIÓN (adaptativa)
-            prob_mutacion = self.prob_mutacion_inicial * (1 - generacion / self.num_generaciones)
-            for hijo in hijos:
-                self.mutacion(hijo, prob_mutacion)
-            
-            # 2.4 REPARACIÓN
-            for hijo in hijos:
-                self.reparar_restricciones(hijo)
-            
-            # 2.5 EVALUACIÓN
-            for hijo in hijos:
-                self.calcular_fitness(hijo)
-            
-            # 2.6 ELITISMO
-            num_elite = int(self.tam_poblacion * self.tasa_elitismo)
-            elite = sorted(poblacion, key=lambda x: x.fitness, reverse=True)[:num_elite]
+        for generacion in range(generacion_inicial, self.num_generaciones + 1):
+            # Presupuesto de tiempo: conservar el mejor y guardar para reanudar
+            if self.control.agotado():
+                self._log(f"\n⏱️  Tiempo agotado en generación {generacion}: se conserva el mejor individuo")
+                self.interrumpido = True
+                self._guardar_control(huella, poblacion, generacion - 1, generaciones_sin_mejora)
+                break
             
-            # 2.7 REEMPLAZO
-            poblacion = elite + hijos[:(self.tam_poblacion - num_elite)]
+            # 2.1 - 2.7 SELECCIÓN, CRUZAMIENTO, MUTACIÓN, REPARACIÓN, EVALUACIÓN, ELITISMO, REEMPLAZO
+            poblacion = self._nueva_generacion(poblacion, generacion)
             
             # 2.8 ACTUALIZAR MEJOR
-            mejor_gen = max(poblacion, key=lambda x: x.fitness)
-            if mejor_gen.fitness > self.mejor_global.fitness:
-                self.mejor_global = mejor_gen.copy()
+            if self._actualizar_mejor(poblacion):
                 generaciones_sin_mejora = 0
             else:
                 generaciones_sin_mejora += 1
             
             self.historial_fitness.append(self.mejor_global.fitness)
+            ultima_generacion = generacion
+            self._reportar(generacion)
+            
+            if self.control.toca_guardar():
+                self._guardar_control(huella, poblacion, generacion, generaciones_sin_mejora)
             
             # 2.9 CRITERIO DE PARADA
             if generaciones_sin_mejora >= 50:
@@ -509,6 +663,10 @@ class OptimizadorGenetico:
                          f"Movimientos={mov:3d} | "
                          f"Distancia={dist:4.0f}")
         
+        if not self.interrumpido:
+            self.control.eliminar()
+        self._reportar(ultima_generacion, forzar=True)
+        
         # 3. RESULTADO FINAL
         self._log("\n" + "="*80)
         self._log("✅ EVOLUCIÓN COMPLETADA")
@@ -525,6 +683,261 @@ class OptimizadorGenetico:
         
         return self.cromosoma_a_df(self.mejor_global, df_inicial)
 
+# ----------------------------------------------------------------------
+# Modelo de islas (una población por proceso, con migración periódica)
+# ----------------------------------------------------------------------
+
+def _destinos_migracion(num_islas, topologia, entropia, epoca):
+    """
+    Isla destino de los migrantes de cada isla en una época
+    
+    Todas las islas calculan la misma asignación (misma entropía y época),
+    así cada isla recibe exactamente un envío por época.
+    """
+    if topologia == 'anillo':
+        return [(i + 1) % num_islas for i in range(num_islas)]
+    
+    # 'aleatoria': permutación sin puntos fijos
+    rng = np.random.default_rng([entropia, epoca])
+    while True:
+        destinos = rng.permutation(num_islas)
+        if not np.any(destinos == np.arange(num_islas)):
+            return destinos.tolist()
+
+
+def _recibir_migrantes(buzon, barrera):
+    """Espera el envío de la época (aborta si otra isla falló)"""
+    while True:
+        try:
+            return buzon.get(timeout=1.0)
+        except queue.Empty:
+            if barrera.broken:
+                raise threading.BrokenBarrierError("Otra isla terminó con error")
+
+
+def _ejecutar_isla(indice, parametros, df_inicial, config, buzones, resultados,
+                   barrera, convergidas, detener):
+    """
+    Evoluciona una isla en su propio proceso, intercambiando migrantes cada época
+    
+    Si otra isla falla (barrera rota) la isla entrega el mejor individuo que
+    lleva; si falla ella misma entrega un resultado vacío y rompe la barrera.
+    """
+    try:
+        optimizador = OptimizadorGenetico(verbose=False, **parametros)
+        poblacion = optimizador._poblacion_inicial(df_inicial)
+        
+        generacion = 0
+        sin_mejora = 0
+        epoca = 0
+        while True:
+            # Evolucionar hasta la siguiente migración (si la isla no ha convergido)
+            for _ in range(config['intervalo_migracion']):
+                if sin_mejora >= 50 or generacion >= optimizador.num_generaciones:
+                    break
+                generacion += 1
+                poblacion = optimizador._nueva_generacion(poblacion, generacion)
+                if optimizador._actualizar_mejor(poblacion):
+                    sin_mejora = 0
+                else:
+                    sin_mejora += 1
+                optimizador.historial_fitness.append(optimizador.mejor_global.fitness)
+            
+            # Migración: los mejores van a la isla destino y reemplazan a sus peores
+            destinos = _destinos_migracion(config['num_islas'], config['topologia'], config['entropia'], epoca)
+            emigrantes = sorted(poblacion, key=lambda x: x.fitness, reverse=True)[:config['num_migrantes']]
+            buzones[destinos[indice]].put(np.stack([c.salones for c in emigrantes]))
+            inmigrantes = [Cromosoma(fila) for fila in _recibir_migrantes(buzones[indice], barrera)]
+            optimizador.calcular_fitness_poblacion(inmigrantes)
+            poblacion = sorted(poblacion, key=lambda x: x.fitness)[len(inmigrantes):] + inmigrantes
+            if optimizador._actualizar_mejor(poblacion):
+                sin_mejora = 0
+            epoca += 1
+            
+            # Parada global: todas convergidas o tiempo agotado (decide la isla 0)
+            convergidas[indice] = sin_mejora >= 50 or generacion >= optimizador.num_generaciones
+            barrera.wait()
+            if indice == 0 and (all(convergidas) or time.time() >= config['fin']):
+                detener.set()
+            barrera.wait()
+            if detener.is_set():
+                break
+        
+        resultados.put((indice, optimizador.mejor_global.salones, optimizador.mejor_global.fitness,
+                        generacion, optimizador.historial_fitness))
+    except threading.BrokenBarrierError:
+        resultados.put((indice, optimizador.mejor_global.salones, optimizador.mejor_global.fitness,
+                        generacion, optimizador.historial_fitness))
+    except BaseException:
+        barrera.abort()
+        resultados.put((indice, None, None, 0, []))
+        raise
+
+
+class OptimizadorGeneticoIslas:
+    """
+    Algoritmo Genético con modelo de islas
+    
+    Cada isla es una población independiente (su propio proceso, semilla y
+    tasas de cruce/mutación). Cada `intervalo_migracion` generaciones los
+    mejores individuos de cada isla migran a otra según la topología
+    ('anillo' o 'aleatoria') y reemplazan a los peores del destino.
+    La ejecución termina cuando todas las islas convergen (50 generaciones
+    sin mejora o num_generaciones) o se agota `tiempo_limite_s`.
+    Si una isla falla o muere, las demás se detienen y se usa el mejor
+    resultado de las que sobrevivieron (islas_fallidas las enumera).
+    """
+    
+    # Segundos de espera tras el tiempo límite antes de detener (y luego terminar) las islas
+    PLAZO_GRACIA_S = 30.0
+    
+    def __init__(self, num_islas=4, intervalo_migracion=10, num_migrantes=2,
+                 topologia='anillo', tiempo_limite_s=None, parametros_islas=None,
+                 semilla=None, verbose=True, fecha_limite=None, **parametros_base):
+        """
+        Args:
+            num_islas: Número de poblaciones (procesos)
+            intervalo_migracion: Generaciones entre migraciones
+            num_migrantes: Individuos que migra cada isla por época
+            topologia: 'anillo' o 'aleatoria'
+            tiempo_limite_s: Presupuesto global de tiempo en segundos (None = sin límite)
+            parametros_islas: Lista opcional de dicts con parámetros propios de cada
+                isla (p. ej. {'prob_mutacion': 0.2}); completan a parametros_base
+            semilla: Semilla global (cada isla recibe una semilla derivada)
+            verbose: Mostrar progreso
+            fecha_limite: Instante límite absoluto (time.time()), se combina con tiempo_limite_s
+            **parametros_base: Parámetros de OptimizadorGenetico comunes a todas las islas
+        """
+        if topologia not in ('anillo', 'aleatoria'):
+            raise ValueError(f"Topología no soportada: {topologia}")
+        if num_islas < 2:
+            raise ValueError("El modelo de islas requiere al menos 2 islas")
+        
+        self.num_islas = num_islas
+        self.intervalo_migracion = intervalo_migracion
+        self.num_migrantes = num_migrantes
+        self.topologia = topologia
+        self.tiempo_limite_s = tiempo_limite_s
+        self.fecha_limite = fecha_limite
+        self.verbose = verbose
+        
+        # Parámetros por isla (cada isla evalúa en serie: el paralelismo es entre islas)
+        semillas = np.random.SeedSequence(semilla)
+        self._entropia = semillas.entropy
+        self.parametros_islas = []
+        for i, semilla_isla in enumerate(semillas.spawn(num_islas)):
+            parametros = dict(parametros_base)
+            if parametros_islas and i < len(parametros_islas):
+                parametros.update(parametros_islas[i])
+            parametros['semilla'] = semilla_isla
+            parametros['n_workers'] = 1
+            self.parametros_islas.append(parametros)
+        
+        # Optimizador local: compila el modelo y reporta la mejor solución
+        self.base = OptimizadorGenetico(verbose=False, **self.parametros_islas[0])
+        self.mejor_global = None
+        self.historial_islas = []
+        self.islas_fallidas = []
+    
+    def _log(self, mensaje):
+        """Imprime mensaje si verbose=True"""
+        if self.verbose:
+            print(mensaje)
+    
+    def evolucionar(self, df_inicial):
+        """Ejecuta todas las islas y devuelve el DataFrame de la mejor solución"""
+        self._log("\n" + "="*80)
+        self._log(f"🏝️  ALGORITMO GENÉTICO - MODELO DE ISLAS ({self.num_islas} islas, {self.topologia})")
+        self._log("="*80)
+        
+        inicio = time.time()
+        control = ControlEjecucion(self.tiempo_limite_s, self.fecha_limite)
+        config = {
+            'num_islas': self.num_islas,
+            'intervalo_migracion': self.intervalo_migracion,
+            'num_migrantes': self.num_migrantes,
+            'topologia': self.topologia,
+            'entropia': self._entropia,
+            'fin': control.fin,
+        }
+        buzones = [mp.Queue() for _ in range(self.num_islas)]
+        resultados = mp.Queue()
+        barrera = mp.Barrier(self.num_islas)
+        convergidas = mp.Array('b', self.num_islas)
+        detener = mp.Event()
+        
+        procesos = [
+            mp.Process(target=_ejecutar_isla,
+                       args=(i, self.parametros_islas[i], df_inicial, config, buzones,
+                             resultados, barrera, convergidas, detener))
+            for i in range(self.num_islas)
+        ]
+        for proceso in procesos:
+            proceso.start()
+        
+        # Recoger resultados antes de join (las colas deben vaciarse)
+        por_isla = self._recoger_resultados(procesos, resultados, barrera, control.fin)
+        for proceso in procesos:
+            proceso.join(timeout=self.PLAZO_GRACIA_S)
+            if proceso.is_alive():
+                proceso.terminate()
+                proceso.join()
+        
+        self.islas_fallidas = sorted(set(range(self.num_islas)) - set(por_isla))
+        if not por_isla:
+            raise RuntimeError("Todas las islas terminaron con error")
+        if self.islas_fallidas:
+            self._log(f"⚠️  Islas con error: {self.islas_fallidas} (se usan las demás)")
+        
+        self.historial_islas = [por_isla[i][3] if i in por_isla else [] for i in range(self.num_islas)]
+        for i, (_, fitness, generaciones, _) in sorted(por_isla.items()):
+            self._log(f"   Isla {i}: Fitness={fitness:8.0f} | Generaciones={generaciones}")
+        
+        # Mejor solución entre todas las islas (se re-evalúa para el desglose)
+        salones, _, _, _ = max(por_isla.values(), key=lambda r: r[1])
+        self.base._compilar_modelo(df_inicial.copy())
+        self.mejor_global = Cromosoma(salones)
+        self.base.calcular_fitness(self.mejor_global)
+        
+        self._log(f"\n✅ Mejor fitness: {self.mejor_global.fitness:.0f} ({time.time() - inicio:.1f}s)")
+        return self.base.cromosoma_a_df(self.mejor_global, df_inicial)
+    
+    def _recoger_resultados(self, procesos, resultados, barrera, fin):
+        """
+        Resultados de las islas que terminaron bien ({isla: (salones, fitness, generaciones, historial)})
+        
+        Una isla que muere sin entregar resultado (o entrega uno vacío) rompe la
+        barrera: las demás se detienen y entregan su mejor individuo. Pasado el
+        tiempo límite más PLAZO_GRACIA_S también se rompe la barrera, y tras otro
+        plazo se terminan las islas que no respondieron.
+        """
+        por_isla = {}
+        pendientes = set(range(len(procesos)))
+        while pendientes:
+            # Muertas antes de esperar: si su resultado no llega en esta espera, no llegará
+            muertas = {i for i in pendientes if procesos[i].exitcode is not None}
+            try:
+                indice, salones, fitness, generaciones, historial = resultados.get(timeout=1.0)
+            except queue.Empty:
+                fallidas = muertas
+                if fin is not None and time.time() >= fin + 2 * self.PLAZO_GRACIA_S:
+                    for i in pendientes:
+                        procesos[i].terminate()
+                    fallidas = set(pendientes)
+                elif fin is not None and time.time() >= fin + self.PLAZO_GRACIA_S:
+                    barrera.abort()
+                if fallidas:
+                    barrera.abort()
+                    pendientes -= fallidas
+                continue
+            pendientes.discard(indice)
+            if salones is None:
+                barrera.abort()
+            else:
+                por_isla[indice] = (salones, fitness, generaciones, historial)
+        return por_isla
+
+
 def main():
     """Función principal"""
     print("🧬 Optimizador Genético - Sistema de Salones ISC")
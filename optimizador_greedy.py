@@ -8,7 +8,7 @@ ACTUALIZADO: Integra restricciones de teoría/lab y preferencias de profesores
 import pandas as pd
 import numpy as np
 import random
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 import sys
 import os
 
@@ -16,54 +16,66 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from analizar_movimientos import AnalizadorMovimientos
 from utils_restricciones import (
-    cargar_configuraciones,
-    determinar_tipo_hora,
-    obtener_preferencia_profesor,
-    es_preferencia_prioritaria,
+    Catalogos,
     filtrar_salones_por_tipo,
     pre_asignar_prioritarias
 )
+from modelo_horario import ModeloHorario
+from control_ejecucion import ControlEjecucion, huella_horario
 
 class OptimizadorGreedyHC:
-    def __init__(self, max_iter_hc=100, verbose=True):
+    TITULO = "⚡ GREEDY + HILL CLIMBING - OPTIMIZACIÓN RÁPIDA"
+    
+    def __init__(self, max_iter_hc=100, verbose=True, intentos_por_iteracion=50, semilla=None,
+                 vecindario='slot', tiempo_limite_s=None, fecha_limite=None,
+                 punto_control=None, intervalo_control_s=60.0, progreso=None, intervalo_progreso_s=0.5,
+                 catalogos=None):
         """
         Optimizador Greedy + Hill Climbing
         
         Args:
             max_iter_hc: Iteraciones de hill climbing
             verbose: Mostrar progreso
+            intentos_por_iteracion: Movimientos aleatorios probados por iteración
+            semilla: Semilla de los desempates y movimientos aleatorios (None = no determinista)
+            vecindario: 'slot' (movimientos dentro de un mismo día/bloque) o
+                        'pares' (swap de dos clases cualesquiera del mismo tipo)
+            tiempo_limite_s: Presupuesto de tiempo de optimizar() en segundos; al
+                             agotarse se devuelve la mejor solución encontrada
+            fecha_limite: Instante límite absoluto (time.time())
+            punto_control: Archivo para guardar el progreso y reanudar corridas interrumpidas
+            intervalo_control_s: Segundos entre puntos de control
+            progreso: Función que recibe eventos de progreso (fase, iteración, mejor
+                      energía, penalizaciones, tiempo transcurrido)
+            intervalo_progreso_s: Segundos mínimos entre eventos de progreso
+            catalogos: Catálogos ya cargados (None = leerlos de disco)
         """
+        if vecindario not in ('slot', 'pares'):
+            raise ValueError(f"Vecindario no soportado: {vecindario}")
         self.max_iter_hc = max_iter_hc
+        self.intentos_por_iteracion = intentos_por_iteracion
         self.verbose = verbose
-        
-        # Cargar configuraciones de restricciones
-        self._log("📂 Cargando configuraciones de restricciones...")
-        self.config_materias, self.preferencias_profesores = cargar_configuraciones()
-        
-        # Cargar asignación de grupos de 1er semestre
-        import json
-        from pathlib import Path
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        grupos_1er_path = Path(script_dir) / "asignacion_grupos_1er_semestre.json"
-        self.asignacion_grupos_1er = None
-        if grupos_1er_path.exists():
-            try:
-                with open(grupos_1er_path, 'r', encoding='utf-8') as f:
-                    self.asignacion_grupos_1er = json.load(f)
-                self._log(f"✅ Asignación de grupos 1er semestre cargada: {len(self.asignacion_grupos_1er)} grupos")
-            except Exception as e:
-                self._log(f"⚠️  Error cargando asignación grupos 1er semestre: {e}")
-        
-        # Cargar índices inmutables (PRIORIDAD 1)
-        inmutables_path = Path(script_dir) / "datos_estructurados" / "indices_inmutables_p1.json"
-        self.indices_inmutables = set()
-        if inmutables_path.exists():
-            try:
-                with open(inmutables_path, 'r') as f:
-                    self.indices_inmutables = set(json.load(f))
-                self._log(f"✅ Índices inmutables cargados: {len(self.indices_inmutables)} clases")
-            except Exception as e:
-                self._log(f"⚠️  Error cargando índices inmutables: {e}")
+        self.vecindario = vecindario
+        self.control = ControlEjecucion(tiempo_limite_s, fecha_limite, punto_control, intervalo_control_s,
+                                        progreso, intervalo_progreso_s)
+        self.interrumpido = False
+        self._estado_base = None
+        self._iteracion_reanudada = 0
+        self._reanudado = {}          # Estado cargado del punto de control (vacío si no se reanudó)
+        self._extra_control = {}      # Estado propio de la búsqueda que se guarda en el punto de control
+        self.aleatorio = random.Random(semilla)
+        
+        # Cargar configuraciones de restricciones, grupos de 1er semestre e
+        # índices inmutables (PRIORIDAD 1), o reutilizar los ya cargados
+        if catalogos is None:
+            self._log("📂 Cargando configuraciones de restricciones...")
+            catalogos = Catalogos(verbose=verbose)
+        self.catalogos = catalogos
+        self.config_materias = catalogos.config_materias
+        self.preferencias_profesores = catalogos.preferencias_profesores
+        self.tabla_preferencias = catalogos.tabla_preferencias
+        self.asignacion_grupos_1er = catalogos.asignacion_grupos_1er
+        self.indices_inmutables = catalogos.indices_inmutables
         
         # Catálogos (CORREGIDOS - basados en datos reales)
         self.salones_invalidos = {'AV1', 'AV2', 'AV4', 'AV5', 'E11'}
@@ -71,95 +83,300 @@ class OptimizadorGreedyHC:
         self.salones_teoria = {'FF1', 'FF2', 'FF3', 'FF4', 'FF5', 'FF6', 'FF7', 'FF8', 'FF9', 'FFA', 'FFB', 'FFC', 'FFD'}
         self.todos_salones = self.salones_teoria | self.laboratorios
         
-        # Matriz de distancias
-        self.matriz_distancias = self._crear_matriz_distancias()
-        
-    def _crear_matriz_distancias(self) -> Dict:
-        """Crea matriz de distancias entre salones"""
-        distancias = {}
-        
-        # FF entre sí
-        salones_ff = ['FF1', 'FF2', 'FF3', 'FF4', 'FF5', 'FF6', 'FF7', 'FF8', 'FF9', 'FFA', 'FFB', 'FFC', 'FFD']
-        for i, s1 in enumerate(salones_ff):
-            for j, s2 in enumerate(salones_ff):
-                distancias[(s1, s2)] = abs(i - j) * 5
+        # Modelo de distancias y pisos (el mismo que usan las métricas de movimientos)
+        self.analizador_mov = catalogos.analizador_mov
         
-        # FF a Labs
-        labs = list(self.laboratorios)
-        for s1 in salones_ff:
-            for s2 in labs:
-                distancias[(s1, s2)] = 50
-                distancias[(s2, s1)] = 50
+        # Modelo compilado del horario (se crea por corrida)
+        self.modelo = None
         
-        # Labs entre sí
-        for i, s1 in enumerate(labs):
-            for j, s2 in enumerate(labs):
-                distancias[(s1, s2)] = abs(i - j) * 8
-        
-        return distancias
-    
     def _log(self, mensaje: str):
         if self.verbose:
             print(mensaje)
     
-    def calcular_energia(self, solucion: Dict, df: pd.DataFrame) -> float:
-        """Calcula energía de la solución (menor es mejor)"""
-        energia = 0
+    def _modelo_para(self, df: pd.DataFrame) -> ModeloHorario:
+        """Compila el horario a arreglos (una vez por DataFrame) y prepara tablas"""
+        if self.modelo is None or self.modelo.origen is not df:
+            self.modelo = ModeloHorario(
+                df, self.config_materias, self.preferencias_profesores,
+                self.laboratorios, self.salones_teoria, self.salones_invalidos,
+                tabla_preferencias=self.tabla_preferencias
+            )
+            m = self.modelo
+            # Distancias del analizador en la escala de la energía (1 salón adyacente = 5)
+            self._distancias = 5.0 * self.catalogos.distancias(m.salones)
+            self._pares_profesor = m.pares_consecutivos(por_dia=False, solo_profesores_validos=False)
+            self._costo_movimiento = 0.5 * self._distancias
+            np.fill_diagonal(self._costo_movimiento, 0.0)
+            # Vecinos en la cadena de clases de cada profesor (-1 = no hay)
+            a, b = self._pares_profesor
+            self._anterior = np.full(m.n, -1, dtype=np.int64)
+            self._siguiente = np.full(m.n, -1, dtype=np.int64)
+            self._anterior[b] = a
+            self._siguiente[a] = b
+            indices_inmutables = self.catalogos.inmutables_para(df)
+            self._inmutables = np.array([idx in indices_inmutables for idx in m.indices], dtype=bool)
+            # Índice por slot: clases que comparten (día, bloque)
+            orden_slot = np.argsort(m.slot, kind='stable')
+            cortes = np.searchsorted(m.slot[orden_slot], np.arange(m.n_slots + 1))
+            self._clases_slot = [orden_slot[a:b] for a, b in zip(cortes[:-1], cortes[1:])]
+            self._fijar_tipos(m.requiere_lab)
+            self._fijar_dominios(m.salon_inicial, self._inmutables)
+        return self.modelo
+    
+    def _fijar_tipos(self, requiere_lab: np.ndarray):
+        """Fija el tipo requerido por clase (y las preferencias que dependen de él)"""
+        self._requiere_lab = requiere_lab
+        self._pref_salon, self._pref_prioritaria = self.modelo.preferencias(
+            por_materia=False, requiere_lab=requiere_lab
+        )
         
-        # Rastrear horas asignadas por materia
-        horas_asignadas = {}
+        # Costo por clase de cada salón posible (inválido + tipo + preferencia): [n, salones]
+        m = self.modelo
+        salones = np.arange(m.n_salones)
+        costo = 1000.0 * m.salon_es_invalido[None, :]
+        costo = costo + 500.0 * (m.salon_es_lab[None, :] != requiere_lab[:, None])
+        viola = (self._pref_salon[:, None] >= 0) & (self._pref_salon[:, None] != salones[None, :])
+        costo += viola * np.where(self._pref_prioritaria, 300.0, 20.0)[:, None]
+        self._costo_clase = costo
+    
+    def _fijar_dominios(self, salones: np.ndarray, fijas: np.ndarray):
+        """
+        Dominio factible de cada clase para el tipo fijado (ver ModeloHorario.dominios)
         
-        for idx, salon in solucion.items():
-            row = df.loc[idx]
-            profesor = row['Profesor']
-            grupo = row['Grupo']
-            materia = row['Materia']
-            
-            # Determinar tipo de hora
-            key = (grupo, materia)
-            indice_hora = horas_asignadas.get(key, 0)
-            tipo_requerido = determinar_tipo_hora(materia, indice_hora, self.config_materias)
-            horas_asignadas[key] = indice_hora + 1
-            
-            # Penalización por asignación inválida (salón no válido)
-            if salon in self.salones_invalidos:
-                energia += 1000
-            
-            # Penalización por tipo incorrecto (teoría en lab o viceversa)
-            es_lab = salon in self.laboratorios
-            requiere_lab = tipo_requerido == 'Laboratorio'
-            if es_lab != requiere_lab:
-                energia += 500  # Penalización fuerte por tipo incorrecto
-            
-            # Penalización por violar preferencias prioritarias
-            pref_salon = obtener_preferencia_profesor(profesor, tipo_requerido, self.preferencias_profesores)
-            es_prioritaria = es_preferencia_prioritaria(profesor, tipo_requerido, self.preferencias_profesores)
-            
-            if es_prioritaria and pref_salon and pref_salon != salon:
-                energia += 300  # Penalización muy fuerte por violar preferencia prioritaria
-            elif pref_salon and pref_salon != salon:
-                energia += 20  # Penalización leve por no respetar preferencia opcional
-        
-        # Calcular movimientos de profesores
-        for profesor in df['Profesor'].unique():
-            clases_profesor = df[df['Profesor'] == profesor].index
-            salones_profesor = [solucion[i] for i in clases_profesor if i in solucion]
-            
-            # Contar cambios de salón
-            for i in range(len(salones_profesor) - 1):
-                if salones_profesor[i] != salones_profesor[i+1]:
-                    dist = self.matriz_distancias.get((salones_profesor[i], salones_profesor[i+1]), 50)
-                    energia += dist * 0.5
-        
-        # Conflictos de ocupación (dos clases en el mismo lugar a la misma hora)
-        ocupacion = {}
-        for idx, salon in solucion.items():
-            key = (df.loc[idx]['Dia'], df.loc[idx]['Bloque_Horario'], salon)
-            if key in ocupacion:
-                energia += 5000  # Penalización muy alta por conflicto
-            ocupacion[key] = idx
+        Las clases prioritarias ya registradas se fijan en su salón prioritario
+        (la corrección final las deja ahí aunque la pre-asignación las moviera).
+        """
+        m = self.modelo
+        salones = salones.copy()
+        for idx, info in getattr(self, 'clases_prioritarias_info', {}).items():
+            salones[m.posicion[idx]] = m.codigo_salon[info['salon_prioritario']]
+        self._dominios = m.dominios(self._requiere_lab, salones, fijas, self.asignacion_grupos_1er)
+        self._fijar_movibles(salones)
+    
+    def _fijar_movibles(self, salones: np.ndarray):
+        """Movibles: clases no inmutables salvo las de dominio de un salón que ya están en él"""
+        en_su_salon = self._dominios.fijas & self._dominios.contiene(np.arange(self.modelo.n), salones)
+        self._es_movible = ~self._inmutables & ~en_su_salon
+        self._movibles_hc = np.flatnonzero(self._es_movible)
+    
+    def _orden_solucion(self, solucion: Dict) -> List[int]:
+        """Posiciones en el orden de la solución (las horas teoría/lab se cuentan en ese orden)"""
+        return [self.modelo.posicion[idx] for idx in solucion]
+    
+    # Peso de cada término de la energía (ver _penalizaciones)
+    PESOS_ENERGIA = {
+        'invalidos': 1000,
+        'tipo_incorrecto': 500,
+        'preferencia_prioritaria': 300,
+        'preferencia_opcional': 20,
+        'distancia': 0.5,
+        'conflictos': 5000,
+    }
+    
+    def _penalizaciones(self, salones: np.ndarray) -> Dict[str, float]:
+        """Términos de la energía sin ponderar (conteos y distancia total)"""
+        m = self.modelo
+        viola = (self._pref_salon >= 0) & (self._pref_salon != salones)
+        
+        # Movimientos de profesores (clases consecutivas en distinto salón)
+        a, b = self._pares_profesor
+        sa, sb = salones[a], salones[b]
+        cambia = sa != sb
+        
+        return {
+            # Asignación inválida (salón no válido)
+            'invalidos': int(np.count_nonzero(m.salon_es_invalido[salones])),
+            # Tipo incorrecto (teoría en lab o viceversa)
+            'tipo_incorrecto': int(np.count_nonzero(m.salon_es_lab[salones] != self._requiere_lab)),
+            # Preferencias violadas (prioritarias / opcionales)
+            'preferencia_prioritaria': int(np.count_nonzero(viola & self._pref_prioritaria)),
+            'preferencia_opcional': int(np.count_nonzero(viola & ~self._pref_prioritaria)),
+            'distancia': float(self._distancias[sa[cambia], sb[cambia]].sum()),
+            # Conflictos de ocupación (dos clases en el mismo lugar a la misma hora)
+            'conflictos': int(np.maximum(self._ocupacion(salones) - 1, 0).sum()),
+        }
+    
+    def _energia(self, salones: np.ndarray) -> float:
+        """Energía de un vector de salones codificado (menor es mejor)"""
+        penalizaciones = self._penalizaciones(salones)
+        return float(sum(peso * penalizaciones[k] for k, peso in self.PESOS_ENERGIA.items()))
+    
+    def _reportar(self, fase: str, iteracion: int, total: Optional[int], salones: np.ndarray,
+                  energia: float, forzar: bool = False, **datos):
+        """Evento de progreso con la mejor energía y su desglose (limitado por intervalo salvo `forzar`)"""
+        if self.control.progreso is None or not (forzar or self.control.toca_reportar()):
+            return
+        self.control.reportar(fase, iteracion, total, metodo=type(self).__name__, energia=float(energia),
+                              penalizaciones=self._penalizaciones(salones), **datos)
+    
+    def _ocupacion(self, salones: np.ndarray) -> np.ndarray:
+        """Clases por celda (slot, salón), aplanada como slot * n_salones + salón"""
+        m = self.modelo
+        return np.bincount(m.slot * m.n_salones + salones, minlength=m.n_slots * m.n_salones)
+    
+    def _delta_swap(self, salones: np.ndarray, ocupacion: np.ndarray, i: int, j: int) -> float:
+        """
+        Cambio exacto de energía al intercambiar los salones de las clases i y j
+        
+        Solo recalcula las dos clases, sus vecinos en la cadena del profesor y
+        las cuatro celdas (slot, salón) afectadas. Deja `salones` sin modificar.
         
-        return energia
+        Args:
+            salones: Vector de salones codificado de la solución actual
+            ocupacion: Ocupación de la solución actual (ver _ocupacion)
+            i, j: Posiciones de las clases a intercambiar
+        
+        Returns:
+            energía(vecino) - energía(actual)
+        """
+        si, sj = salones[i], salones[j]
+        if si == sj:
+            return 0.0
+        
+        costo = self._costo_clase
+        delta = costo[i, sj] + costo[j, si] - costo[i, si] - costo[j, sj]
+        
+        # Movimientos: aristas de la cadena del profesor que tocan i o j (sin duplicar i-j)
+        aristas = set()
+        for k in (i, j):
+            if self._anterior[k] >= 0:
+                aristas.add((self._anterior[k], k))
+            if self._siguiente[k] >= 0:
+                aristas.add((k, self._siguiente[k]))
+        mov = self._costo_movimiento
+        antes = sum(mov[salones[p], salones[q]] for p, q in aristas)
+        salones[i], salones[j] = sj, si
+        despues = sum(mov[salones[p], salones[q]] for p, q in aristas)
+        salones[i], salones[j] = si, sj
+        delta += despues - antes
+        
+        # Conflictos: i deja (slot_i, si) y entra a (slot_i, sj); j al revés
+        m = self.modelo
+        slot_i, slot_j = m.slot[i], m.slot[j]
+        if slot_i != slot_j:
+            R = m.n_salones
+            conflictos = int(ocupacion[slot_i * R + sj] >= 1) + int(ocupacion[slot_j * R + si] >= 1)
+            conflictos -= int(ocupacion[slot_i * R + si] > 1) + int(ocupacion[slot_j * R + sj] > 1)
+            delta += 5000 * conflictos
+        
+        return float(delta)
+    
+    def _delta_mover(self, salones: np.ndarray, ocupacion: np.ndarray, i: int, salon: int) -> float:
+        """
+        Cambio exacto de energía al mover la clase i al salón `salon`
+        
+        Args:
+            salones: Vector de salones codificado de la solución actual
+            ocupacion: Ocupación de la solución actual (ver _ocupacion)
+            i: Posición de la clase
+            salon: ID del salón destino
+        
+        Returns:
+            energía(vecino) - energía(actual)
+        """
+        si = salones[i]
+        if si == salon:
+            return 0.0
+        
+        delta = self._costo_clase[i, salon] - self._costo_clase[i, si]
+        
+        # Movimientos: solo las aristas con el vecino anterior y siguiente del profesor
+        mov = self._costo_movimiento
+        anterior, siguiente = self._anterior[i], self._siguiente[i]
+        if anterior >= 0:
+            delta += mov[salones[anterior], salon] - mov[salones[anterior], si]
+        if siguiente >= 0:
+            delta += mov[salon, salones[siguiente]] - mov[si, salones[siguiente]]
+        
+        # Conflictos: deja (slot, si) y entra a (slot, salon)
+        base = self.modelo.slot[i] * self.modelo.n_salones
+        delta += 5000 * (int(ocupacion[base + salon] >= 1) - int(ocupacion[base + si] > 1))
+        
+        return float(delta)
+    
+    def _aplicar_mover(self, salones: np.ndarray, ocupacion: np.ndarray, i: int, salon: int):
+        """Mueve la clase i a `salon` actualizando la ocupación en sitio"""
+        base = self.modelo.slot[i] * self.modelo.n_salones
+        ocupacion[base + salones[i]] -= 1
+        ocupacion[base + salon] += 1
+        salones[i] = salon
+    
+    def _proponer_en_slot(self, salones: np.ndarray, ocupacion: np.ndarray) -> Tuple[float, List[Tuple[int, int]]]:
+        """
+        Sortea un movimiento dentro del slot (día, bloque) de una clase no inmutable
+        
+        Solo se proponen movimientos factibles por construcción: mover la clase a
+        un salón libre de su tipo en ese slot, intercambiarla con otra clase movible
+        del mismo tipo y slot, o una cadena de expulsión (la clase toma el salón de
+        la otra y esta pasa a un salón libre). No se evalúa nada entre slots
+        distintos, que casi siempre crea conflictos.
+        
+        Returns:
+            Tuple[float, List[Tuple[int, int]]]: (delta de energía, [(clase, salón nuevo)])
+        """
+        aleatorio = self.aleatorio
+        if len(self._movibles_hc) == 0:
+            return 0.0, []
+        i = int(self._movibles_hc[aleatorio.randrange(len(self._movibles_hc))])
+        dominio = self._dominios.mascara
+        candidatos = self._dominios.salones(i)
+        
+        base = self.modelo.slot[i] * self.modelo.n_salones
+        clases = self._clases_slot[self.modelo.slot[i]]
+        libres = candidatos[ocupacion[base + candidatos] == 0]
+        # Clases del slot cuyo salón está en el dominio de i
+        pares = clases[self._es_movible[clases] & dominio[i, salones[clases]] & (clases != i)]
+        
+        k = aleatorio.randrange(len(libres) + len(pares)) if len(libres) + len(pares) else -1
+        if k < 0:
+            return 0.0, []
+        if k < len(libres):
+            salon = int(libres[k])
+            return self._delta_mover(salones, ocupacion, i, salon), [(i, salon)]
+        
+        j = int(pares[k - len(libres)])
+        si, sj = int(salones[i]), int(salones[j])
+        libres_j = libres[dominio[j, libres]]
+        if si != sj and dominio[j, si] and (len(libres_j) == 0 or aleatorio.random() < 0.5):
+            return self._delta_swap(salones, ocupacion, i, j), [(i, sj), (j, si)]
+        if len(libres_j) == 0:
+            return 0.0, []
+        
+        # Cadena de expulsión: i -> salón de j, j -> salón libre de su dominio
+        libre = int(libres_j[aleatorio.randrange(len(libres_j))])
+        cambios = [(i, sj), (j, libre)]
+        delta = self._delta_mover(salones, ocupacion, i, sj)
+        self._aplicar_mover(salones, ocupacion, i, sj)
+        delta += self._delta_mover(salones, ocupacion, j, libre)
+        self._aplicar_mover(salones, ocupacion, i, si)
+        return delta, cambios
+    
+    def _aplicar_cambios(self, salones: np.ndarray, ocupacion: np.ndarray, cambios: List[Tuple[int, int]]):
+        """Aplica en orden los cambios (clase, salón nuevo) de un movimiento propuesto"""
+        for i, salon in cambios:
+            self._aplicar_mover(salones, ocupacion, i, salon)
+    
+    def _aplicar_swap(self, salones: np.ndarray, ocupacion: np.ndarray, i: int, j: int):
+        """Intercambia los salones de i y j actualizando la ocupación en sitio"""
+        m = self.modelo
+        R = m.n_salones
+        si, sj = salones[i], salones[j]
+        ocupacion[m.slot[i] * R + si] -= 1
+        ocupacion[m.slot[j] * R + sj] -= 1
+        ocupacion[m.slot[i] * R + sj] += 1
+        ocupacion[m.slot[j] * R + si] += 1
+        salones[i], salones[j] = sj, si
+    
+    def calcular_energia(self, solucion: Dict, df: pd.DataFrame) -> float:
+        """Calcula energía de la solución (menor es mejor)"""
+        modelo = self._modelo_para(df)
+        self._fijar_tipos(modelo.tipos_en_orden(self._orden_solucion(solucion)))
+        return self._energia(modelo.codificar(solucion))
+    
+    def aplicar_solucion(self, df: pd.DataFrame, solucion: Dict) -> pd.DataFrame:
+        """Construye el DataFrame resultante (Salon, Tipo_Salon, Piso, Es_Invalido)"""
+        modelo = self._modelo_para(df)
+        return modelo.a_dataframe(modelo.codificar(solucion))
     
     def construccion_greedy(self, df: pd.DataFrame) -> Dict:
         """Fase 1: Construcción voraz con restricciones (PRE-ASIGNACIÓN PRIORITARIA)"""
@@ -176,7 +393,6 @@ class OptimizadorGreedyHC:
         self.clases_prioritarias_indices = set(solucion.keys()) - set(clases_restantes)
         # Guardar info completa para corrección final
         self.clases_prioritarias_info = {}
-        from utils_restricciones import obtener_preferencia_profesor
         for idx in self.clases_prioritarias_indices:
             row = df.loc[idx]
             profesor = row['Profesor']
@@ -184,7 +400,7 @@ class OptimizadorGreedyHC:
             tipo_salon = row['Tipo_Salon']  # Usar tipo del DataFrame directamente
             
             # Obtener salón preferido del JSON
-            salon_preferido = obtener_preferencia_profesor(profesor, tipo_salon, self.preferencias_profesores, materia)
+            salon_preferido, _ = self.tabla_preferencias.consultar(profesor, tipo_salon, materia)
             if salon_preferido:
                 self.clases_prioritarias_info[idx] = {
                     'salon_prioritario': salon_preferido,
@@ -198,8 +414,27 @@ class OptimizadorGreedyHC:
         # FASE 2: Asignar clases restantes con algoritmo greedy
         self._log(f"   📋 Asignando {len(clases_restantes)} clases restantes...")
         
-        # Rastrear horas asignadas por materia
-        horas_asignadas = {}
+        # Compilar el horario DESPUÉS de la pre-asignación (puede mover día/bloque)
+        self.modelo = None
+        m = self._modelo_para(df)
+        
+        salones = m.salon_inicial.copy()
+        asignado = np.zeros(m.n, dtype=bool)
+        for idx, salon in solucion.items():
+            pos = m.posicion[idx]
+            salones[pos] = m.codigo_salon[salon]
+            asignado[pos] = True
+        
+        ocupado = np.zeros((m.n_slots, m.n_salones), dtype=bool)
+        for dia, bloque, salon in ocupacion:
+            slot = m.slot_de(dia, bloque)
+            if slot >= 0:
+                ocupado[slot, m.codigo_salon[salon]] = True
+        
+        # Uso por salón y salones usados por cada profesor (incrementales)
+        uso = np.bincount(salones[asignado], minlength=m.n_salones)
+        salones_profesor = np.zeros((len(m.profesores), m.n_salones))
+        np.add.at(salones_profesor, (m.profesor[asignado], salones[asignado]), 1)
         
         # Ordenar clases restantes por prioridad
         df_restantes = df.loc[clases_restantes].copy()
@@ -213,129 +448,139 @@ class OptimizadorGreedyHC:
         
         df_restantes = df_restantes.sort_values('prioridad', ascending=False)
         
+        # Tipo requerido contando horas en el orden de asignación
+        orden_restantes = [m.posicion[idx] for idx in df_restantes.index]
+        self._fijar_tipos(m.tipos_en_orden(orden_restantes))
+        
+        # Dominios: las clases pre-asignadas quedan fijas en su salón
+        self._fijar_dominios(salones, asignado)
+        
         # Asignar vorazmente
-        for idx, row in df_restantes.iterrows():
-            materia = row['Materia']
-            grupo = row['Grupo']
-            dia = row['Dia']
-            bloque = row['Bloque_Horario']
-            profesor = row['Profesor']
+        for pos in orden_restantes:
+            slot = m.slot[pos]
+            profesor = m.profesor[pos]
             
-            # Determinar tipo de hora requerido
-            key = (grupo, materia)
-            indice_hora = horas_asignadas.get(key, 0)
-            tipo_requerido = determinar_tipo_hora(materia, indice_hora, self.config_materias)
-            horas_asignadas[key] = indice_hora + 1
+            # Candidatos: dominio de la clase (tipo, salones fijos del slot, ...)
+            candidatos = self._dominios.salones(pos)
+            libres = candidatos[~ocupado[slot, candidatos]]
             
-            # Filtrar candidatos por tipo
-            if tipo_requerido == 'Laboratorio':
-                candidatos = list(self.laboratorios)
-            else:
-                candidatos = list(self.salones_teoria)
-            
-            # Verificar preferencia opcional (no prioritaria)
-            pref_salon = obtener_preferencia_profesor(profesor, tipo_requerido, self.preferencias_profesores)
-            es_prioritaria = es_preferencia_prioritaria(profesor, tipo_requerido, self.preferencias_profesores)
-            
-            # Si tiene preferencia opcional (no prioritaria), darle bonificación
-            # Las prioritarias ya fueron asignadas en la fase 1
-            
-            # Evaluar candidatos
-            mejor_salon = None
-            mejor_score = float('-inf')
-            
-            for salon in candidatos:
-                # Verificar disponibilidad
-                if (dia, bloque, salon) in ocupacion:
-                    continue
-                
-                # Calcular score
-                score = 0
+            if len(libres) > 0:
+                score = np.zeros(len(libres))
                 
                 # Bonificación por preferencia opcional
-                if pref_salon == salon and not es_prioritaria:
-                    score += 50
+                # (las prioritarias ya fueron asignadas en la fase 1)
+                pref_salon = self._pref_salon[pos]
+                if pref_salon >= 0 and not self._pref_prioritaria[pos]:
+                    score += 50 * (libres == pref_salon)
                 
                 # Preferir salones cercanos a clases anteriores del profesor
-                clases_anteriores = [solucion[i] for i in solucion if df.loc[i]['Profesor'] == profesor]
-                if clases_anteriores:
-                    dist_promedio = np.mean([self.matriz_distancias.get((salon, s), 50) for s in clases_anteriores])
-                    score -= dist_promedio
+                previas = salones_profesor[profesor]
+                total_previas = previas.sum()
+                if total_previas > 0:
+                    score -= (self._distancias[libres] @ previas) / total_previas
                 
                 # Preferir salones menos usados (balancear)
-                uso = sum(1 for s in solucion.values() if s == salon)
-                score -= uso * 2
+                score -= uso[libres] * 2
                 
-                if score > mejor_score:
-                    mejor_score = score
-                    mejor_salon = salon
-            
-            # Si no hay salón disponible, usar cualquiera del tipo correcto
-            if mejor_salon is None:
-                disponibles = [s for s in candidatos if (dia, bloque, s) not in ocupacion]
-                if disponibles:
-                    mejor_salon = random.choice(disponibles)
-                else:
-                    # Último recurso: usar cualquier salón del tipo
-                    mejor_salon = random.choice(candidatos)
+                mejor_salon = libres[np.argmax(score)]
+            else:
+                # Último recurso: usar cualquier salón del dominio
+                mejor_salon = self.aleatorio.choice(candidatos)
             
-            solucion[idx] = mejor_salon
-            ocupacion[(dia, bloque, mejor_salon)] = idx
-        
-        energia_inicial = self.calcular_energia(solucion, df)
+            salones[pos] = mejor_salon
+            asignado[pos] = True
+            ocupado[slot, mejor_salon] = True
+            uso[mejor_salon] += 1
+            salones_profesor[profesor, mejor_salon] += 1
+        
+        orden = list(dict.fromkeys(self._orden_solucion(solucion) + orden_restantes))
+        self._fijar_tipos(m.tipos_en_orden(orden))
+        energia_inicial = self._energia(salones)
         self._log(f"   Energía inicial: {energia_inicial:.0f}")
+        self._reportar('construccion', m.n, m.n, salones, energia_inicial, forzar=True)
+        
+        return m.decodificar(salones, orden)
+    
+    def _preparar_busqueda(self, solucion: Dict, df: pd.DataFrame) -> Tuple:
+        """
+        Codifica la solución para la búsqueda local
         
-        return solucion
+        Returns:
+            Tuple: (modelo, orden, salones, energía, ocupación)
+        """
+        m = self._modelo_para(df)
+        orden = self._orden_solucion(solucion)
+        self._fijar_tipos(m.tipos_en_orden(orden))
+        salones = m.codificar(solucion)
+        self._fijar_dominios(salones, self._inmutables)
+        
+        # Clases de dominio fijo fuera de su salón: se colocan antes de buscar
+        fuera = self._dominios.fijas & ~self._dominios.contiene(np.arange(m.n), salones)
+        if fuera.any():
+            salones[fuera] = self._dominios.tabla[fuera, 0]
+            self._fijar_movibles(salones)
+        return m, orden, salones, self._energia(salones), self._ocupacion(salones)
+    
+    def _corregir_prioritarias(self, salones: np.ndarray):
+        """CORRECCIÓN FINAL: Garantizar 100% cumplimiento de las clases prioritarias"""
+        if not hasattr(self, 'clases_prioritarias_info'):
+            return
+        
+        m = self.modelo
+        self._log(f"\n   🔧 Verificando {len(self.clases_prioritarias_info)} clases prioritarias...")
+        correcciones = 0
+        for idx, info in self.clases_prioritarias_info.items():
+            pos = m.posicion[idx]
+            salon_esperado = m.codigo_salon[info['salon_prioritario']]
+            if salones[pos] != salon_esperado:
+                salones[pos] = salon_esperado
+                correcciones += 1
+        if correcciones > 0:
+            self._log(f"   ✅ {correcciones} clases corregidas a salón prioritario")
+        else:
+            self._log(f"   ✅ Todas las clases prioritarias están correctas")
     
     def hill_climbing(self, solucion: Dict, df: pd.DataFrame) -> Dict:
         """Fase 2: Mejora por Hill Climbing (respetando restricciones)"""
         self._log("\n🔺 Fase 2: Hill Climbing...")
         
-        mejor_solucion = solucion.copy()
-        mejor_energia = self.calcular_energia(mejor_solucion, df)
-        
-        # Rastrear horas asignadas para determinar tipos
-        horas_asignadas = {}
-        tipos_por_idx = {}
-        
-        for idx in solucion.keys():
-            row = df.loc[idx]
-            grupo = row['Grupo']
-            materia = row['Materia']
-            key = (grupo, materia)
-            indice_hora = horas_asignadas.get(key, 0)
-            tipo = determinar_tipo_hora(materia, indice_hora, self.config_materias)
-            horas_asignadas[key] = indice_hora + 1
-            tipos_por_idx[idx] = tipo
+        m, orden, mejor_solucion, mejor_energia, ocupacion = self._preparar_busqueda(solucion, df)
         
+        dominio = self._dominios.mascara
+        posiciones = range(m.n)
         sin_mejora = 0
         
-        for iteracion in range(self.max_iter_hc):
+        for iteracion in range(self._iteracion_reanudada, self.max_iter_hc):
+            if self._tiempo_agotado(mejor_solucion, orden, iteracion):
+                break
+            self._punto_control(mejor_solucion, orden, iteracion)
             mejoro = False
             
-            # Probar swaps aleatorios (solo del mismo tipo)
-            indices = list(solucion.keys())
-            for _ in range(50):  # 50 intentos por iteración
-                idx1, idx2 = random.sample(indices, 2)
-                
-                # NO intercambiar clases inmutables (PRIORIDAD 1)
-                if idx1 in self.indices_inmutables or idx2 in self.indices_inmutables:
-                    continue
-                
-                # Solo intercambiar si son del mismo tipo
-                if tipos_por_idx[idx1] != tipos_por_idx[idx2]:
-                    continue
-                
-                # Crear vecino
-                vecino = mejor_solucion.copy()
-                vecino[idx1], vecino[idx2] = vecino[idx2], vecino[idx1]
-                
-                # Evaluar
-                energia = self.calcular_energia(vecino, df)
+            # Probar movimientos aleatorios (solo del mismo tipo)
+            for _ in range(self.intentos_por_iteracion):
+                if self.vecindario == 'slot':
+                    # Movimiento dentro de un slot (nunca toca clases inmutables)
+                    delta, cambios = self._proponer_en_slot(mejor_solucion, ocupacion)
+                    if not cambios:
+                        continue
+                else:
+                    i, j = self.aleatorio.sample(posiciones, 2)
+                    
+                    # NO intercambiar clases inmutables (PRIORIDAD 1) ni fijas en su salón
+                    if not (self._es_movible[i] and self._es_movible[j]):
+                        continue
+                    
+                    # Solo intercambiar si cada salón está en el dominio de la otra clase
+                    if not (dominio[i, mejor_solucion[j]] and dominio[j, mejor_solucion[i]]):
+                        continue
+                    
+                    # Evaluar solo el cambio de energía del swap
+                    delta = self._delta_swap(mejor_solucion, ocupacion, i, j)
+                    cambios = [(i, mejor_solucion[j]), (j, mejor_solucion[i])]
                 
-                if energia < mejor_energia:
-                    mejor_solucion = vecino
-                    mejor_energia = energia
+                if delta < 0:
+                    self._aplicar_cambios(mejor_solucion, ocupacion, cambios)
+                    mejor_energia += delta
                     mejoro = True
                     sin_mejora = 0
                     break
@@ -348,39 +593,95 @@ class OptimizadorGreedyHC:
             
             if (iteracion + 1) % 20 == 0:
                 self._log(f"   Iter {iteracion+1}: Energía = {mejor_energia:.0f}")
+            self._reportar('hill_climbing', iteracion + 1, self.max_iter_hc, mejor_solucion, mejor_energia)
         
         self._log(f"   Energía final: {mejor_energia:.0f}")
+        self._reportar('hill_climbing', self.max_iter_hc, self.max_iter_hc, mejor_solucion, mejor_energia, forzar=True)
         
-        # CORRECCIÓN FINAL: Garantizar 100% cumplimiento
-        if hasattr(self, 'clases_prioritarias_info'):
-            self._log(f"\n   🔧 Verificando {len(self.clases_prioritarias_info)} clases prioritarias...")
-            correcciones = 0
-            for idx, info in self.clases_prioritarias_info.items():
-                salon_actual = mejor_solucion.get(idx)
-                salon_esperado = info['salon_prioritario']
-                if salon_actual != salon_esperado:
-                    mejor_solucion[idx] = salon_esperado
-                    correcciones += 1
-            if correcciones > 0:
-                self._log(f"   ✅ {correcciones} clases corregidas a salón prioritario")
-            else:
-                self._log(f"   ✅ Todas las clases prioritarias están correctas")
+        self._corregir_prioritarias(mejor_solucion)
         
-        return mejor_solucion
+        return m.decodificar(mejor_solucion, orden)
+    
+    def mejorar(self, solucion: Dict, df: pd.DataFrame) -> Dict:
+        """Fase 2: Búsqueda local sobre la construcción greedy (las subclases la reemplazan)"""
+        return self.hill_climbing(solucion, df)
+    
+    def _estado_aleatorio(self) -> Dict:
+        """Estado de los generadores aleatorios (para el punto de control)"""
+        return {'aleatorio': self.aleatorio.getstate()}
+    
+    def _restaurar_aleatorio(self, estado: Dict):
+        self.aleatorio.setstate(estado['aleatorio'])
+    
+    def _escribir_control(self, solucion: Dict, iteracion: int):
+        """Guarda el punto de control: mejor solución de la búsqueda y su iteración"""
+        if self._estado_base is None:
+            return
+        estado = dict(self._estado_base, solucion=solucion, iteracion=iteracion,
+                      **self._estado_aleatorio(), **self._extra_control)
+        self.control.guardar(type(self).__name__, self._huella, estado)
+    
+    def _punto_control(self, salones: np.ndarray, orden: List[int], iteracion: int):
+        """Guarda el punto de control si ya pasó el intervalo"""
+        if self.control.toca_guardar():
+            self._escribir_control(self.modelo.decodificar(salones, orden), iteracion)
+    
+    def _tiempo_agotado(self, salones: np.ndarray, orden: List[int], iteracion: int) -> bool:
+        """True si se agotó el presupuesto (deja guardado el progreso para reanudar)"""
+        if not self.control.agotado():
+            return False
+        self._log(f"   ⏱️  Tiempo agotado en iteración {iteracion}: se conserva la mejor solución")
+        self.interrumpido = True
+        self._escribir_control(self.modelo.decodificar(salones, orden), iteracion)
+        return True
+    
+    def _construir_o_reanudar(self, df: pd.DataFrame) -> Dict:
+        """Fase 1, o el estado del punto de control si hay uno para esta entrada y método"""
+        self._huella = huella_horario(df)
+        estado = self.control.cargar(type(self).__name__, self._huella)
+        self._reanudado = estado or {}
+        if estado is None:
+            self._iteracion_reanudada = 0
+            solucion = self.construccion_greedy(df)
+            # La pre-asignación puede mover día/bloque: se guarda para reanudar igual
+            self._estado_base = {
+                'dia': df['Dia'].to_numpy().copy(),
+                'bloque': df['Bloque_Horario'].to_numpy().copy(),
+                'clases_prioritarias_info': self.clases_prioritarias_info,
+            }
+            if self.control.punto_control is not None:
+                self._escribir_control(solucion, 0)
+            return solucion
+        
+        self._log(f"\n♻️  Reanudando desde {self.control.punto_control} (iteración {estado['iteracion']})")
+        df['Dia'] = estado['dia']
+        df['Bloque_Horario'] = estado['bloque']
+        self.clases_prioritarias_info = estado['clases_prioritarias_info']
+        self.clases_prioritarias_indices = set(self.clases_prioritarias_info)
+        self._estado_base = {k: estado[k] for k in ('dia', 'bloque', 'clases_prioritarias_info')}
+        self._restaurar_aleatorio(estado)
+        self._iteracion_reanudada = estado['iteracion']
+        self.modelo = None
+        return estado['solucion']
     
     def optimizar(self, df: pd.DataFrame) -> Tuple[Dict, float]:
         """Ejecuta optimización completa"""
         self._log("\n" + "="*80)
-        self._log("⚡ GREEDY + HILL CLIMBING - OPTIMIZACIÓN RÁPIDA")
+        self._log(self.TITULO)
         self._log("="*80)
         
-        # Fase 1: Greedy
-        solucion = self.construccion_greedy(df)
+        self.control.iniciar()
+        self.interrumpido = False
+        
+        # Fase 1: Greedy (o reanudar desde el punto de control)
+        solucion = self._construir_o_reanudar(df)
         
-        # Fase 2: Hill Climbing
-        solucion = self.hill_climbing(solucion, df)
+        # Fase 2: Búsqueda local
+        solucion = self.mejorar(solucion, df)
         
         energia_final = self.calcular_energia(solucion, df)
+        if not self.interrumpido:
+            self.control.eliminar()
         
         self._log("\n" + "="*80)
         self._log("✅ OPTIMIZACIÓN COMPLETADA")
@@ -405,35 +706,8 @@ def main():
     # Optimizar
     mejor_solucion, mejor_energia = optimizador.optimizar(df_inicial)
     
-    # Aplicar solución
-    df_resultado = df_inicial.copy()
-    df_resultado['Salon'] = df_resultado.index.map(mejor_solucion)
-    
-    # Actualizar Es_Invalido, Tipo_Salon y Piso
-    for idx in df_resultado.index:
-        salon = df_resultado.loc[idx, 'Salon']
-        
-        # Actualizar Es_Invalido
-        df_resultado.loc[idx, 'Es_Invalido'] = 1 if salon in optimizador.salones_invalidos else 0
-        
-        # Actualizar Tipo_Salon y Piso
-        if salon in optimizador.laboratorios:
-            df_resultado.loc[idx, 'Tipo_Salon'] = 'Laboratorio'
-            # Determinar piso del lab
-            if salon in ['LR', 'LSO', 'LIA', 'LCG1', 'LCG2']:
-                df_resultado.loc[idx, 'Piso'] = 'Primer Piso'
-            else:
-                df_resultado.loc[idx, 'Piso'] = 'Segundo Piso'
-        elif salon in optimizador.salones_teoria:
-            df_resultado.loc[idx, 'Tipo_Salon'] = 'Teoría'
-            # Determinar piso FF
-            if salon in ['FF1', 'FF2', 'FF3', 'FF4', 'FF5', 'FF6', 'FF7']:
-                df_resultado.loc[idx, 'Piso'] = 'Planta Baja'
-            else:
-                df_resultado.loc[idx, 'Piso'] = 'Planta Alta'
-        else:
-            # Salón inválido
-            df_resultado.loc[idx, 'Tipo_Salon'] = 'INVÁLIDO'
+    # Aplicar solución (actualiza Salon, Es_Invalido, Tipo_Salon y Piso)
+    df_resultado = optimizador.aplicar_solucion(df_inicial, mejor_solucion)
     
     # Analizar movimientos
     print("\n📊 Analizando movimientos de profesores...")
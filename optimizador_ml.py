@@ -8,6 +8,11 @@ ACTUALIZADO: Integra restricciones de teoría/lab y preferencias de profesores
 
 import pandas as pd
 import numpy as np
+import hashlib
+import json
+import joblib
+import sklearn
+from pathlib import Path
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split, cross_val_score
@@ -16,16 +21,42 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from analizar_movimientos import AnalizadorMovimientos
-from utils_restricciones import (
-    cargar_configuraciones,
-    determinar_tipo_hora,
-    obtener_preferencia_profesor,
-    es_preferencia_prioritaria,
-    filtrar_salones_por_tipo
-)
+from utils_restricciones import Catalogos
+from modelo_horario import ModeloHorario
+from control_ejecucion import ControlEjecucion
 import warnings
 warnings.filterwarnings('ignore')
 
+class OcupacionHorario:
+    """
+    Índice de las asignaciones ya decididas durante la optimización
+    
+    Permite validar en O(1) los conflictos de horario (día, bloque, salón)
+    y el salón de teoría de cada grupo, sin recorrer el horario construido.
+    """
+    
+    def __init__(self):
+        self.ocupados = set()            # {(dia, bloque, salon)}
+        self.salon_teoria_grupo = {}     # grupo -> primer salón de teoría asignado
+        self.total = 0
+    
+    def __len__(self):
+        return self.total
+    
+    def agregar(self, grupo, dia, bloque, salon, tipo_salon):
+        """Registra una asignación decidida"""
+        self.ocupados.add((dia, bloque, salon))
+        if tipo_salon == 'Teoría':
+            self.salon_teoria_grupo.setdefault(grupo, salon)
+        self.total += 1
+    
+    def esta_ocupado(self, dia, bloque, salon):
+        """True si el salón ya está asignado en ese día y bloque"""
+        return (dia, bloque, salon) in self.ocupados
+
+# Versión del formato de la caché de modelos (cambiarla invalida los modelos guardados)
+VERSION_CACHE_MODELOS = 1
+
 class OptimizadorML:
     """
     Optimizador de salones usando Machine Learning
@@ -36,26 +67,42 @@ class OptimizadorML:
     - Reglas de negocio para restricciones hard
     """
     
-    def __init__(self, verbose=True):
+    def __init__(self, verbose=True, usar_cache=True, dir_cache=None, max_modelos_cache=5,
+                 tiempo_limite_s=None, fecha_limite=None, progreso=None, intervalo_progreso_s=0.5,
+                 catalogos=None):
+        """
+        Args:
+            verbose: Mostrar progreso
+            usar_cache: Guardar/cargar modelos entrenados en disco
+            dir_cache: Carpeta de la caché (default: modelos_ml/ junto al script)
+            max_modelos_cache: Modelos que se conservan (se eliminan los de uso más antiguo)
+            tiempo_limite_s: Presupuesto de tiempo de optimizar() en segundos; al agotarse
+                             las clases no procesadas conservan su salón actual
+            fecha_limite: Instante límite absoluto (time.time()); permite incluir el
+                          tiempo de entrenar() en el presupuesto
+            progreso: Función que recibe eventos de progreso (fase, clases procesadas,
+                      cambios, tiempo transcurrido)
+            intervalo_progreso_s: Segundos mínimos entre eventos de progreso
+            catalogos: Catálogos ya cargados (None = leerlos de disco)
+        """
         self.verbose = verbose
-        
-        # Cargar configuraciones de restricciones
-        self._log("📂 Cargando configuraciones de restricciones...")
-        self.config_materias, self.preferencias_profesores = cargar_configuraciones()
-        
-        # Cargar índices inmutables (PRIORIDAD 1)
-        import json
-        from pathlib import Path
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        inmutables_path = Path(script_dir) / "datos_estructurados" / "indices_inmutables_p1.json"
-        self.indices_inmutables = set()
-        if inmutables_path.exists():
-            try:
-                with open(inmutables_path, 'r') as f:
-                    self.indices_inmutables = set(json.load(f))
-                self._log(f"✅ Índices inmutables cargados: {len(self.indices_inmutables)} clases")
-            except Exception as e:
-                self._log(f"⚠️  Error cargando índices inmutables: {e}")
+        self.control = ControlEjecucion(tiempo_limite_s, fecha_limite,
+                                        progreso=progreso, intervalo_progreso_s=intervalo_progreso_s)
+        self.interrumpido = False
+        self.usar_cache = usar_cache
+        self.dir_cache = Path(dir_cache) if dir_cache else Path(os.path.dirname(os.path.abspath(__file__))) / "modelos_ml"
+        self.max_modelos_cache = max_modelos_cache
+        
+        # Cargar configuraciones de restricciones e índices inmutables (PRIORIDAD 1),
+        # o reutilizar los ya cargados
+        if catalogos is None:
+            self._log("📂 Cargando configuraciones de restricciones...")
+            catalogos = Catalogos(verbose=verbose)
+        self.catalogos = catalogos
+        self.config_materias = catalogos.config_materias
+        self.preferencias_profesores = catalogos.preferencias_profesores
+        self.tabla_preferencias = catalogos.tabla_preferencias
+        self.indices_inmutables = catalogos.indices_inmutables
         
         # Modelos
         self.clasificador = RandomForestClassifier(
@@ -162,42 +209,19 @@ class OptimizadorML:
         features = features.join(prof_stats, on='profesor')
     
         # 8. Features de Restricciones (NUEVO)
-        # Rastrear horas asignadas por materia para determinar tipo
-        horas_asignadas = {}
-        es_teoria_list = []
-        tiene_pref_list = []
-        prioridad_pref_list = []
-        
-        for idx, row in df.iterrows():
-            grupo = row['Grupo']
-            materia = row['Materia']
-            profesor = row['Profesor']
-            
-            # Determinar tipo de hora
-            key = (grupo, materia)
-            indice_hora = horas_asignadas.get(key, 0)
-            tipo_requerido = determinar_tipo_hora(materia, indice_hora, self.config_materias)
-            horas_asignadas[key] = indice_hora + 1
-            
-            es_teoria = 1 if tipo_requerido == 'Teoría' else 0
-            es_teoria_list.append(es_teoria)
-            
-            # Verificar preferencia del profesor
-            pref_salon = obtener_preferencia_profesor(profesor, tipo_requerido, self.preferencias_profesores)
-            tiene_pref = 1 if pref_salon else 0
-            tiene_pref_list.append(tiene_pref)
-            
-            # Prioridad de preferencia (0=ninguna, 1=opcional, 2=prioritaria)
-            if pref_salon:
-                es_prioritaria = es_preferencia_prioritaria(profesor, tipo_requerido, self.preferencias_profesores)
-                prioridad = 2 if es_prioritaria else 1
-            else:
-                prioridad = 0
-            prioridad_pref_list.append(prioridad)
-        
-        features['es_teoria'] = es_teoria_list
-        features['tiene_preferencia_profesor'] = tiene_pref_list
-        features['prioridad_preferencia'] = prioridad_pref_list
+        # Tipo de hora contado en el orden del DataFrame y preferencia general
+        # del profesor, indexados en la tabla compilada de preferencias
+        requiere_lab = ModeloHorario(
+            df, self.config_materias, self.preferencias_profesores,
+            self.laboratorios, self.salones_teoria, self.salones_invalidos,
+            tabla_preferencias=self.tabla_preferencias
+        ).requiere_lab
+        _, es_prioritaria, tiene_pref = self.tabla_preferencias.por_fila(df['Profesor'], requiere_lab)
+        
+        features['es_teoria'] = (~requiere_lab).astype(int)
+        features['tiene_preferencia_profesor'] = tiene_pref.astype(int)
+        # Prioridad de preferencia (0=ninguna, 1=opcional, 2=prioritaria)
+        features['prioridad_preferencia'] = np.where(tiene_pref, np.where(es_prioritaria, 2, 1), 0)
         
         # Codificar variables categóricas
         categorical_cols = ['grupo_codigo', 'materia', 'dia_semana', 'bloque_horario', 
@@ -208,12 +232,9 @@ class OptimizadorML:
                 self.encoders[col] = LabelEncoder()
                 features[f'{col}_encoded'] = self.encoders[col].fit_transform(features[col].astype(str))
             else:
-                # Para predicción, manejar valores no vistos
-                features[f'{col}_encoded'] = features[col].apply(
-                    lambda x: self.encoders[col].transform([str(x)])[0] 
-                    if str(x) in self.encoders[col].classes_ 
-                    else -1
-                )
+                # Para predicción, manejar valores no vistos (-1)
+                codigos = {clase: i for i, clase in enumerate(self.encoders[col].classes_)}
+                features[f'{col}_encoded'] = features[col].astype(str).map(codigos).fillna(-1).astype(int)
         
         # Seleccionar solo features numéricas para el modelo
         feature_cols = [col for col in features.columns if col.endswith('_encoded') or 
@@ -269,7 +290,64 @@ class OptimizadorML:
         
         return np.array(scores)
     
-    def entrenar(self, df_inicial):
+    def huella_entrenamiento(self, df_inicial):
+        """
+        Huella de contenido de todo lo que determina el modelo entrenado:
+        datos, configuración de materias, preferencias e hiperparámetros
+        """
+        h = hashlib.sha256()
+        h.update(f"{VERSION_CACHE_MODELOS}|{sklearn.__version__}".encode())
+        h.update(repr(sorted(self.clasificador.get_params().items())).encode())
+        h.update(repr(sorted(self.regressor_calidad.get_params().items())).encode())
+        h.update(json.dumps([str(c) for c in df_inicial.columns]).encode())
+        h.update(pd.util.hash_pandas_object(df_inicial, index=True).values.tobytes())
+        h.update(json.dumps(self.config_materias, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        h.update(json.dumps(self.preferencias_profesores, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+        return h.hexdigest()[:32]
+    
+    def _cargar_modelo(self, ruta):
+        """Carga modelos, encoders y métricas de la caché; False si no hay o está dañada"""
+        if not ruta.exists():
+            return False
+        try:
+            guardado = joblib.load(ruta)
+        except Exception as e:
+            self._log(f"⚠️  Modelo en caché dañado, se reentrena: {e}")
+            return False
+        
+        self.clasificador = guardado['clasificador']
+        self.regressor_calidad = guardado['regressor_calidad']
+        self.encoders = guardado['encoders']
+        self.feature_names = guardado['feature_names']
+        self.metricas_entrenamiento = guardado['metricas']
+        
+        # Marcar como usado recientemente (la limpieza elimina los más antiguos)
+        os.utime(ruta)
+        self._log(f"⚡ Modelo cargado desde caché: {ruta.name}")
+        return True
+    
+    def _guardar_modelo(self, ruta):
+        """Guarda el modelo entrenado en la caché y elimina los de uso más antiguo"""
+        try:
+            self.dir_cache.mkdir(parents=True, exist_ok=True)
+            temporal = ruta.with_suffix(f".{os.getpid()}.tmp")
+            joblib.dump({
+                'clasificador': self.clasificador,
+                'regressor_calidad': self.regressor_calidad,
+                'encoders': self.encoders,
+                'feature_names': self.feature_names,
+                'metricas': self.metricas_entrenamiento,
+            }, temporal)
+            os.replace(temporal, ruta)
+            
+            modelos = sorted(self.dir_cache.glob("modelo_*.joblib"), key=lambda r: r.stat().st_mtime, reverse=True)
+            for viejo in modelos[self.max_modelos_cache:]:
+                viejo.unlink(missing_ok=True)
+            self._log(f"💾 Modelo guardado en caché: {ruta.name}")
+        except OSError as e:
+            self._log(f"⚠️  No se pudo guardar el modelo en caché: {e}")
+    
+    def entrenar(self, df_inicial, reentrenar=False):
         """
         Entrena el modelo ML aprendiendo patrones del horario inicial
         
@@ -279,12 +357,23 @@ class OptimizadorML:
         - Preferencias de profesores
         - Distribución de uso de salones
         
+        Si ya existe en caché un modelo entrenado con las mismas entradas
+        (misma huella), se carga en lugar de reentrenar.
+        
         Args:
             df_inicial: DataFrame del horario inicial
+            reentrenar: Ignorar la caché y entrenar de nuevo
         
         Returns:
             dict: Métricas de entrenamiento
         """
+        ruta_cache = None
+        if self.usar_cache:
+            ruta_cache = self.dir_cache / f"modelo_{self.huella_entrenamiento(df_inicial)}.joblib"
+            if not reentrenar and self._cargar_modelo(ruta_cache):
+                self.control.reportar('entrenamiento', 2, 2, metodo='OptimizadorML', desde_cache=True)
+                return self.metricas_entrenamiento
+        
         self._log("\n" + "="*80)
         self._log("🎓 ENTRENANDO MODELO MACHINE LEARNING")
         self._log("="*80 + "\n")
@@ -312,6 +401,7 @@ class OptimizadorML:
         self._log("\n🌲 Entrenando Random Forest Classifier...")
         self._log("   Aprendiendo patrones de asignación de salones...")
         self.clasificador.fit(X_train, y_train)
+        self.control.reportar('entrenamiento', 1, 2, metodo='OptimizadorML', desde_cache=False)
         
         # Evaluar clasificador
         y_pred = self.clasificador.predict(X_test)
@@ -333,6 +423,7 @@ class OptimizadorML:
         
         score_r2 = self.regressor_calidad.score(X_test, scores_calidad[len(X_train):])
         self._log(f"   ✅ R² Score: {score_r2:.3f}")
+        self.control.reportar('entrenamiento', 2, 2, metodo='OptimizadorML', desde_cache=False)
         
         # Feature importance
         self._log("\n🔍 Top 10 Features más importantes:")
@@ -360,6 +451,9 @@ class OptimizadorML:
         self._log("✅ ENTRENAMIENTO COMPLETADO")
         self._log("="*80 + "\n")
         
+        if ruta_cache is not None:
+            self._guardar_modelo(ruta_cache)
+        
         return self.metricas_entrenamiento
     
     def predecir_salon(self, asignacion_features, top_k=5):
@@ -373,20 +467,30 @@ class OptimizadorML:
         Returns:
             list: Lista de (salon, probabilidad) ordenada por probabilidad
         """
-        # Predecir probabilidades
-        probas = self.clasificador.predict_proba(asignacion_features.reshape(1, -1))[0]
+        return self.predecir_salones(asignacion_features.reshape(1, -1), top_k=top_k)[0]
+    
+    def predecir_salones(self, X, top_k=5):
+        """
+        Predice los top-k salones más probables para varias asignaciones
+        (una sola llamada a predict_proba para todo el lote)
+        
+        Args:
+            X: Features de las asignaciones (una fila por asignación)
+            top_k: Número de candidatos a retornar por asignación
         
-        # Obtener top-k índices
-        top_indices = np.argsort(probas)[::-1][:top_k]
+        Returns:
+            list: Por asignación, lista de (salon, probabilidad) ordenada por probabilidad
+        """
+        probas = self.clasificador.predict_proba(X)
+        top_indices = np.argsort(probas, axis=1)[:, ::-1][:, :top_k]
         
-        # Decodificar salones
-        salones_candidatos = []
-        for idx in top_indices:
-            salon = self.encoders['salon_encoder'].inverse_transform([idx])[0]
-            prob = probas[idx]
-            salones_candidatos.append((salon, prob))
+        # Columnas de predict_proba -> nombres de salón
+        nombres = self.encoders['salon_encoder'].inverse_transform(self.clasificador.classes_)
         
-        return salones_candidatos
+        return [
+            [(nombres[j], probas[i, j]) for j in fila]
+            for i, fila in enumerate(top_indices)
+        ]
     
     def evaluar_calidad(self, asignacion_features):
         """
@@ -397,14 +501,14 @@ class OptimizadorML:
         """
         return self.regressor_calidad.predict(asignacion_features.reshape(1, -1))[0]
     
-    def validar_restricciones_hard(self, salon, asignacion, horario_actual):
+    def validar_restricciones_hard(self, salon, asignacion, ocupacion):
         """
         Valida que un salón satisfaga todas las restricciones hard
         
         Args:
             salon: Salón candidato
-            asignacion: Dict con info de la asignación
-            horario_actual: DataFrame con asignaciones actuales
+            asignacion: Dict con info de la asignación (incluye 'salon_prioritario' precalculado)
+            ocupacion: OcupacionHorario con las asignaciones ya decididas
         
         Returns:
             bool: True si satisface todas las restricciones
@@ -414,14 +518,8 @@ class OptimizadorML:
             return False
         
         # 2. No debe haber conflicto de horario (mismo salón, mismo día/hora)
-        if len(horario_actual) > 0:
-            conflictos = horario_actual[
-                (horario_actual['Salon'] == salon) &
-                (horario_actual['Dia'] == asignacion['dia']) &
-                (horario_actual['Bloque_Horario'] == asignacion['bloque'])
-            ]
-            if len(conflictos) > 0:
-                return False
+        if ocupacion.esta_ocupado(asignacion['dia'], asignacion['bloque'], salon):
+            return False
         
         # 3. Validar tipo de salón (teoría vs laboratorio) - NUEVO
         es_lab = salon in self.laboratorios
@@ -430,27 +528,16 @@ class OptimizadorML:
             return False
         
         # 4. Validar preferencias prioritarias del profesor (RESTRICCIÓN DURA)
-        profesor = asignacion.get('profesor')
-        tipo_requerido = asignacion.get('tipo_requerido', 'Teoría')
-        
-        if profesor and tipo_requerido:
-            pref_salon = obtener_preferencia_profesor(profesor, tipo_requerido, self.preferencias_profesores)
-            es_prioritaria = es_preferencia_prioritaria(profesor, tipo_requerido, self.preferencias_profesores)
-            
-            # Si hay preferencia PRIORITARIA, SOLO ese salón es válido (sin excepciones)
-            if es_prioritaria and pref_salon:
-                if salon != pref_salon:
-                    return False  # Rechazar cualquier otro salón
+        # Si hay preferencia PRIORITARIA, SOLO ese salón es válido (sin excepciones)
+        salon_prioritario = asignacion.get('salon_prioritario')
+        if salon_prioritario and salon != salon_prioritario:
+            return False  # Rechazar cualquier otro salón
         
         # 5. Grupos de primer semestre (mismo salón para teoría)
-        if asignacion.get('es_primer_semestre', False) and len(horario_actual) > 0:
+        if asignacion.get('es_primer_semestre', False):
             # Verificar si ya tiene asignación de teoría
-            asigs_grupo = horario_actual[
-                (horario_actual['Grupo'] == asignacion['grupo']) &
-                (horario_actual['Tipo_Salon'] == 'Teoría')
-            ]
-            if len(asigs_grupo) > 0:
-                salon_teoria_actual = asigs_grupo.iloc[0]['Salon']
+            salon_teoria_actual = ocupacion.salon_teoria_grupo.get(asignacion['grupo'])
+            if salon_teoria_actual is not None:
                 if salon != salon_teoria_actual and not salon.startswith('L'):
                     return False
         
@@ -469,103 +556,115 @@ class OptimizadorML:
         self._log("\n" + "="*80)
         self._log("🚀 OPTIMIZANDO HORARIO CON MACHINE LEARNING")
         self._log("="*80 + "\n")
-        
-        # Copiar DataFrame
-        df_optimizado = df_inicial.copy()
-        horario_actual = pd.DataFrame()
+        self.control.iniciar()
+        self.interrumpido = False
+        
+        # Compilar horario a arreglos (IDs enteros por clase)
+        m = ModeloHorario(
+            df_inicial, self.config_materias, self.preferencias_profesores,
+            self.laboratorios, self.salones_teoria, self.salones_invalidos,
+            salones_extra=self.salones_validos, tabla_preferencias=self.tabla_preferencias
+        )
+        salones = m.salon_inicial.copy()
+        ocupacion = OcupacionHorario()
         
         # Ordenar por prioridad (1er semestre primero, luego por hora)
-        df_optimizado['prioridad'] = df_optimizado['Grupo'].str[0].astype(int)
-        df_optimizado = df_optimizado.sort_values(['prioridad', 'Dia', 'Hora_Inicio'])
+        df_ordenado = df_inicial.copy()
+        df_ordenado['prioridad'] = df_ordenado['Grupo'].str[0].astype(int)
+        df_ordenado = df_ordenado.sort_values(['prioridad', 'Dia', 'Hora_Inicio'])
+        orden = [m.posicion[idx] for idx in df_ordenado.index]
         
-        total_asignaciones = len(df_optimizado)
+        # Tipo de hora requerido (horas contadas en el orden de procesamiento)
+        requiere_lab = m.tipos_en_orden(orden)
+        
+        # Salón prioritario de cada clase (preferencia general del profesor)
+        pref_salon, prioritaria = m.preferencias(por_materia=False, requiere_lab=requiere_lab)
+        
+        total_asignaciones = len(df_ordenado)
         asignaciones_cambiadas = 0
         asignaciones_invalidas_eliminadas = 0
+        invalidos = int(m.salon_es_invalido[salones].sum())  # Inválidos del horario en curso (para el progreso)
         
         self._log(f"📊 Total de asignaciones a procesar: {total_asignaciones}")
         self._log(f"🎯 Objetivo: Eliminar {df_inicial['Es_Invalido'].sum()} asignaciones inválidas\n")
         
-        # Rastrear horas asignadas por materia
-        horas_asignadas_optimizar = {}
-        
-        # Procesar cada asignación
-        for idx, row in df_optimizado.iterrows():
-            # Determinar tipo de hora requerido
-            grupo = row['Grupo']
-            materia = row['Materia']
-            key = (grupo, materia)
-            indice_hora = horas_asignadas_optimizar.get(key, 0)
-            tipo_requerido = determinar_tipo_hora(materia, indice_hora, self.config_materias)
-            horas_asignadas_optimizar[key] = indice_hora + 1
-            
-            # Extraer features de esta asignación
-            asignacion_df = pd.DataFrame([row])
-            X_asig = self.extraer_features(asignacion_df, incluir_target=False)
+        # Features de todo el horario (agregados por grupo/profesor sobre el dataset completo)
+        # y top-10 salones candidatos de cada asignación en un solo lote
+        X = self.extraer_features(df_inicial, incluir_target=False)
+        candidatos_por_clase = self.predecir_salones(X, top_k=10)
+        tipo_salon_inicial = df_inicial['Tipo_Salon'].to_numpy()
+        
+        # Procesar cada asignación (solo el filtrado por restricciones es secuencial)
+        for procesadas, pos in enumerate(orden):
+            # Presupuesto de tiempo: las clases restantes conservan su salón actual
+            if self.control.agotado():
+                self._log(f"   ⏱️  Tiempo agotado: {total_asignaciones - procesadas} asignaciones sin procesar")
+                self.interrumpido = True
+                break
             
-            # Predecir top-10 salones candidatos
-            candidatos = self.predecir_salon(X_asig.iloc[0].values, top_k=10)
+            tipo_requerido = 'Laboratorio' if requiere_lab[pos] else 'Teoría'
+            candidatos = candidatos_por_clase[pos]
             
             # Preparar info de asignación para validación (con nuevos campos)
             asignacion_info = {
-                'grupo': row['Grupo'],
-                'dia': row['Dia'],
-                'bloque': row['Bloque_Horario'],
-                'profesor': row['Profesor'],
+                'grupo': m.grupos[m.grupo[pos]],
+                'dia': m.dias[m.dia[pos]],
+                'bloque': m.bloques[m.bloque[pos]],
+                'profesor': m.profesores[m.profesor[pos]],
                 'tipo_requerido': tipo_requerido,
-                'es_primer_semestre': row['Grupo'][0] == '1'
+                'salon_prioritario': m.salones[pref_salon[pos]] if prioritaria[pos] and pref_salon[pos] >= 0 else None,
+                'es_primer_semestre': m.grupos[m.grupo[pos]][0] == '1'
             }
             
             # Filtrar candidatos válidos
             candidatos_validos = []
             for salon, prob in candidatos:
-                if self.validar_restricciones_hard(salon, asignacion_info, horario_actual):
+                if self.validar_restricciones_hard(salon, asignacion_info, ocupacion):
                     candidatos_validos.append((salon, prob))
             
             # Si no hay candidatos válidos, buscar cualquier salón válido
             if len(candidatos_validos) == 0:
                 for salon in self.salones_validos:
-                    if self.validar_restricciones_hard(salon, asignacion_info, horario_actual):
+                    if self.validar_restricciones_hard(salon, asignacion_info, ocupacion):
                         candidatos_validos.append((salon, 0.0))
                         break
             
             # Seleccionar mejor candidato
+            tipo_salon = tipo_salon_inicial[pos]
             if len(candidatos_validos) > 0:
                 mejor_salon, prob = candidatos_validos[0]
                 
                 # Actualizar si es diferente
-                if mejor_salon != row['Salon']:
-                    salon_anterior = row['Salon']
-                    df_optimizado.at[idx, 'Salon'] = mejor_salon
-                    
-                    # Actualizar tipo y piso
-                    if mejor_salon.startswith('L'):
-                        df_optimizado.at[idx, 'Tipo_Salon'] = 'Laboratorio'
-                        if mejor_salon in ['LR', 'LSO', 'LIA', 'LCG1', 'LCG2']:
-                            df_optimizado.at[idx, 'Piso'] = 'Primer Piso'
-                        else:
-                            df_optimizado.at[idx, 'Piso'] = 'Segundo Piso'
-                    else:
-                        df_optimizado.at[idx, 'Tipo_Salon'] = 'Teoría'
-                        if mejor_salon in ['FF1', 'FF2', 'FF3', 'FF4', 'FF5', 'FF6', 'FF7']:
-                            df_optimizado.at[idx, 'Piso'] = 'Planta Baja'
-                        else:
-                            df_optimizado.at[idx, 'Piso'] = 'Planta Alta'
-                    
-                    df_optimizado.at[idx, 'Es_Invalido'] = 0
+                salon_anterior = m.salones[salones[pos]]
+                if mejor_salon != salon_anterior:
+                    invalidos -= int(m.salon_es_invalido[salones[pos]])
+                    salones[pos] = m.codigo_salon[mejor_salon]
+                    invalidos += int(m.salon_es_invalido[salones[pos]])
+                    tipo_salon = 'Laboratorio' if mejor_salon.startswith('L') else 'Teoría'
                     
                     asignaciones_cambiadas += 1
                     if salon_anterior in self.salones_invalidos:
                         asignaciones_invalidas_eliminadas += 1
             
-            # Agregar a horario actual
-            horario_actual = pd.concat([horario_actual, df_optimizado.loc[[idx]]], ignore_index=True)
+            # Registrar en el índice de ocupación
+            ocupacion.agregar(asignacion_info['grupo'], asignacion_info['dia'], asignacion_info['bloque'],
+                              m.salones[salones[pos]], tipo_salon)
             
             # Progreso cada 100 asignaciones
-            if (len(horario_actual) % 100 == 0):
-                self._log(f"   Procesadas: {len(horario_actual)}/{total_asignaciones}")
-        
-        # Eliminar columna de prioridad
-        df_optimizado = df_optimizado.drop('prioridad', axis=1)
+            if (len(ocupacion) % 100 == 0):
+                self._log(f"   Procesadas: {len(ocupacion)}/{total_asignaciones}")
+            if self.control.toca_reportar():
+                self.control.reportar('asignacion', procesadas + 1, total_asignaciones, metodo='OptimizadorML',
+                                      cambiadas=asignaciones_cambiadas,
+                                      invalidas_eliminadas=asignaciones_invalidas_eliminadas,
+                                      penalizaciones={'invalidos': invalidos})
+        
+        # Decodificar una sola vez (conservando el orden de procesamiento)
+        df_optimizado = m.a_dataframe(salones).loc[df_ordenado.index]
+        self.control.reportar('asignacion', len(ocupacion), total_asignaciones, metodo='OptimizadorML',
+                              cambiadas=asignaciones_cambiadas,
+                              invalidas_eliminadas=asignaciones_invalidas_eliminadas,
+                              penalizaciones={'invalidos': invalidos})
         
         # Analizar movimientos
         self._log("\n📊 Analizando movimientos de profesores...")
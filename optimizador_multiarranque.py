@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Multi-arranque Greedy + Hill Climbing - Sistema de Salones ISC
+Ejecuta N arranques independientes (cada uno con su propia semilla) en un
+pool de procesos y conserva la mejor solución. Las energías de todos los
+arranques quedan como muestra repetida para las pruebas estadísticas.
+
+Cada arranque es reproducible por separado:
+    OptimizadorGreedyHC(semilla=<semilla del arranque>).optimizar(df)
+"""
+
+import pandas as pd
+import numpy as np
+import multiprocessing as mp
+import time
+from typing import Dict, Optional, Tuple
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from analizar_movimientos import AnalizadorMovimientos
+from optimizador_greedy import OptimizadorGreedyHC
+
+
+# ----------------------------------------------------------------------
+# Arranques en procesos (el optimizador se crea una vez por trabajador)
+# ----------------------------------------------------------------------
+
+_trabajador = {}
+
+
+def _inicializar_trabajador(clase, parametros, df_inicial, fin):
+    """Carga configuraciones una sola vez por proceso"""
+    _trabajador['clase'] = clase
+    _trabajador['parametros'] = parametros
+    _trabajador['df'] = df_inicial
+    _trabajador['fin'] = fin
+
+
+def _ejecutar_arranque(tarea: Tuple[int, int]) -> Optional[Tuple]:
+    """
+    Ejecuta un arranque completo (construcción + búsqueda local)
+
+    Returns:
+        (arranque, semilla, energía, segundos, DataFrame resultado) o None si
+        el presupuesto de tiempo ya se agotó antes de empezar
+    """
+    arranque, semilla = tarea
+    if time.time() >= _trabajador['fin']:
+        return None
+
+    inicio = time.time()
+    # La pre-asignación puede mover día/bloque: cada arranque trabaja sobre su copia
+    df = _trabajador['df'].copy()
+    optimizador = _trabajador['clase'](verbose=False, semilla=semilla, **_trabajador['parametros'])
+    solucion, energia = optimizador.optimizar(df)
+    df_resultado = optimizador.aplicar_solucion(df, solucion)
+    return arranque, semilla, energia, time.time() - inicio, df_resultado
+
+
+class OptimizadorMultiArranque:
+    """
+    N arranques de un optimizador con semillas derivadas de una semilla global
+
+    Los arranques se reparten entre `n_workers` procesos. Con `tiempo_limite_s`
+    no se inicia ningún arranque después del límite y al agotarse se descartan
+    los que sigan en curso (se conserva lo terminado).
+    """
+
+    def __init__(self, num_arranques=8, n_workers=None, tiempo_limite_s=None,
+                 semilla=None, clase=OptimizadorGreedyHC, verbose=True, **parametros):
+        """
+        Args:
+            num_arranques: Número de arranques independientes
+            n_workers: Procesos del pool (None = núcleos disponibles, 1 = en serie)
+            tiempo_limite_s: Presupuesto global de tiempo en segundos (None = sin límite)
+            semilla: Semilla global (cada arranque recibe una semilla derivada)
+            clase: Optimizador a ejecutar (OptimizadorGreedyHC o una subclase, p. ej. OptimizadorSA)
+            verbose: Mostrar progreso
+            **parametros: Parámetros del optimizador comunes a todos los arranques
+        """
+        if num_arranques < 1:
+            raise ValueError("Se requiere al menos 1 arranque")
+
+        self.num_arranques = num_arranques
+        self.n_workers = max(1, min(n_workers or os.cpu_count() or 1, num_arranques))
+        self.tiempo_limite_s = tiempo_limite_s
+        self.clase = clase
+        self.parametros = parametros
+        self.verbose = verbose
+
+        # Semillas enteras por arranque (se reportan para reproducir cada uno)
+        semillas = np.random.SeedSequence(semilla)
+        self.semillas = [int(s.generate_state(1)[0]) for s in semillas.spawn(num_arranques)]
+
+        self.resultados = []
+        self.mejor_energia = None
+
+    def _log(self, mensaje: str):
+        if self.verbose:
+            print(mensaje)
+
+    def _ejecutar(self, df_inicial: pd.DataFrame, fin: float):
+        """Genera los resultados de los arranques conforme terminan"""
+        tareas = list(enumerate(self.semillas))
+        inicializacion = (self.clase, self.parametros, df_inicial, fin)
+
+        if self.n_workers == 1:
+            _inicializar_trabajador(*inicializacion)
+            for tarea in tareas:
+                yield _ejecutar_arranque(tarea)
+            return
+
+        pool = mp.Pool(self.n_workers, initializer=_inicializar_trabajador, initargs=inicializacion)
+        try:
+            pendientes = pool.imap_unordered(_ejecutar_arranque, tareas)
+            for _ in tareas:
+                restante = fin - time.time()
+                try:
+                    yield pendientes.next(timeout=restante if restante != float('inf') else None)
+                except mp.TimeoutError:
+                    self._log("   ⏱️  Tiempo agotado: se descartan los arranques en curso")
+                    return
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def optimizar(self, df_inicial: pd.DataFrame) -> Tuple[pd.DataFrame, float]:
+        """
+        Ejecuta los arranques y devuelve la mejor solución
+
+        Returns:
+            Tuple[pd.DataFrame, float]: (horario de la mejor solución, su energía)
+        """
+        self._log("\n" + "="*80)
+        self._log(f"🎲 MULTI-ARRANQUE - {self.num_arranques} arranques en {self.n_workers} procesos")
+        self._log("="*80)
+
+        inicio = time.time()
+        fin = inicio + self.tiempo_limite_s if self.tiempo_limite_s else float('inf')
+
+        self.resultados = []
+        mejor_df = None
+        for resultado in self._ejecutar(df_inicial, fin):
+            if resultado is None:
+                continue
+            arranque, semilla, energia, segundos, df_resultado = resultado
+            self.resultados.append({
+                'Arranque': arranque,
+                'Semilla': semilla,
+                'Energia': energia,
+                'Tiempo_s': segundos,
+            })
+            if mejor_df is None or energia < self.mejor_energia:
+                self.mejor_energia, mejor_df = energia, df_resultado
+            self._log(f"   Arranque {arranque:3d} (semilla {semilla}): Energía = {energia:.0f} "
+                      f"({segundos:.1f}s) | Mejor = {self.mejor_energia:.0f}")
+
+        if mejor_df is None:
+            raise RuntimeError("Ningún arranque terminó dentro del tiempo límite")
+
+        resumen = self.resumen()
+        self._log(f"\n📊 Energía en {resumen['arranques']}/{self.num_arranques} arranques "
+                  f"({time.time() - inicio:.1f}s):")
+        self._log(f"   Mínima:  {resumen['minima']:.0f}")
+        self._log(f"   Media:   {resumen['media']:.0f} ± {resumen['desviacion']:.0f}")
+        self._log(f"   Mediana: {resumen['mediana']:.0f}")
+        self._log(f"   Máxima:  {resumen['maxima']:.0f}")
+
+        return mejor_df, self.mejor_energia
+
+    def resultados_df(self) -> pd.DataFrame:
+        """Energía, semilla y tiempo de cada arranque terminado (ordenados por arranque)"""
+        columnas = ['Arranque', 'Semilla', 'Energia', 'Tiempo_s']
+        return pd.DataFrame(self.resultados, columns=columnas).sort_values('Arranque').reset_index(drop=True)
+
+    def resumen(self) -> Dict:
+        """Distribución de energías de los arranques terminados"""
+        energias = np.array([r['Energia'] for r in self.resultados], dtype=float)
+        if len(energias) == 0:
+            return {'arranques': 0}
+        return {
+            'arranques': len(energias),
+            'minima': float(energias.min()),
+            'media': float(energias.mean()),
+            'desviacion': float(energias.std(ddof=1)) if len(energias) > 1 else 0.0,
+            'mediana': float(np.median(energias)),
+            'maxima': float(energias.max()),
+        }
+
+
+def main():
+    """Función principal: python3 optimizador_multiarranque.py [num_arranques] [tiempo_limite_s]"""
+    num_arranques = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    tiempo_limite_s = float(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    print("\n🎲 Multi-arranque Greedy + Hill Climbing - Sistema de Salones ISC")
+    print("="*80)
+
+    # Cargar datos
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    datos_dir = os.path.join(script_dir, "datos_estructurados")
+    df_inicial = pd.read_csv(os.path.join(datos_dir, "01_Horario_Inicial.csv"))
+
+    # Optimizar
+    optimizador = OptimizadorMultiArranque(num_arranques=num_arranques, tiempo_limite_s=tiempo_limite_s,
+                                           semilla=0, max_iter_hc=100)
+    df_resultado, mejor_energia = optimizador.optimizar(df_inicial)
+
+    # Analizar movimientos
+    analizador = AnalizadorMovimientos()
+    comparativa = analizador.comparar_horarios(df_inicial, df_resultado)
+    analizador.generar_reporte(comparativa)
+
+    # Guardar resultado y energías por arranque (muestra para pruebas estadísticas)
+    output_path = os.path.join(datos_dir, "09_Horario_Optimizado_MultiArranque.csv")
+    df_resultado.to_csv(output_path, index=False)
+    print(f"💾 Resultado guardado: {output_path}")
+
+    energias_dir = os.path.join(script_dir, "comparativas", "09_inicial_vs_multiarranque")
+    os.makedirs(energias_dir, exist_ok=True)
+    energias_path = os.path.join(energias_dir, "energias_arranques.csv")
+    optimizador.resultados_df().to_csv(energias_path, index=False)
+    print(f"💾 Energías por arranque: {energias_path}")
+    print(f"⚡ Mejor energía: {mejor_energia:.0f}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,9 +4,15 @@ Utilidades para Restricciones - Sistema de Salones ISC
 Funciones compartidas para manejar configuración de materias y preferencias de profesores
 """
 
+import hashlib
 import json
 import os
-from typing import Dict, Tuple, Optional
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Tuple, Optional
+
+from analizar_movimientos import AnalizadorMovimientos
+from control_ejecucion import huella_horario
 
 def cargar_configuraciones(script_dir: Optional[str] = None) -> Tuple[Dict, Dict]:
     """
@@ -152,6 +158,309 @@ def es_preferencia_prioritaria(profesor: str, tipo_salon: str,
     return prioridad == 'Prioritario'
 
 
+class TablaPreferencias:
+    """
+    Preferencias de profesores compiladas una sola vez a una tabla plana
+    
+    Resuelve las estructuras nueva (por materia) y antigua (por profesor) del
+    JSON con el mismo criterio que obtener_preferencia_profesor y
+    es_preferencia_prioritaria, y las expone:
+    - Como dict: tabla[(profesor, materia o None, tipo)] = (salon o None, prioritaria)
+    - Como arreglos densos salon[profesor_id, columna, tipo_id] / prioritaria[...]
+      para indexar por fila del horario (ver por_fila)
+    
+    Columnas de materia: 0 = sin materia (preferencia general del profesor),
+    1 = materia sin preferencia registrada, 2.. = materias del JSON.
+    """
+    
+    TIPOS = ('Teoría', 'Laboratorio')
+    
+    def __init__(self, preferencias_profesores: Dict):
+        """
+        Args:
+            preferencias_profesores: Diccionario de preferencias (preferencias_profesores.json)
+        """
+        self.profesores = sorted(preferencias_profesores)
+        self.id_profesor = {p: i for i, p in enumerate(self.profesores)}
+        self.materias = sorted({m for prefs in preferencias_profesores.values()
+                                for m in prefs.get('materias', {})})
+        self.id_materia = {m: i for i, m in enumerate(self.materias)}
+        self.salones = []
+        self.id_salon = {}
+        self.tabla = {}
+        self._por_materia = set()
+        
+        # Fila extra (última) para profesores sin preferencias
+        forma = (len(self.profesores) + 1, len(self.materias) + 2, len(self.TIPOS))
+        self.salon = np.full(forma, -1, dtype=np.int16)
+        self.prioritaria = np.zeros(forma, dtype=bool)
+        
+        for profesor, prefs in preferencias_profesores.items():
+            p = self.id_profesor[profesor]
+            if 'materias' in prefs:
+                self._por_materia.add(profesor)
+            for t, tipo in enumerate(self.TIPOS):
+                general = self._entrada(prefs, tipo)
+                self.tabla[(profesor, None, tipo)] = general
+                self._fijar(p, [0], t, general)
+                if profesor in self._por_materia:
+                    for materia, pref_materia in prefs['materias'].items():
+                        entrada = self._entrada(pref_materia, tipo)
+                        self.tabla[(profesor, materia, tipo)] = entrada
+                        self._fijar(p, [self.id_materia[materia] + 2], t, entrada)
+                else:
+                    # Estructura antigua: la preferencia general aplica a cualquier materia
+                    self._fijar(p, slice(1, None), t, general)
+    
+    @staticmethod
+    def _entrada(prefs: Dict, tipo: str) -> Tuple[Optional[str], bool]:
+        """(salón preferido o None, es prioritaria) de un nivel del JSON"""
+        sufijo = 'teoria' if tipo == 'Teoría' else 'lab'
+        salon = prefs.get(f'salon_{sufijo}', 'Sin preferencia')
+        prioridad = prefs.get(f'prioridad_{sufijo}', 'Opcional')
+        return (salon if salon and salon != 'Sin preferencia' else None), prioridad == 'Prioritario'
+    
+    def _fijar(self, p: int, columnas, t: int, entrada: Tuple[Optional[str], bool]):
+        salon, prioritaria = entrada
+        if salon is not None and salon not in self.id_salon:
+            self.id_salon[salon] = len(self.salones)
+            self.salones.append(salon)
+        self.salon[p, columnas, t] = self.id_salon[salon] if salon is not None else -1
+        self.prioritaria[p, columnas, t] = prioritaria
+    
+    def consultar(self, profesor: str, tipo_salon: str, materia: str = None) -> Tuple[Optional[str], bool]:
+        """
+        Preferencia de un profesor (equivale a obtener_preferencia_profesor +
+        es_preferencia_prioritaria con una sola búsqueda en dict)
+        
+        Returns:
+            Tuple[Optional[str], bool]: (salón preferido o None, es prioritaria)
+        """
+        tipo = 'Teoría' if tipo_salon == 'Teoría' else 'Laboratorio'
+        if materia and profesor in self._por_materia:
+            return self.tabla.get((profesor, materia, tipo), (None, False))
+        return self.tabla.get((profesor, None, tipo), (None, False))
+    
+    def ids(self, profesores: Iterable[str], materias: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        IDs de fila/columna de la tabla densa para cada profesor (y materia)
+        
+        Args:
+            profesores: Nombres de profesor
+            materias: Nombres de materia alineados (None = preferencia general)
+        
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (profesor_id, columna de materia)
+        """
+        sin_prefs = len(self.profesores)
+        p = np.array([self.id_profesor.get(prof, sin_prefs) for prof in profesores], dtype=np.intp)
+        if materias is None:
+            return p, np.zeros(len(p), dtype=np.intp)
+        m = np.array([self.id_materia.get(mat, -1) + 2 if mat else 0 for mat in materias], dtype=np.intp)
+        return p, m
+    
+    def por_fila(self, profesores: Iterable[str], requiere_lab: np.ndarray,
+                 materias: Optional[Iterable[str]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Preferencias alineadas por fila del horario
+        
+        Args:
+            profesores: Profesor de cada fila
+            requiere_lab: Máscara booleana de tipo por fila (True = Laboratorio)
+            materias: Materia de cada fila (None = preferencia general del profesor)
+        
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]: (ID en self.salones o -1,
+            es prioritaria, tiene alguna preferencia)
+        """
+        p, m = self.ids(profesores, materias)
+        t = np.asarray(requiere_lab, dtype=np.intp)
+        salon = self.salon[p, m, t]
+        return salon, self.prioritaria[p, m, t], salon >= 0
+
+
+def indices_prioridad_1(df, preferencias_profesores: Dict) -> set:
+    """
+    Índices de las clases de PRIORIDAD 1 de un horario (mismo criterio que
+    pre_asignar_p1.py): profesor + materia + tipo de salón con preferencia
+    'Prioritario' y salón definido
+    
+    Returns:
+        set: Índices (etiquetas de df) de las clases inmutables
+    """
+    indices = set()
+    if not {'Profesor', 'Materia', 'Tipo_Salon'} <= set(df.columns):
+        return indices
+    for profesor, datos in preferencias_profesores.items():
+        for materia, pref in datos.get('materias', {}).items():
+            for tipo, prioridad, salon in (('Teoría', 'prioridad_teoria', 'salon_teoria'),
+                                           ('Laboratorio', 'prioridad_lab', 'salon_lab')):
+                if pref.get(prioridad) == 'Prioritario' and pref.get(salon) != 'Sin preferencia':
+                    mask = (df['Profesor'] == profesor) & (df['Materia'] == materia) & (df['Tipo_Salon'] == tipo)
+                    indices.update(df.index[mask])
+    return indices
+
+
+class Catalogos:
+    """
+    Catálogos de entrada de los optimizadores, cargados y compilados una sola vez
+    
+    Reúne los JSON de configuración (materias, preferencias, grupos de 1er
+    semestre, índices inmutables), la TablaPreferencias compilada y el modelo
+    de distancias. Los optimizadores solo los leen, así que una instancia se
+    puede compartir entre corridas; actualizar() recarga únicamente si algún
+    archivo cambió (fecha de modificación y, si esta cambió, contenido).
+    """
+    
+    ARCHIVOS = {
+        'config_materias': 'configuracion_materias.json',
+        'preferencias_profesores': 'preferencias_profesores.json',
+        'asignacion_grupos_1er': 'asignacion_grupos_1er_semestre.json',
+        'indices_inmutables': os.path.join('datos_estructurados', 'indices_inmutables_p1.json'),
+        # Horario con el que pre_asignar_p1.py generó los índices inmutables
+        'horario_origen': os.path.join('datos_estructurados', '01_Horario_Inicial.csv'),
+    }
+    
+    # Columnas que identifican las clases (pre_asignar_p1.py solo cambia el Salon)
+    COLUMNAS_IDENTIDAD = ['Profesor', 'Grupo', 'Materia', 'Dia', 'Bloque_Horario', 'Tipo_Salon']
+    
+    def __init__(self, script_dir: Optional[str] = None, verbose: bool = True):
+        """
+        Args:
+            script_dir: Carpeta del proyecto (default: la de este módulo)
+            verbose: Mostrar lo cargado
+        """
+        self.script_dir = script_dir or os.path.dirname(os.path.abspath(__file__))
+        self.verbose = verbose
+        self.version = 0              # Aumenta en cada (re)carga
+        self._firmas = {}             # archivo -> ((mtime_ns, tamaño), sha256) o None si no existe
+        self.analizador_mov = AnalizadorMovimientos()
+        self._distancias = {}         # tupla de salones -> matriz de distancias
+        self._cargar()
+    
+    def _log(self, mensaje: str):
+        if self.verbose:
+            print(mensaje)
+    
+    def _ruta(self, nombre: str) -> str:
+        return os.path.join(self.script_dir, self.ARCHIVOS[nombre])
+    
+    def _estado(self, nombre: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, tamaño) del archivo, o None si no existe"""
+        try:
+            st = os.stat(self._ruta(nombre))
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def _huella(self, nombre: str) -> Optional[str]:
+        try:
+            with open(self._ruta(nombre), 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            return None
+    
+    def _firma(self, nombre: str) -> Optional[Tuple]:
+        estado = self._estado(nombre)
+        return None if estado is None else (estado, self._huella(nombre))
+    
+    def _cargar(self):
+        """Lee todos los archivos y compila las tablas derivadas"""
+        # Firmas antes de leer: un cambio durante la carga se detecta en la siguiente revisión
+        self._firmas = {nombre: self._firma(nombre) for nombre in self.ARCHIVOS}
+        self.config_materias, self.preferencias_profesores = cargar_configuraciones(self.script_dir)
+        self.tabla_preferencias = TablaPreferencias(self.preferencias_profesores)
+        
+        self.asignacion_grupos_1er = None
+        if self._firmas['asignacion_grupos_1er'] is not None:
+            try:
+                with open(self._ruta('asignacion_grupos_1er'), 'r', encoding='utf-8') as f:
+                    self.asignacion_grupos_1er = json.load(f)
+                self._log(f"✅ Asignación de grupos 1er semestre cargada: {len(self.asignacion_grupos_1er)} grupos")
+            except Exception as e:
+                self._log(f"⚠️  Error cargando asignación grupos 1er semestre: {e}")
+        
+        self.indices_inmutables = frozenset()
+        if self._firmas['indices_inmutables'] is not None:
+            try:
+                with open(self._ruta('indices_inmutables'), 'r') as f:
+                    self.indices_inmutables = frozenset(json.load(f))
+                self._log(f"✅ Índices inmutables cargados: {len(self.indices_inmutables)} clases")
+            except Exception as e:
+                self._log(f"⚠️  Error cargando índices inmutables: {e}")
+        
+        # Los índices son posiciones de filas: solo valen para el horario del que salieron
+        self._huella_origen = None
+        if self.indices_inmutables and self._firmas['horario_origen'] is not None:
+            try:
+                self._huella_origen = self._huella_identidad(pd.read_csv(self._ruta('horario_origen')))
+            except Exception as e:
+                self._log(f"⚠️  Error leyendo el horario de origen de los índices inmutables: {e}")
+        
+        self.version += 1
+    
+    def actualizar(self) -> bool:
+        """
+        Recarga los catálogos si algún archivo cambió desde la última carga
+        
+        Returns:
+            bool: True si se recargaron
+        """
+        cambiados = []
+        for nombre, firma in self._firmas.items():
+            estado = self._estado(nombre)
+            if (firma and firma[0]) != estado:
+                cambiados.append(nombre)
+        if not cambiados:
+            return False
+        # Fecha distinta pero mismo contenido (p. ej. se volvió a guardar): solo se actualiza la firma
+        nuevas = {nombre: self._firma(nombre) for nombre in cambiados}
+        if all((nuevas[n] and nuevas[n][1]) == (self._firmas[n] and self._firmas[n][1]) for n in cambiados):
+            self._firmas.update(nuevas)
+            return False
+        self._cargar()
+        return True
+    
+    def _huella_identidad(self, df) -> Optional[str]:
+        if not set(self.COLUMNAS_IDENTIDAD) <= set(df.columns):
+            return None
+        return huella_horario(df[self.COLUMNAS_IDENTIDAD])
+    
+    def inmutables_para(self, df) -> frozenset:
+        """
+        Índices inmutables (PRIORIDAD 1) de un horario
+        
+        Los de indices_inmutables_p1.json si `df` es el horario del que se
+        generaron (mismas clases, mismo orden); para cualquier otro horario se
+        derivan de su contenido con indices_prioridad_1.
+        """
+        if self._huella_origen is not None and self._huella_identidad(df) == self._huella_origen:
+            return self.indices_inmutables
+        return frozenset(indices_prioridad_1(df, self.preferencias_profesores))
+    
+    def huella(self) -> str:
+        """Huella del contenido de todos los archivos cargados (cambia si se recargan con otros datos)"""
+        h = hashlib.sha256()
+        for nombre in sorted(self._firmas):
+            firma = self._firmas[nombre]
+            h.update(f"{nombre}={firma[1] if firma else None};".encode())
+        return h.hexdigest()[:32]
+    
+    def distancias(self, salones: Iterable[str]) -> np.ndarray:
+        """
+        Matriz salón × salón de distancias del analizador (solo lectura,
+        calculada una vez por lista de salones)
+        """
+        clave = tuple(salones)
+        matriz = self._distancias.get(clave)
+        if matriz is None:
+            obtener = self.analizador_mov.obtener_distancia
+            matriz = np.array([[obtener(s1, s2) for s2 in clave] for s1 in clave], dtype=np.float64)
+            matriz.setflags(write=False)
+            self._distancias[clave] = matriz
+        return matriz
+
+
 def filtrar_salones_por_tipo(salones_disponibles: list, tipo_requerido: str,
                              salones_teoria: list = None, salones_lab: list = None) -> list:
     """
@@ -250,6 +559,172 @@ def validar_distribucion_teoria_lab(df, config_materias: Dict) -> Dict:
     return stats
 
 
+def emparejamiento_maximo(candidatos: Dict, orden: list = None) -> Dict:
+    """
+    Emparejamiento bipartito máximo clase → salón (caminos aumentantes)
+    
+    Cada clase intenta tomar uno de sus salones candidatos; si está ocupado,
+    intenta reubicar a la clase que lo ocupa en otro de los suyos. Las clases
+    se procesan en `orden` y una clase ya emparejada nunca pierde su salón,
+    solo puede cambiarlo por otro de sus candidatos. Costo O(V·E), sin
+    recursión.
+    
+    Args:
+        candidatos: Dict {clase: [salones permitidos]}
+        orden: Orden de procesamiento de las clases (default: orden del dict)
+    
+    Returns:
+        Dict: {clase: salon} para las clases emparejadas
+    """
+    salon_de = {}
+    clase_en = {}
+    
+    for clase in (candidatos if orden is None else orden):
+        visitados = set()
+        # Pila del camino: [clase, iterador de candidatos, salón elegido]
+        pila = [[clase, iter(candidatos[clase]), None]]
+        while pila:
+            nivel = pila[-1]
+            salon = next((s for s in nivel[1] if s not in visitados), None)
+            if salon is None:
+                pila.pop()
+                continue
+            visitados.add(salon)
+            nivel[2] = salon
+            
+            if salon in clase_en:
+                # Intentar reubicar a la clase que ocupa el salón
+                ocupante = clase_en[salon]
+                pila.append([ocupante, iter(candidatos[ocupante]), None])
+                continue
+            
+            # Camino aumentante: cada clase del camino toma el salón elegido
+            for c, _, s in pila:
+                salon_de[c] = s
+                clase_en[s] = c
+            break
+    
+    return salon_de
+
+
+class IndiceSalonesLibres:
+    """
+    Índice de ocupación por bloque (dia, bloque) con máscaras de bits
+    
+    Cada salón es un bit en la máscara de su bloque (orden fijo: laboratorios
+    y luego teoría, ordenados por nombre) y cada bloque es un bit en la
+    máscara de su salón. Así, ocupar/liberar, "primer salón libre de un tipo"
+    y "bloques donde un salón está libre" son operaciones sobre enteros.
+    """
+    
+    def __init__(self, laboratorios: set, salones_teoria: set, bloques: list = ()):
+        """
+        Args:
+            laboratorios: Salones de laboratorio
+            salones_teoria: Salones de teoría
+            bloques: Bloques (dia, bloque) candidatos para mover clases, en orden de preferencia
+        """
+        self.salones = []
+        self.bit_salon = {}
+        self.bloques = []
+        self.bit_bloque = {}
+        self.ocupados_bloque = []   # por bloque: máscara de salones ocupados
+        self.ocupado_salon = []     # por salón: máscara de bloques ocupados
+        
+        self.mascara_tipo = {'Laboratorio': 0, 'Teoría': 0}
+        for salon in sorted(laboratorios):
+            self.mascara_tipo['Laboratorio'] |= 1 << self._id_salon(salon)
+        for salon in sorted(salones_teoria):
+            self.mascara_tipo['Teoría'] |= 1 << self._id_salon(salon)
+        
+        for dia, bloque in bloques:
+            self._id_bloque(dia, bloque)
+        self.mascara_candidatos = (1 << len(self.bloques)) - 1
+    
+    def _id_salon(self, salon: str) -> int:
+        if salon not in self.bit_salon:
+            self.bit_salon[salon] = len(self.salones)
+            self.salones.append(salon)
+            self.ocupado_salon.append(0)
+        return self.bit_salon[salon]
+    
+    def _id_bloque(self, dia, bloque) -> int:
+        clave = (dia, bloque)
+        if clave not in self.bit_bloque:
+            self.bit_bloque[clave] = len(self.bloques)
+            self.bloques.append(clave)
+            self.ocupados_bloque.append(0)
+        return self.bit_bloque[clave]
+    
+    def _mascara_libres(self, salon: str, excluir: set = None) -> int:
+        libres = self.mascara_candidatos & ~self.ocupado_salon[self._id_salon(salon)]
+        for clave in excluir or ():
+            if clave in self.bit_bloque:
+                libres &= ~(1 << self.bit_bloque[clave])
+        return libres
+    
+    def ocupar(self, dia, bloque, salon: str):
+        """Marca el salón como ocupado en el bloque"""
+        b = self._id_bloque(dia, bloque)
+        s = self._id_salon(salon)
+        self.ocupados_bloque[b] |= 1 << s
+        self.ocupado_salon[s] |= 1 << b
+    
+    def liberar(self, dia, bloque, salon: str):
+        """Marca el salón como libre en el bloque"""
+        b = self._id_bloque(dia, bloque)
+        s = self._id_salon(salon)
+        self.ocupados_bloque[b] &= ~(1 << s)
+        self.ocupado_salon[s] &= ~(1 << b)
+    
+    def primer_libre(self, dia, bloque, tipo: str) -> Optional[str]:
+        """Primer salón libre del tipo ('Teoría' o 'Laboratorio') en el bloque, o None"""
+        libres = self.mascara_tipo[tipo] & ~self.ocupados_bloque[self._id_bloque(dia, bloque)]
+        if not libres:
+            return None
+        return self.salones[(libres & -libres).bit_length() - 1]
+    
+    def salones_del_tipo(self, tipo: str) -> list:
+        """Salones del tipo en el orden del índice"""
+        mascara = self.mascara_tipo[tipo]
+        return [salon for i, salon in enumerate(self.salones) if mascara >> i & 1]
+    
+    def bloques_libres(self, salon: str, excluir: set = None) -> list:
+        """Bloques candidatos (en orden) donde el salón está libre"""
+        libres = self._mascara_libres(salon, excluir)
+        resultado = []
+        while libres:
+            bit = libres & -libres
+            resultado.append(self.bloques[bit.bit_length() - 1])
+            libres ^= bit
+        return resultado
+    
+    def primer_bloque_libre(self, salon: str, excluir: set = None) -> Optional[Tuple]:
+        """Primer bloque candidato donde el salón está libre, o None"""
+        libres = self._mascara_libres(salon, excluir)
+        if not libres:
+            return None
+        return self.bloques[(libres & -libres).bit_length() - 1]
+
+
+def salon_grupo_primer_semestre(grupo: str, asignacion_grupos_1er: Optional[Dict]) -> Optional[str]:
+    """
+    Salón de teoría asignado a un grupo de 1er semestre (asignacion_grupos_1er_semestre.json)
+    
+    Solo aplica a grupos 15xx (1502, 1504, 1561); los 11xx son en línea.
+    El salón depende de la primera letra de la sección ('1502/AA' -> 'A').
+    
+    Returns:
+        Optional[str]: Salón asignado o None si el grupo no tiene uno
+    """
+    if not asignacion_grupos_1er or '15xx' not in asignacion_grupos_1er or '/' not in grupo:
+        return None
+    partes = grupo.split('/')
+    if len(partes) != 2 or not partes[0].startswith('15') or not partes[1]:
+        return None
+    return asignacion_grupos_1er['15xx'].get(partes[1][0])
+
+
 def pre_asignar_prioritarias(df, config_materias: Dict, preferencias_profesores: Dict,
                              laboratorios: set, salones_teoria: set, asignacion_grupos_1er: Dict = None) -> Tuple[Dict, Dict, list]:
     """
@@ -261,7 +736,8 @@ def pre_asignar_prioritarias(df, config_materias: Dict, preferencias_profesores:
     Estrategia:
     - Mantener día/hora original del CSV cuando sea posible
     - Aplicar restricciones en orden de prioridad
-    - Resolver conflictos recursivamente moviendo clases en cadena
+    - Resolver cada bloque (dia, bloque) como emparejamiento bipartito
+      clases → salones; solo las clases que no caben se mueven de bloque
     - Si es necesario, mover clases a otros días/horas
     
     Args:
@@ -276,155 +752,30 @@ def pre_asignar_prioritarias(df, config_materias: Dict, preferencias_profesores:
         Tuple[Dict, Dict, list]: (solucion, ocupacion, indices_restantes)
     """
     
+    tabla_preferencias = TablaPreferencias(preferencias_profesores)
+    
+    # Bloques donde se puede mover una clase prioritaria (en orden de preferencia)
+    dias = ['Lunes', 'Martes', 'Miercoles', 'Jueves', 'Viernes']
+    bloques = [710, 809, 910, 1011, 1112, 1213, 1314, 1415, 1516, 1617]
+    indice = IndiceSalonesLibres(laboratorios, salones_teoria, [(d, b) for d in dias for b in bloques])
+    
+    def ocupar(dia, bloque, salon, idx, ocupacion):
+        """Registra la clase en el salón (dict de ocupación + índice de libres)"""
+        ocupacion[(dia, bloque, salon)] = idx
+        indice.ocupar(dia, bloque, salon)
+    
+    def liberar(dia, bloque, salon, ocupacion):
+        """Libera el salón en el bloque (dict de ocupación + índice de libres)"""
+        del ocupacion[(dia, bloque, salon)]
+        indice.liberar(dia, bloque, salon)
+    
     def buscar_salon_libre(dia, bloque, tipo_req, ocupacion):
         """Busca un salón libre del tipo requerido"""
-        if tipo_req == 'Laboratorio':
-            candidatos = laboratorios
-        else:
-            candidatos = salones_teoria
-        
-        for salon in candidatos:
-            if (dia, bloque, salon) not in ocupacion:
-                return salon
-        return None
+        return indice.primer_libre(dia, bloque, 'Laboratorio' if tipo_req == 'Laboratorio' else 'Teoría')
     
     def buscar_bloque_alternativo(salon_prioritario, tipo_req, ocupacion, excluir_bloques=None):
         """Busca un bloque horario donde el salón prioritario esté libre"""
-        if excluir_bloques is None:
-            excluir_bloques = set()
-        
-        dias = ['Lunes', 'Martes', 'Miercoles', 'Jueves', 'Viernes']
-        bloques = [710, 809, 910, 1011, 1112, 1213, 1314, 1415, 1516, 1617]
-        
-        for dia in dias:
-            for bloque in bloques:
-                if (dia, bloque) not in excluir_bloques:
-                    if (dia, bloque, salon_prioritario) not in ocupacion:
-                        return (dia, bloque)
-        return None
-    
-    def resolver_conflicto_recursivo(idx_nueva, salon_prioritario, dia, bloque, tipo_req,
-                                     solucion, ocupacion, clases_prioritarias_dict, profundidad=0):
-        """
-        Resuelve conflictos recursivamente con GARANTÍA de éxito
-        """
-        MAX_PROFUNDIDAD = 50
-        
-        if profundidad > MAX_PROFUNDIDAD:
-            return False
-        
-        # Caso 1: Salón libre → asignar directamente
-        if (dia, bloque, salon_prioritario) not in ocupacion:
-            solucion[idx_nueva] = salon_prioritario
-            ocupacion[(dia, bloque, salon_prioritario)] = idx_nueva
-            return True
-        
-        # Caso 2: Salón ocupado → resolver conflicto
-        idx_conflicto = ocupacion[(dia, bloque, salon_prioritario)]
-        
-        # Verificar si la clase conflictiva es prioritaria para este salón
-        clase_conflicto = clases_prioritarias_dict.get(idx_conflicto)
-        
-        if clase_conflicto and clase_conflicto['salon_prioritario'] == salon_prioritario:
-            # AMBAS clases son prioritarias para el MISMO salón en el MISMO bloque
-            # Solución: Mover la clase NUEVA a otro bloque donde el salón esté libre
-            bloque_alt = buscar_bloque_alternativo(salon_prioritario, tipo_req, ocupacion, {(dia, bloque)})
-            
-            if bloque_alt:
-                dia_alt, bloque_alt_num = bloque_alt
-                solucion[idx_nueva] = salon_prioritario
-                ocupacion[(dia_alt, bloque_alt_num, salon_prioritario)] = idx_nueva
-                # Actualizar el DataFrame para reflejar el nuevo horario
-                df.at[idx_nueva, 'Dia'] = dia_alt
-                df.at[idx_nueva, 'Bloque_Horario'] = bloque_alt_num
-                return True
-            else:
-                # No hay bloques alternativos disponibles
-                return False
-        else:
-            # La clase conflictiva NO es prioritaria para este salón
-            # Mover la clase conflictiva a otro salón del mismo tipo
-            tipo_conflicto = 'Laboratorio' if solucion.get(idx_conflicto, '') in laboratorios else tipo_req
-            salon_alternativo = buscar_salon_libre(dia, bloque, tipo_conflicto, ocupacion)
-            
-            if salon_alternativo:
-                # Mover clase conflictiva
-                del ocupacion[(dia, bloque, salon_prioritario)]
-                solucion[idx_conflicto] = salon_alternativo
-                ocupacion[(dia, bloque, salon_alternativo)] = idx_conflicto
-                
-                # Asignar clase nueva al salón prioritario
-                solucion[idx_nueva] = salon_prioritario
-                ocupacion[(dia, bloque, salon_prioritario)] = idx_nueva
-                return True
-            else:
-                # No hay salón alternativo directo
-                # ESTRATEGIA MEJORADA: Intentar múltiples opciones de desplazamiento
-                
-                # Opción 1: Buscar en TODOS los salones para hacer cadena de movimientos
-                if tipo_conflicto == 'Laboratorio':
-                    candidatos = list(laboratorios)
-                else:
-                    candidatos = list(salones_teoria)
-                
-                # Intentar cada salón como candidato para la clase conflictiva
-                for salon_candidato in candidatos:
-                    if salon_candidato == salon_prioritario:
-                        continue
-                        
-                    # Caso A: Salón candidato está libre
-                    if (dia, bloque, salon_candidato) not in ocupacion:
-                        # Mover clase conflictiva al salón libre
-                        del ocupacion[(dia, bloque, salon_prioritario)]
-                        solucion[idx_conflicto] = salon_candidato
-                        ocupacion[(dia, bloque, salon_candidato)] = idx_conflicto
-                        
-                        # Asignar clase nueva al salón prioritario
-                        solucion[idx_nueva] = salon_prioritario
-                        ocupacion[(dia, bloque, salon_prioritario)] = idx_nueva
-                        return True
-                    
-                    # Caso B: Salón candidato está ocupado - intentar cadena
-                    else:
-                        idx_temp = ocupacion[(dia, bloque, salon_candidato)]
-                        if idx_temp != idx_conflicto and idx_temp != idx_nueva:
-                            # Verificar si la clase temporal NO es prioritaria
-                            clase_temp = clases_prioritarias_dict.get(idx_temp)
-                            if clase_temp and clase_temp['salon_prioritario'] == salon_candidato:
-                                # La clase temporal ES prioritaria para este salón, saltar
-                                continue
-                            
-                            # Intentar mover la clase temporal a otro salón
-                            salon_temp_anterior = solucion.get(idx_temp)
-                            tipo_temp = 'Laboratorio' if salon_temp_anterior in laboratorios else tipo_conflicto
-                            
-                            # Buscar salón libre para la clase temporal
-                            for salon_para_temp in (laboratorios if tipo_temp == 'Laboratorio' else salones_teoria):
-                                if (dia, bloque, salon_para_temp) not in ocupacion:
-                                    # Cadena exitosa: temp → salon_para_temp, conflicto → salon_candidato, nueva → prioritario
-                                    del ocupacion[(dia, bloque, salon_candidato)]
-                                    solucion[idx_temp] = salon_para_temp
-                                    ocupacion[(dia, bloque, salon_para_temp)] = idx_temp
-                                    
-                                    del ocupacion[(dia, bloque, salon_prioritario)]
-                                    solucion[idx_conflicto] = salon_candidato
-                                    ocupacion[(dia, bloque, salon_candidato)] = idx_conflicto
-                                    
-                                    solucion[idx_nueva] = salon_prioritario
-                                    ocupacion[(dia, bloque, salon_prioritario)] = idx_nueva
-                                    return True
-                
-                # Opción 2: Si nada funcionó, mover la clase NUEVA a otro bloque (última opción)
-                bloque_alt = buscar_bloque_alternativo(salon_prioritario, tipo_req, ocupacion, {(dia, bloque)})
-                if bloque_alt:
-                    dia_alt, bloque_alt_num = bloque_alt
-                    solucion[idx_nueva] = salon_prioritario
-                    ocupacion[(dia_alt, bloque_alt_num, salon_prioritario)] = idx_nueva
-                    df.at[idx_nueva, 'Dia'] = dia_alt
-                    df.at[idx_nueva, 'Bloque_Horario'] = bloque_alt_num
-                    return True
-                
-                return False
+        return indice.primer_bloque_libre(salon_prioritario, excluir_bloques)
     
     # ===== INICIO DE LA FUNCIÓN PRINCIPAL =====
     
@@ -432,7 +783,6 @@ def pre_asignar_prioritarias(df, config_materias: Dict, preferencias_profesores:
     ocupacion = {}
     clases_prioritarias = []
     clases_normales = []
-    clases_prioritarias_dict = {}
     
     # Rastrear horas asignadas por materia
     horas_asignadas = {}
@@ -453,8 +803,7 @@ def pre_asignar_prioritarias(df, config_materias: Dict, preferencias_profesores:
         horas_asignadas[key] = indice_hora + 1
         
         # Verificar preferencia prioritaria
-        es_prioritaria = es_preferencia_prioritaria(profesor, tipo_req, preferencias_profesores, materia)
-        pref_salon = obtener_preferencia_profesor(profesor, tipo_req, preferencias_profesores, materia)
+        pref_salon, es_prioritaria = tabla_preferencias.consultar(profesor, tipo_req, materia)
         
         if es_prioritaria and pref_salon:
             clase_info = {
@@ -466,7 +815,6 @@ def pre_asignar_prioritarias(df, config_materias: Dict, preferencias_profesores:
                 'profesor': profesor
             }
             clases_prioritarias.append(clase_info)
-            clases_prioritarias_dict[idx] = clase_info
         else:
             clases_normales.append(idx)
     
@@ -478,65 +826,59 @@ def pre_asignar_prioritarias(df, config_materias: Dict, preferencias_profesores:
     
     clases_ordenadas = sorted(clases_prioritarias, key=lambda c: -contador[c['profesor']])
     
-    # Fase 3: Asignar con resolución recursiva COMPLETA
+    # Fase 3: Resolver cada bloque (dia, bloque) como emparejamiento bipartito
+    # Cada clase prioritaria solo puede ocupar su salón prioritario; las que no
+    # quedan emparejadas son el conjunto mínimo que debe cambiar de bloque
+    por_bloque = {}
+    for clase in clases_ordenadas:
+        por_bloque.setdefault((clase['dia_original'], clase['bloque_original']), []).append(clase)
+    
     asignaciones_exitosas = 0
     asignaciones_fallidas = []
+    pendientes = set()
     
+    for (dia, bloque), clases in por_bloque.items():
+        candidatos = {clase['idx']: [clase['salon_prioritario']] for clase in clases}
+        emparejadas = emparejamiento_maximo(candidatos)
+        
+        for clase in clases:
+            idx = clase['idx']
+            if idx in emparejadas:
+                solucion[idx] = emparejadas[idx]
+                ocupar(dia, bloque, emparejadas[idx], idx, ocupacion)
+                asignaciones_exitosas += 1
+            else:
+                pendientes.add(idx)
+    
+    # Fase 4: Mover las clases no emparejadas a un bloque donde su salón esté libre
     for clase in clases_ordenadas:
         idx = clase['idx']
+        if idx not in pendientes:
+            continue
+        
         salon_prioritario = clase['salon_prioritario']
         dia = clase['dia_original']
         bloque = clase['bloque_original']
         tipo_req = clase['tipo']
         
-        exito = resolver_conflicto_recursivo(
-            idx, salon_prioritario, dia, bloque, tipo_req,
-            solucion, ocupacion, clases_prioritarias_dict
-        )
-        
-        if exito:
+        bloque_alt = buscar_bloque_alternativo(salon_prioritario, tipo_req, ocupacion, {(dia, bloque)})
+        if bloque_alt:
+            dia_alt, bloque_alt_num = bloque_alt
+            solucion[idx] = salon_prioritario
+            ocupar(dia_alt, bloque_alt_num, salon_prioritario, idx, ocupacion)
+            # Actualizar el DataFrame para reflejar el nuevo horario
+            df.at[idx, 'Dia'] = dia_alt
+            df.at[idx, 'Bloque_Horario'] = bloque_alt_num
             asignaciones_exitosas += 1
         else:
+            # Último recurso: salón libre del tipo requerido en el bloque original
             asignaciones_fallidas.append(clase)
-            # Último recurso: FORZAR desplazamiento
             salon_alt = buscar_salon_libre(dia, bloque, tipo_req, ocupacion)
             if salon_alt:
                 solucion[idx] = salon_alt
-                ocupacion[(dia, bloque, salon_alt)] = idx
+                ocupar(dia, bloque, salon_alt, idx, ocupacion)
             else:
-                # No hay salón libre - FORZAR desplazamiento de clase no prioritaria
-                if (dia, bloque, salon_prioritario) in ocupacion:
-                    idx_conflicto = ocupacion[(dia, bloque, salon_prioritario)]
-                    # Verificar que la clase conflictiva NO sea prioritaria
-                    if idx_conflicto not in clases_prioritarias_dict:
-                        # Mover la clase conflictiva a CUALQUIER salón disponible
-                        tipo_conflicto = 'Teoría'  # Asumimos teoría por defecto
-                        for salon_temp in salones_teoria:
-                            if (dia, bloque, salon_temp) not in ocupacion:
-                                # Mover clase conflictiva
-                                del ocupacion[(dia, bloque, salon_prioritario)]
-                                solucion[idx_conflicto] = salon_temp
-                                ocupacion[(dia, bloque, salon_temp)] = idx_conflicto
-                                
-                                # Asignar clase prioritaria
-                                solucion[idx] = salon_prioritario
-                                ocupacion[(dia, bloque, salon_prioritario)] = idx
-                                asignaciones_exitosas += 1
-                                asignaciones_fallidas.remove(clase)
-                                break
-                        else:
-                            # Si no se pudo mover, asignar a salón libre cualquiera
-                            solucion[idx] = salon_alt if salon_alt else salon_prioritario
-                    else:
-                        # La clase conflictiva ES prioritaria - asignar a salón alternativo
-                        solucion[idx] = salon_alt if salon_alt else salon_prioritario
-                else:
-                    # El salón está libre, asignar directamente
-                    solucion[idx] = salon_prioritario
-                    ocupacion[(dia, bloque, salon_prioritario)] = idx
-                    asignaciones_exitosas += 1
-                    asignaciones_fallidas.remove(clase)
-    
+                solucion[idx] = salon_prioritario
     
     if asignaciones_fallidas:
         print(f"⚠️  {len(asignaciones_fallidas)} clases prioritarias tuvieron conflictos irresolvibles")
@@ -564,7 +906,7 @@ def pre_asignar_prioritarias(df, config_materias: Dict, preferencias_profesores:
                 # Verificar disponibilidad
                 if (dia, bloque, lab_asignado) not in ocupacion:
                     solucion[idx] = lab_asignado
-                    ocupacion[(dia, bloque, lab_asignado)] = idx
+                    ocupar(dia, bloque, lab_asignado, idx, ocupacion)
                     clases_normales.remove(idx)
     
     # PRIORIDAD 3: Grupos de 1er semestre (MENOR PRIORIDAD)
@@ -582,23 +924,13 @@ def pre_asignar_prioritarias(df, config_materias: Dict, preferencias_profesores:
             tipo_salon = row['Tipo_Salon']
             
             # Solo procesar si es teoría y grupo de 1er semestre 15xx
-            if tipo_salon == 'Teoría' and '/' in grupo:
-                partes = grupo.split('/')
-                if len(partes) == 2:
-                    clave = partes[0]
-                    letra = partes[1]
-                    letra_base = letra[0] if letra else ''
-                    
-                    # Solo grupos 15xx
-                    if clave.startswith('15'):
-                        if letra_base in asignacion_grupos_1er['15xx']:
-                            salon_asignado = asignacion_grupos_1er['15xx'][letra_base]
-                            
-                            # Verificar disponibilidad
-                            if (dia, bloque, salon_asignado) not in ocupacion:
-                                solucion[idx] = salon_asignado
-                                ocupacion[(dia, bloque, salon_asignado)] = idx
-                                clases_normales.remove(idx)
+            salon_asignado = salon_grupo_primer_semestre(grupo, asignacion_grupos_1er)
+            if tipo_salon == 'Teoría' and salon_asignado:
+                # Verificar disponibilidad
+                if (dia, bloque, salon_asignado) not in ocupacion:
+                    solucion[idx] = salon_asignado
+                    ocupar(dia, bloque, salon_asignado, idx, ocupacion)
+                    clases_normales.remove(idx)
     
     return solucion, ocupacion, clases_normales
 
@@ -18,6 +18,9 @@ app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB max
 app.config['UPLOAD_FOLDER'] = 'uploads'
 app.config['OUTPUT_FOLDER'] = 'outputs'
 app.config['SECRET_KEY'] = 'isc-salones-2024'
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 0)) or None  # None = mitad de los núcleos
+app.config['JOB_QUEUE_MAX'] = int(os.environ.get('JOB_QUEUE_MAX', 20))
+app.config['EVENTS_MAX_STREAMS'] = int(os.environ.get('EVENTS_MAX_STREAMS', 4))  # < hilos del servidor
 
 # Crear carpetas si no existen
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -45,12 +48,24 @@ def results():
     return render_template('results.html')
 
 # Importar rutas
-from routes import upload, optimize, history
+from routes import upload, optimize, history, jobs
+from services.job_queue import JobQueue
+
+# Cola de optimizaciones en segundo plano (pool de procesos compartido)
+app.extensions['job_queue'] = JobQueue(app.config['JOB_WORKERS'], app.config['JOB_QUEUE_MAX'])
+
+from models.database import Database
+
+@app.teardown_appcontext
+def close_database(exc):
+    """Cierra la conexión SQLite del hilo al terminar cada petición"""
+    Database().close()
 
 # Registrar blueprints
 app.register_blueprint(upload.bp)
 app.register_blueprint(optimize.bp)
 app.register_blueprint(history.bp)
+app.register_blueprint(jobs.bp)
 
 if __name__ == '__main__':
     print("\n" + "="*60)
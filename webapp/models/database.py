@@ -4,18 +4,74 @@ Database - Gestión de historial con SQLite
 
 import sqlite3
 import json
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+
+# Estado de un trabajo: queued -> running -> done | error
+JOB_COLUMNS = {
+    'status': "TEXT NOT NULL DEFAULT 'done'",
+    'progress': 'REAL NOT NULL DEFAULT 1.0',
+    'error': 'TEXT',
+    'params': 'TEXT',
+    'last_event': 'TEXT',
+    'budget_exhausted': 'INTEGER',
+    'total_rows': 'INTEGER',
+    'cache_hit': 'INTEGER',
+    'started_at': 'DATETIME',
+    'finished_at': 'DATETIME',
+}
+
+JOB_ACTIVE_STATES = ('queued', 'running')
+
+# Conexiones por hilo (y por proceso: cada proceso importa su propio módulo)
+_local = threading.local()
+_init_lock = threading.Lock()
+_initialized = set()
+
 
 class Database:
     def __init__(self):
         self.db_path = Path(__file__).parent.parent / 'optimizations.db'
-        self.init_database()
+        # El esquema se revisa una vez por proceso, no en cada petición
+        with _init_lock:
+            if self.db_path not in _initialized:
+                self.init_database()
+                _initialized.add(self.db_path)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Conexión del hilo actual (se abre una vez y se reutiliza)
+        
+        En modo autocommit: cada sentencia es su propia transacción, así una
+        conexión reutilizada nunca queda con una transacción abierta. WAL permite
+        leer el historial mientras los trabajos escriben.
+        """
+        conexiones = getattr(_local, 'conexiones', None)
+        if conexiones is None:
+            conexiones = _local.conexiones = {}
+        conn = conexiones.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode = WAL')
+            conn.execute('PRAGMA synchronous = NORMAL')
+            conexiones[self.db_path] = conn
+        return conn
+    
+    def close(self):
+        """
+        Cierra la conexión del hilo actual (al terminar cada petición, cada stream
+        y cada trabajo del pool; la siguiente operación abre una nueva)
+        """
+        conexiones = getattr(_local, 'conexiones', None)
+        conn = conexiones.pop(self.db_path, None) if conexiones else None
+        if conn is not None:
+            conn.close()
     
     def init_database(self):
         """Inicializa la base de datos"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Tabla de optimizaciones
@@ -43,13 +99,49 @@ class Database:
             )
         ''')
         
-        conn.commit()
-        conn.close()
+        # Caché de resultados: huella de la entrada -> CSV optimizado y métricas
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS result_cache (
+                fingerprint TEXT PRIMARY KEY,
+                method TEXT NOT NULL,
+                output_path TEXT NOT NULL,
+                result TEXT NOT NULL,
+                hits INTEGER DEFAULT 0,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                last_used DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Columnas de trabajos en segundo plano (bases creadas antes de la cola de trabajos)
+        existentes = {fila[1] for fila in cursor.execute('PRAGMA table_info(optimizations)')}
+        for columna, definicion in JOB_COLUMNS.items():
+            if columna not in existentes:
+                cursor.execute(f'ALTER TABLE optimizations ADD COLUMN {columna} {definicion}')
+        
+        # Contadores de la caché de resultados (una fila; se lee sin recorrer el historial).
+        # Al crearla se inicializa con los trabajos ya registrados
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cache_stats (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute('''
+            INSERT OR IGNORE INTO cache_stats (id, hits, misses)
+            SELECT 1, COALESCE(SUM(cache_hit = 1), 0), COALESCE(SUM(cache_hit = 0), 0)
+            FROM optimizations
+        ''')
+        
+        # Índices del historial (orden por fecha, filtro por método) y de los mapeos
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_optimizations_timestamp ON optimizations (timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_optimizations_method ON optimizations (method, timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_column_mappings_pattern ON column_mappings (filename_pattern)')
     
     def save_optimization(self, filename: str, method: str, metrics: Dict, 
                          input_path: str, output_path: str, elapsed_time: float) -> int:
         """Guarda una optimización en el historial"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -58,41 +150,60 @@ class Database:
         ''', (filename, method, json.dumps(metrics), input_path, output_path, elapsed_time))
         
         opt_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
         
         return opt_id
     
-    def get_all_optimizations(self, limit: int = 50) -> List[Dict]:
-        """Obtiene todas las optimizaciones"""
-        conn = sqlite3.connect(self.db_path)
+    def get_all_optimizations(self, limit: int = 50, before: Optional[Tuple[str, int]] = None,
+                              method: Optional[str] = None, include_metrics: bool = True) -> List[Dict]:
+        """
+        Obtiene optimizaciones terminadas, de la más reciente a la más antigua
+        
+        Args:
+            limit: Máximo de optimizaciones
+            before: (timestamp, id) de la última optimización de la página anterior
+                    (paginación por llave: usa el índice, sin OFFSET)
+            method: Solo las de este método
+            include_metrics: Incluir las métricas (el JSON solo se lee si se piden)
+        """
+        conn = self._connect()
         cursor = conn.cursor()
         
-        cursor.execute('''
-            SELECT id, timestamp, filename, method, metrics, elapsed_time
+        condiciones = ["status = 'done'"]
+        parametros = []
+        if method is not None:
+            condiciones.append('method = ?')
+            parametros.append(method)
+        if before is not None:
+            condiciones.append('(timestamp, id) < (?, ?)')
+            parametros.extend(before)
+        
+        cursor.execute(f'''
+            SELECT id, timestamp, filename, method, elapsed_time{', metrics' if include_metrics else ''}
             FROM optimizations
-            ORDER BY timestamp DESC
+            WHERE {' AND '.join(condiciones)}
+            ORDER BY timestamp DESC, id DESC
             LIMIT ?
-        ''', (limit,))
+        ''', (*parametros, limit))
         
         rows = cursor.fetchall()
-        conn.close()
         
-        return [
-            {
+        history = []
+        for row in rows:
+            opt = {
                 'id': row[0],
                 'timestamp': row[1],
                 'filename': row[2],
                 'method': row[3],
-                'metrics': json.loads(row[4]),
-                'elapsed_time': row[5]
+                'elapsed_time': row[4]
             }
-            for row in rows
-        ]
+            if include_metrics:
+                opt['metrics'] = json.loads(row[5])
+            history.append(opt)
+        return history
     
     def get_optimization(self, opt_id: int) -> Optional[Dict]:
         """Obtiene una optimización específica"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -102,7 +213,6 @@ class Database:
         ''', (opt_id,))
         
         row = cursor.fetchone()
-        conn.close()
         
         if not row:
             return None
@@ -118,9 +228,165 @@ class Database:
             'elapsed_time': row[7]
         }
     
+    def create_job(self, filename: str, method: str, input_path: str, params: Dict) -> int:
+        """Registra un trabajo en cola y devuelve su ID (el mismo de la optimización)"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            INSERT INTO optimizations (filename, method, metrics, input_path, status, progress, params)
+            VALUES (?, ?, '{}', ?, 'queued', 0.0, ?)
+        ''', (filename, method, input_path, json.dumps(params)))
+        
+        job_id = cursor.lastrowid
+        
+        return job_id
+    
+    def start_job(self, job_id: int):
+        """Marca un trabajo como en ejecución"""
+        conn = self._connect()
+        conn.execute('''
+            UPDATE optimizations SET status = 'running', started_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (job_id,))
+    
+    def update_job_progress(self, job_id: int, progress: Optional[float], event: Dict):
+        """Guarda el último evento de progreso de un trabajo en ejecución"""
+        conn = self._connect()
+        conn.execute('''
+            UPDATE optimizations SET progress = COALESCE(?, progress), last_event = ?
+            WHERE id = ? AND status = 'running'
+        ''', (progress, json.dumps(event), job_id))
+    
+    def finish_job(self, job_id: int, result: Dict):
+        """Guarda el resultado de un trabajo terminado (y cuenta el acierto/fallo de caché)"""
+        hit = bool(result.get('cache', {}).get('hit', False))
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('''
+                UPDATE optimizations
+                SET status = 'done', progress = 1.0, metrics = ?, output_path = ?, elapsed_time = ?,
+                    budget_exhausted = ?, total_rows = ?, cache_hit = ?, finished_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+            ''', (json.dumps(result['metrics']), result['output_path'], result['elapsed_time'],
+                  int(result['budget_exhausted']), result['total_rows'], int(hit), job_id))
+            conn.execute(f'''
+                UPDATE cache_stats SET {'hits = hits' if hit else 'misses = misses'} + 1 WHERE id = 1
+            ''')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+    
+    def fail_job(self, job_id: int, error: str):
+        """Marca un trabajo como fallido"""
+        conn = self._connect()
+        conn.execute('''
+            UPDATE optimizations SET status = 'error', error = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', (error, job_id))
+    
+    def fail_unfinished_jobs(self, error: str) -> int:
+        """Marca como fallidos los trabajos que quedaron en cola o en ejecución (reinicio del servidor)"""
+        conn = self._connect()
+        cursor = conn.execute(f'''
+            UPDATE optimizations SET status = 'error', error = ?, finished_at = CURRENT_TIMESTAMP
+            WHERE status IN ({', '.join('?' * len(JOB_ACTIVE_STATES))})
+        ''', (error, *JOB_ACTIVE_STATES))
+        afectados = cursor.rowcount
+        
+        return afectados
+    
+    def get_job(self, job_id: int) -> Optional[Dict]:
+        """Obtiene estado, progreso y (si terminó) resultado de un trabajo"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, timestamp, filename, method, status, progress, error, metrics, output_path,
+                   elapsed_time, budget_exhausted, total_rows, started_at, finished_at, last_event,
+                   cache_hit
+            FROM optimizations
+            WHERE id = ?
+        ''', (job_id,))
+        
+        row = cursor.fetchone()
+        if row and row[4] == 'done':
+            cursor.execute('SELECT hits, misses FROM cache_stats WHERE id = 1')
+            hits, misses = cursor.fetchone() or (0, 0)
+        
+        if not row:
+            return None
+        
+        job = {
+            'id': row[0],
+            'timestamp': row[1],
+            'filename': row[2],
+            'method': row[3],
+            'status': row[4],
+            'progress': row[5],
+            'error': row[6],
+            'started_at': row[12],
+            'finished_at': row[13],
+            'event': json.loads(row[14]) if row[14] else None
+        }
+        if row[4] == 'done':
+            job['result'] = {
+                'id': row[0],
+                'method': row[3],
+                'metrics': json.loads(row[7]),
+                'output_path': row[8],
+                'elapsed_time': row[9],
+                'budget_exhausted': bool(row[10]),
+                'total_rows': row[11],
+                'cache': {
+                    'hit': None if row[15] is None else bool(row[15]),
+                    'hits': hits,
+                    'misses': misses
+                }
+            }
+        return job
+    
+    def get_cached_result(self, fingerprint: str) -> Optional[Dict]:
+        """Resultado guardado para una huella (cuenta el acierto), o None"""
+        conn = self._connect()
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT output_path, result FROM result_cache
+            WHERE fingerprint = ?
+        ''', (fingerprint,))
+        
+        row = cursor.fetchone()
+        if row:
+            cursor.execute('''
+                UPDATE result_cache SET hits = hits + 1, last_used = CURRENT_TIMESTAMP
+                WHERE fingerprint = ?
+            ''', (fingerprint,))
+        
+        if not row:
+            return None
+        return dict(json.loads(row[1]), output_path=row[0])
+    
+    def save_cached_result(self, fingerprint: str, method: str, output_path: str, result: Dict):
+        """Guarda (o reemplaza) el resultado de una huella"""
+        conn = self._connect()
+        conn.execute('''
+            INSERT OR REPLACE INTO result_cache (fingerprint, method, output_path, result)
+            VALUES (?, ?, ?, ?)
+        ''', (fingerprint, method, output_path, json.dumps(result)))
+    
+    def delete_cached_results(self, output_paths: List[str]):
+        """Olvida los resultados cuyos CSV se eliminaron"""
+        if not output_paths:
+            return
+        conn = self._connect()
+        conn.executemany('DELETE FROM result_cache WHERE output_path = ?', [(p,) for p in output_paths])
+    
     def save_column_mapping(self, filename_pattern: str, mapping: Dict):
         """Guarda un mapeo de columnas"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         # Verificar si ya existe
@@ -144,13 +410,10 @@ class Database:
                 INSERT INTO column_mappings (filename_pattern, mapping)
                 VALUES (?, ?)
             ''', (filename_pattern, json.dumps(mapping)))
-        
-        conn.commit()
-        conn.close()
     
     def get_column_mapping(self, filename_pattern: str) -> Optional[Dict]:
         """Obtiene un mapeo de columnas guardado"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         cursor.execute('''
@@ -161,7 +424,6 @@ class Database:
         ''', (filename_pattern,))
         
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             return json.loads(row[0])
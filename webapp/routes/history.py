@@ -12,16 +12,45 @@ from models.database import Database
 
 bp = Blueprint('history', __name__, url_prefix='/api')
 
+# Tamaño de página del historial (por defecto y máximo)
+HISTORY_LIMIT = 50
+HISTORY_MAX_LIMIT = 200
+
 @bp.route('/history', methods=['GET'])
 def get_history():
-    """Obtiene historial de optimizaciones"""
+    """
+    Obtiene historial de optimizaciones (paginado por llave)
+    Query: limit (50, máx. 200), cursor (next_cursor de la página anterior),
+           method, metrics=1 para incluir las métricas
+    """
     try:
+        limit = request.args.get('limit', HISTORY_LIMIT, type=int)
+        if limit is None or limit < 1:
+            return jsonify({'error': 'limit debe ser un entero positivo'}), 400
+        limit = min(limit, HISTORY_MAX_LIMIT)
+        
+        before = None
+        cursor = request.args.get('cursor')
+        if cursor:
+            timestamp, _, opt_id = cursor.rpartition('|')
+            if not timestamp or not opt_id.isdigit():
+                return jsonify({'error': 'cursor inválido'}), 400
+            before = (timestamp, int(opt_id))
+        
+        include_metrics = request.args.get('metrics', '0').lower() in ('1', 'true')
+        
         db = Database()
-        history = db.get_all_optimizations()
+        history = db.get_all_optimizations(limit, before, request.args.get('method'), include_metrics)
+        
+        # Llave de la siguiente página (None si esta fue la última)
+        next_cursor = None
+        if len(history) == limit:
+            next_cursor = f"{history[-1]['timestamp']}|{history[-1]['id']}"
         
         return jsonify({
             'success': True,
-            'history': history
+            'history': history,
+            'next_cursor': next_cursor
         })
     
     except Exception as e:
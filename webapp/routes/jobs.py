@@ -0,0 +1,116 @@
+"""
+Jobs route - Estado de las optimizaciones en segundo plano
+"""
+
+from flask import Blueprint, Response, current_app, jsonify
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Agregar path para importar modelos
+sys.path.append(str(Path(__file__).parent.parent))
+from models.database import Database
+
+bp = Blueprint('jobs', __name__, url_prefix='/api')
+
+# Frecuencia con la que el stream revisa el trabajo y con la que manda keep-alive
+EVENTS_POLL_S = 0.5
+EVENTS_KEEPALIVE_S = 15.0
+
+# Streams abiertos: cada uno ocupa un hilo del servidor mientras dura el trabajo
+_streams_lock = threading.Lock()
+_open_streams = 0
+
+def _acquire_stream() -> bool:
+    """Reserva un lugar para un stream (False si ya se alcanzó EVENTS_MAX_STREAMS)"""
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= current_app.config['EVENTS_MAX_STREAMS']:
+            return False
+        _open_streams += 1
+        return True
+
+def _release_stream():
+    global _open_streams
+    with _streams_lock:
+        _open_streams -= 1
+
+def _sse(event: str, data) -> str:
+    """Formatea un mensaje Server-Sent Events"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@bp.route('/jobs/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    Estado de un trabajo: queued | running | done | error
+    Incluye progreso (0-1), error si falló y el resultado cuando terminó
+    """
+    try:
+        job = Database().get_job(job_id)
+        
+        if not job:
+            return jsonify({'error': 'Trabajo no encontrado'}), 404
+        
+        return jsonify({
+            'success': True,
+            'job': job
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@bp.route('/jobs/<int:job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """
+    Stream Server-Sent Events del trabajo
+    
+    - `progress`: estado, progreso (0-1) y último evento del optimizador
+      (fase, iteración, mejor energía/fitness, penalizaciones, tiempo)
+    - `done` (con el resultado) o `error`, y el stream se cierra
+    
+    Con EVENTS_MAX_STREAMS streams abiertos responde 503 (el cliente sigue el
+    trabajo consultando GET /api/jobs/<id>), así los streams nunca ocupan
+    todos los hilos del servidor.
+    """
+    db = Database()
+    if not db.get_job(job_id):
+        return jsonify({'error': 'Trabajo no encontrado'}), 404
+    if not _acquire_stream():
+        return jsonify({'error': 'Demasiados streams abiertos; consulta el estado del trabajo'}), 503
+    
+    def stream():
+        last = None
+        last_sent = time.time()
+        try:
+            while True:
+                job = db.get_job(job_id)
+                if job is None:
+                    yield _sse('error', {'error': 'Trabajo no encontrado'})
+                    return
+                if job['status'] in ('done', 'error'):
+                    yield _sse(job['status'], job)
+                    return
+                
+                snapshot = (job['status'], job['progress'], job['event'])
+                if snapshot != last:
+                    last = snapshot
+                    last_sent = time.time()
+                    yield _sse('progress', job)
+                elif time.time() - last_sent >= EVENTS_KEEPALIVE_S:
+                    last_sent = time.time()
+                    yield ": keep-alive\n\n"
+                
+                time.sleep(EVENTS_POLL_S)
+        finally:
+            # El stream se consume después del teardown de la petición
+            db.close()
+    
+    response = Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # sin buffer en proxies (nginx)
+    })
+    # Se libera al cerrar la respuesta, aunque el stream no llegue a iniciarse
+    response.call_on_close(_release_stream)
+    return response
@@ -1,26 +1,31 @@
 """
-Optimize route - Ejecuta optimización de horarios
+Optimize route - Encola optimizaciones de horarios
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, url_for
+import os
 import sys
 from pathlib import Path
 
 # Agregar path para importar servicios
 sys.path.append(str(Path(__file__).parent.parent))
-from services.optimizer_service import OptimizerService
+from services.optimizer_service import METHODS
+from services.job_queue import QueueFullError
 
 bp = Blueprint('optimize', __name__, url_prefix='/api')
 
 @bp.route('/optimize', methods=['POST'])
 def optimize():
     """
-    Endpoint para optimizar horario
+    Endpoint para optimizar horario (en segundo plano)
     Body: {
         filepath: str,
-        method: 'greedy'|'ml'|'genetic',
-        column_mapping: dict
+        method: 'greedy'|'ml'|'genetic'|'sa'|'tabu',
+        column_mapping: dict,
+        time_budget_s: float (opcional; devuelve lo mejor encontrado al agotarse)
     }
+    Retorna 202 con el ID del trabajo; el estado se consulta en GET /api/jobs/<id>
+    o se sigue en vivo con GET /api/jobs/<id>/events (SSE)
     """
     try:
         data = request.get_json()
@@ -28,18 +33,34 @@ def optimize():
         filepath = data.get('filepath')
         method = data.get('method', 'greedy')
         column_mapping = data.get('column_mapping', {})
+        time_budget_s = data.get('time_budget_s')
         
         if not filepath:
             return jsonify({'error': 'Falta filepath'}), 400
+        if not os.path.isfile(filepath):
+            return jsonify({'error': f'No existe el archivo: {filepath}'}), 400
+        if method not in METHODS:
+            return jsonify({'error': f'Método desconocido: {method}'}), 400
+        if time_budget_s is not None:
+            try:
+                time_budget_s = float(time_budget_s)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'time_budget_s debe ser numérico'}), 400
+            if time_budget_s <= 0:
+                return jsonify({'error': 'time_budget_s debe ser positivo'}), 400
         
-        # Ejecutar optimización
-        optimizer = OptimizerService(filepath, column_mapping)
-        result = optimizer.optimize(method)
+        # Encolar optimización (se ejecuta en el pool de procesos)
+        job_id = current_app.extensions['job_queue'].submit(filepath, column_mapping, method, time_budget_s)
         
         return jsonify({
             'success': True,
-            'result': result
-        })
+            'job_id': job_id,
+            'status': 'queued',
+            'status_url': url_for('jobs.get_job', job_id=job_id),
+            'events_url': url_for('jobs.job_events', job_id=job_id)
+        }), 202
     
+    except QueueFullError as e:
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -0,0 +1,184 @@
+"""
+Job Queue - Optimizaciones en segundo plano
+
+Las optimizaciones son CPU-bound (un genético tarda más de un minuto), así que
+se ejecutan en un pool acotado de procesos fuera del ciclo de peticiones de
+Flask. El estado de cada trabajo vive en la tabla `optimizations` de SQLite:
+cualquier proceso del servidor puede consultarlo con GET /api/jobs/<id>.
+"""
+
+import multiprocessing as mp
+import os
+import sys
+import threading
+import traceback
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Optional
+
+# Agregar path para importar servicios y modelos
+sys.path.append(str(Path(__file__).parent.parent))
+from models.database import Database
+
+
+# Tramo del progreso total (0-1) que ocupa cada fase de los optimizadores
+PHASE_SPANS = {
+    'construccion': (0.0, 0.1),
+    'hill_climbing': (0.1, 1.0),
+    'recocido': (0.1, 1.0),
+    'tabu': (0.1, 1.0),
+    'evolucion': (0.0, 1.0),
+    'entrenamiento': (0.0, 0.5),
+    'asignacion': (0.5, 1.0),
+}
+
+
+class QueueFullError(Exception):
+    """No se aceptan más trabajos hasta que termine alguno"""
+
+
+def job_progress(event: Dict) -> Optional[float]:
+    """Progreso total del trabajo a partir del progreso de la fase del evento"""
+    if event.get('progreso') is None or event.get('fase') not in PHASE_SPANS:
+        return None
+    inicio, fin = PHASE_SPANS[event['fase']]
+    return round(inicio + (fin - inicio) * event['progreso'], 4)
+
+
+def _run_job(job_id: int, filepath: str, column_mapping: Dict, method: str,
+             time_budget_s: Optional[float]):
+    """
+    Ejecuta un trabajo dentro de un proceso del pool
+
+    El resultado (o el error) y los eventos de progreso (ya limitados en
+    frecuencia por el optimizador) se escriben directo en la base de datos.
+    """
+    # Ya importado por _init_worker al iniciar el proceso
+    from services.optimizer_service import OptimizerService
+
+    db = Database()
+    try:
+        db.start_job(job_id)
+
+        def progress_callback(event: Dict):
+            db.update_job_progress(job_id, job_progress(event), event)
+
+        try:
+            result = OptimizerService(filepath, column_mapping).optimize(method, time_budget_s, progress_callback)
+        except Exception as e:
+            db.fail_job(job_id, str(e))
+            return
+        db.finish_job(job_id, result)
+    finally:
+        # Los procesos del pool viven entre trabajos: no dejar la conexión abierta
+        db.close()
+
+
+def _init_worker():
+    """Inicializa un proceso del pool: importa los optimizadores y carga los catálogos"""
+    from services.optimizer_registry import warm_up
+    warm_up()
+
+
+class JobQueue:
+    """
+    Cola acotada de optimizaciones
+
+    - `max_workers` procesos ejecutan trabajos en paralelo (contexto 'spawn':
+      no se hace fork de un servidor con hilos)
+    - A lo más `max_pending` trabajos en cola o en ejecución; el resto se
+      rechaza con QueueFullError
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: int = 20):
+        """
+        Args:
+            max_workers: Procesos del pool (None = la mitad de los núcleos, mínimo 1)
+            max_pending: Trabajos aceptados sin terminar (en cola + en ejecución)
+        """
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) // 2)
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.RLock()  # cancelar futuros ejecuta callbacks con el candado tomado
+        self._stale_checked = False
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Crea el pool en el primer trabajo (o de nuevo si un proceso murió)"""
+        if not self._stale_checked:
+            # Trabajos de una ejecución anterior del servidor que nunca terminarán.
+            # (No en __init__: con 'spawn' cada proceso del pool reimporta app.py)
+            db = Database()
+            db.fail_unfinished_jobs('El servidor se reinició antes de terminar el trabajo')
+            db.close()
+            self._stale_checked = True
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=mp.get_context('spawn'),
+                                                 initializer=_init_worker)
+        return self._executor
+
+    def submit(self, filepath: str, column_mapping: Dict, method: str,
+               time_budget_s: Optional[float] = None) -> int:
+        """
+        Registra y encola un trabajo
+
+        Returns:
+            int: ID del trabajo (el mismo de la optimización en el historial)
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise QueueFullError(f'Hay {self._pending} optimizaciones pendientes; intenta más tarde')
+            self._pending += 1
+
+        params = {'column_mapping': column_mapping, 'time_budget_s': time_budget_s}
+        try:
+            with self._lock:
+                self._get_executor()
+            job_id = Database().create_job(Path(filepath).name, method, filepath, params)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        try:
+            with self._lock:
+                future = self._get_executor().submit(
+                    _run_job, job_id, filepath, column_mapping, method, time_budget_s)
+        except Exception as e:
+            self._job_done(job_id, e)
+            raise
+        future.add_done_callback(lambda f: self._job_done(job_id, self._future_error(f)))
+        return job_id
+
+    @staticmethod
+    def _future_error(future: Future) -> Optional[BaseException]:
+        """Excepción con la que terminó el proceso (no la del optimizador, que ya quedó en la base)"""
+        if future.cancelled():
+            return RuntimeError('Trabajo cancelado al detener el servidor')
+        return future.exception()
+
+    def _job_done(self, job_id: int, error: Optional[BaseException]):
+        """Libera el lugar del trabajo; si el proceso falló, registra el error"""
+        with self._lock:
+            self._pending -= 1
+            if isinstance(error, BrokenProcessPool):
+                # Un proceso murió (p. ej. sin memoria): el pool queda inutilizable
+                if self._executor is not None:
+                    self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+        if error is not None:
+            db = Database()
+            db.fail_job(job_id, ''.join(traceback.format_exception_only(type(error), error)).strip())
+            db.close()
+
+    def pending(self) -> int:
+        """Trabajos aceptados que aún no terminan"""
+        return self._pending
+
+    def shutdown(self):
+        """Detiene el pool (los trabajos en cola se cancelan)"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,83 @@
+"""
+Optimizer Registry - Catálogos precargados por proceso
+
+Cada optimizador lee al construirse los JSON de configuración (materias,
+preferencias, grupos de 1er semestre, índices inmutables) y compila sus tablas.
+El registro los carga una vez por proceso (al iniciar cada proceso del pool de
+trabajos) y entrega a cada corrida una instancia ligera del optimizador que los
+comparte. Si algún archivo cambia (fecha de modificación y contenido), se
+recargan antes de la siguiente corrida.
+"""
+
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+# Agregar path para importar optimizadores
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+
+from utils_restricciones import Catalogos
+from optimizador_greedy import OptimizadorGreedyHC
+from optimizador_ml import OptimizadorML
+from optimizador_genetico import OptimizadorGenetico
+from optimizador_busqueda_local import OptimizadorSA, OptimizadorTabu
+
+# Clase y parámetros de cada método (los parámetros forman parte de la huella de la caché de resultados)
+METHOD_CLASSES = {
+    'greedy': OptimizadorGreedyHC,
+    'ml': OptimizadorML,
+    'genetic': OptimizadorGenetico,
+    'sa': OptimizadorSA,
+    'tabu': OptimizadorTabu,
+}
+METHOD_PARAMS = {
+    'greedy': {'max_iter_hc': 100},
+}
+
+
+class OptimizerRegistry:
+    """Catálogos compartidos y fábrica de optimizadores por corrida"""
+
+    def __init__(self):
+        self._catalogos: Optional[Catalogos] = None
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def catalogs(self) -> Catalogos:
+        """Catálogos vigentes (los carga la primera vez y recarga si cambió algún archivo)"""
+        with self._lock:
+            if self._catalogos is None:
+                self._catalogos = Catalogos(verbose=False)
+            elif self._catalogos.actualizar():
+                self.reloads += 1
+            return self._catalogos
+
+    def create(self, method: str, **control):
+        """
+        Instancia de optimizador para una corrida
+
+        Args:
+            method: 'greedy', 'ml', 'genetic', 'sa', 'tabu'
+            **control: Presupuesto de tiempo y progreso (tiempo_limite_s,
+                       fecha_limite, progreso, ...)
+        """
+        if method not in METHOD_CLASSES:
+            raise ValueError(f"Método desconocido: {method}")
+        return METHOD_CLASSES[method](verbose=False, catalogos=self.catalogs(),
+                                      **self.params(method), **control)
+
+    @staticmethod
+    def params(method: str) -> Dict:
+        """Parámetros con los que se construye el optimizador del método"""
+        return dict(METHOD_PARAMS.get(method, {}))
+
+
+# Registro del proceso (cada proceso del pool tiene el suyo)
+registry = OptimizerRegistry()
+
+
+def warm_up():
+    """Carga los catálogos de antemano (inicializador de los procesos del pool)"""
+    registry.catalogs()
@@ -5,18 +5,20 @@ Optimizer Service - Integración con optimizadores
 import pandas as pd
 import sys
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Optional
 import time
 import json
+import os
 
 # Agregar path para importar optimizadores
 project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
-from optimizador_greedy import OptimizadorGreedyHC
-from optimizador_ml import OptimizadorML
-from optimizador_genetico import OptimizadorGenetico
-from analizar_movimientos import AnalizadorMovimientos
+from services.optimizer_registry import registry
+from services.result_cache import ResultCache
+
+# Métodos aceptados por OptimizerService.optimize
+METHODS = ('greedy', 'ml', 'genetic', 'sa', 'tabu')
 
 class OptimizerService:
     def __init__(self, filepath: str, column_mapping: Dict):
@@ -71,55 +73,63 @@ class OptimizerService:
         else:
             return 'Teoría'
     
-    def optimize(self, method: str = 'greedy') -> Dict:
+    def optimize(self, method: str = 'greedy', time_budget_s: Optional[float] = None,
+                 progress_callback: Optional[Callable[[Dict], None]] = None) -> Dict:
         """
         Ejecuta optimización con el método seleccionado
         
         Args:
-            method: 'greedy', 'ml', 'genetic'
+            method: 'greedy', 'ml', 'genetic', 'sa', 'tabu'
+            time_budget_s: Presupuesto de tiempo en segundos (None = sin límite);
+                           al agotarse se devuelve la mejor solución encontrada
+            progress_callback: Recibe los eventos de progreso del optimizador
+                               (fase, iteración, mejor energía/fitness, penalizaciones)
         
         Returns:
-            Dict con resultados
+            Dict con resultados (`cache.hit` indica si se reutilizó un resultado guardado)
         """
         try:
             # Normalizar datos
             df_inicial = self.normalize_data()
             
-            # Guardar temporalmente
-            temp_path = Path(self.filepath).parent / 'temp_normalized.csv'
-            df_inicial.to_csv(temp_path, index=False)
-            
-            # Medir tiempo
+            # Misma entrada, método y restricciones que una corrida anterior: reutilizar su resultado
             start_time = time.time()
+            output_dir = Path(self.filepath).parent.parent / 'outputs'
+            cache = ResultCache(output_dir)
+            fingerprint = cache.fingerprint(df_inicial, self.column_mapping, method)
+            cached = cache.get(fingerprint)
+            if cached is not None:
+                return {
+                    'method': method,
+                    'elapsed_time': round(time.time() - start_time, 2),
+                    'budget_exhausted': False,
+                    'metrics': cached['metrics'],
+                    'output_path': cached['output_path'],
+                    'total_rows': cached['total_rows'],
+                    'cache': {'hit': True, 'fingerprint': fingerprint,
+                              'original_elapsed_time': cached['elapsed_time']}
+                }
+            
+            # Medir tiempo (el límite cubre todo, incluido el entrenamiento de ML)
+            control = {'fecha_limite': start_time + time_budget_s} if time_budget_s else {}
+            if progress_callback is not None:
+                control['progreso'] = progress_callback
             
             # Ejecutar optimización según método
-            if method == 'greedy':
-                optimizador = OptimizadorGreedyHC(max_iter_hc=100, verbose=False)
+            # (instancia por corrida sobre los catálogos precargados del proceso)
+            optimizador = registry.create(method, **control)
+            if method in ('greedy', 'sa', 'tabu'):
                 mejor_solucion, _ = optimizador.optimizar(df_inicial)
                 
-                # Aplicar solución
-                df_optimizado = df_inicial.copy()
-                df_optimizado['Salon'] = df_optimizado.index.map(mejor_solucion)
-                
-                # Actualizar columnas
-                for idx in df_optimizado.index:
-                    salon = df_optimizado.loc[idx, 'Salon']
-                    df_optimizado.loc[idx, 'Es_Invalido'] = 1 if salon in optimizador.salones_invalidos else 0
-                    if salon in optimizador.laboratorios:
-                        df_optimizado.loc[idx, 'Tipo_Salon'] = 'Laboratorio'
-                    elif salon in optimizador.salones_teoria:
-                        df_optimizado.loc[idx, 'Tipo_Salon'] = 'Teoría'
+                # Aplicar solución (actualiza Salon, Es_Invalido, Tipo_Salon y Piso)
+                df_optimizado = optimizador.aplicar_solucion(df_inicial, mejor_solucion)
             
             elif method == 'ml':
-                optimizador = OptimizadorML(verbose=False)
-                df_optimizado = optimizador.optimizar(str(temp_path))
-            
-            elif method == 'genetic':
-                optimizador = OptimizadorGenetico(verbose=False)
-                df_optimizado = optimizador.optimizar(str(temp_path))
+                optimizador.entrenar(df_inicial)  # Reutiliza el modelo en caché si las entradas no cambiaron
+                df_optimizado = optimizador.optimizar(df_inicial)
             
             else:
-                raise ValueError(f"Método desconocido: {method}")
+                df_optimizado = optimizador.evolucionar(df_inicial)
             
             elapsed_time = time.time() - start_time
             
@@ -127,29 +137,34 @@ class OptimizerService:
             metricas = self._calcular_metricas(df_inicial, df_optimizado)
             
             # Guardar resultado
-            output_path = Path(self.filepath).parent.parent / 'outputs' / f'optimizado_{method}_{int(time.time())}.csv'
+            output_path = output_dir / f'optimizado_{method}_{int(time.time())}_{os.getpid()}.csv'
             df_optimizado.to_csv(output_path, index=False)
             
-            # Limpiar temporal
-            if temp_path.exists():
-                temp_path.unlink()
-            
             self.df_optimizado = df_optimizado
             
-            return {
+            result = {
                 'method': method,
                 'elapsed_time': round(elapsed_time, 2),
+                'budget_exhausted': optimizador.interrumpido,
                 'metrics': metricas,
                 'output_path': str(output_path),
-                'total_rows': len(df_optimizado)
+                'total_rows': len(df_optimizado),
+                'cache': {'hit': False, 'fingerprint': fingerprint}
             }
+            
+            # Solo se guardan corridas completas (una cortada por tiempo depende del presupuesto)
+            if not optimizador.interrumpido:
+                cache.put(fingerprint, method, result)
+            cache.evict(keep=str(output_path))
+            
+            return result
         
         except Exception as e:
             raise Exception(f"Error en optimización: {str(e)}")
     
     def _calcular_metricas(self, df_inicial: pd.DataFrame, df_optimizado: pd.DataFrame) -> Dict:
         """Calcula métricas de mejora"""
-        analizador = AnalizadorMovimientos()
+        analizador = registry.catalogs().analizador_mov
         
         metricas_inicial = analizador.analizar_todos_profesores(df_inicial)
         metricas_optimizado = analizador.analizar_todos_profesores(df_optimizado)
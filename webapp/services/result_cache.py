@@ -0,0 +1,104 @@
+"""
+Result Cache - Resultados de optimización direccionados por contenido
+
+La huella de una corrida combina los datos normalizados, el mapeo de columnas,
+el método, sus parámetros y el contenido de los JSON de restricciones. Si ya
+hay un resultado con esa huella se devuelve su CSV y sus métricas sin volver a
+optimizar. Los CSV de outputs/ se desalojan por antigüedad de uso (LRU: la
+fecha de modificación del archivo se actualiza en cada acierto) cuando la
+carpeta supera el número de archivos o el tamaño configurados.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+import pandas as pd
+
+# Agregar path para importar optimizadores y modelos
+project_root = Path(__file__).parent.parent.parent
+sys.path.append(str(project_root))
+sys.path.append(str(Path(__file__).parent.parent))
+
+from control_ejecucion import huella_horario
+from models.database import Database
+from services.optimizer_registry import registry
+
+# Versión del formato de la huella (cambiarla invalida los resultados guardados)
+CACHE_VERSION = 1
+
+# Límites de outputs/ (configurables por entorno)
+MAX_FILES = int(os.environ.get('RESULT_CACHE_MAX_FILES', 200))
+MAX_BYTES = int(os.environ.get('RESULT_CACHE_MAX_MB', 200)) * 1024 * 1024
+
+
+class ResultCache:
+    """Índice de resultados (tabla result_cache) sobre los CSV de una carpeta de outputs"""
+
+    def __init__(self, output_dir: Path, max_files: int = MAX_FILES, max_bytes: int = MAX_BYTES):
+        """
+        Args:
+            output_dir: Carpeta de los CSV optimizados
+            max_files: Archivos que se conservan en la carpeta
+            max_bytes: Tamaño total que se conserva en la carpeta
+        """
+        self.output_dir = Path(output_dir)
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.db = Database()
+
+    @staticmethod
+    def fingerprint(df: pd.DataFrame, column_mapping: Dict, method: str) -> str:
+        """Huella de una corrida: entrada normalizada, mapeo, método, parámetros y restricciones"""
+        return huella_horario(
+            df, CACHE_VERSION, method, sorted(column_mapping.items(), key=str),
+            sorted(registry.params(method).items()), registry.catalogs().huella()
+        )
+
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        """Resultado guardado, o None si no hay o su CSV ya no existe"""
+        result = self.db.get_cached_result(fingerprint)
+        if result is None:
+            return None
+        try:
+            os.utime(result['output_path'])  # Reloj LRU del desalojo
+        except OSError:
+            self.db.delete_cached_results([result['output_path']])
+            return None
+        return result
+
+    def put(self, fingerprint: str, method: str, result: Dict):
+        """Guarda un resultado (métricas y filas; el CSV ya está en output_path)"""
+        stored = {k: result[k] for k in ('metrics', 'total_rows', 'elapsed_time')}
+        self.db.save_cached_result(fingerprint, method, result['output_path'], stored)
+
+    def evict(self, keep: Optional[str] = None):
+        """
+        Elimina los CSV usados hace más tiempo hasta respetar los límites
+
+        Args:
+            keep: CSV que nunca se elimina (el de la corrida actual)
+        """
+        archivos = []
+        for path in self.output_dir.glob('*.csv'):
+            try:
+                st = path.stat()
+            except OSError:
+                continue  # Lo eliminó otro proceso
+            archivos.append((st.st_mtime, st.st_size, path))
+        archivos.sort()
+
+        total = sum(size for _, size, _ in archivos)
+        restantes = len(archivos)
+        eliminados = []
+        for _, size, path in archivos:
+            if restantes <= self.max_files and total <= self.max_bytes:
+                break
+            if keep is not None and path == Path(keep):
+                continue
+            path.unlink(missing_ok=True)
+            eliminados.append(str(path))
+            total -= size
+            restantes -= 1
+        self.db.delete_cached_results(eliminados)
@@ -1,6 +1,7 @@
 // App.js - Main JavaScript Logic
 
 let currentFile = null;
+let currentFilepath = null;
 let currentMapping = null;
 let selectedMethod = 'greedy';
 
@@ -92,6 +93,7 @@ async function handleFile(file) {
         if (response.data.success) {
             showDetectionResult(response.data.detection);
             currentMapping = response.data.detection.mapping;
+            currentFilepath = response.data.filepath;
         }
     } catch (error) {
         alert('Error al subir archivo: ' + (error.response?.data?.error || error.message));
@@ -170,14 +172,15 @@ async function startOptimization() {
     
     try {
         const response = await axios.post('/api/optimize', {
-            filepath: currentFile.name,
+            filepath: currentFilepath,
             method: selectedMethod,
             column_mapping: currentMapping
         });
         
         if (response.data.success) {
-            // Redirect to results
-            window.location.href = '/results?id=' + response.data.result.id;
+            // The optimization runs in the background: follow it until it finishes
+            const job = await followJob(response.data.events_url, response.data.status_url);
+            window.location.href = '/results?id=' + job.id;
         }
     } catch (error) {
         alert('Error en optimización: ' + (error.response?.data?.error || error.message));
@@ -186,10 +189,76 @@ async function startOptimization() {
     }
 }
 
+// Follow a background job through Server-Sent Events (falls back to polling)
+function followJob(eventsUrl, statusUrl) {
+    if (!window.EventSource) {
+        return waitForJob(statusUrl);
+    }
+    
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(eventsUrl);
+        
+        source.addEventListener('progress', e => showJobProgress(JSON.parse(e.data)));
+        source.addEventListener('done', e => {
+            source.close();
+            resolve(JSON.parse(e.data));
+        });
+        source.addEventListener('error', e => {
+            source.close();
+            if (e.data) {
+                reject(new Error(JSON.parse(e.data).error || 'La optimización falló'));
+            } else {
+                // Connection lost: keep following the job by polling
+                waitForJob(statusUrl).then(resolve, reject);
+            }
+        });
+    });
+}
+
+// Poll a background job until it is done (throws if it fails)
+async function waitForJob(statusUrl, intervalMs = 1000) {
+    while (true) {
+        const response = await axios.get(statusUrl);
+        const job = response.data.job;
+        
+        if (job.status === 'done') {
+            return job;
+        }
+        if (job.status === 'error') {
+            throw new Error(job.error || 'La optimización falló');
+        }
+        
+        showJobProgress(job);
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}
+
+// Show job status, progress and the optimizer's best value so far
+function showJobProgress(job) {
+    const text = document.getElementById('progressText');
+    if (job.status !== 'running') {
+        text.textContent = 'En cola...';
+        return;
+    }
+    
+    let message = `Optimizando (${Math.round((job.progress || 0) * 100)}%)`;
+    const event = job.event;
+    if (event) {
+        message += ` - ${event.fase}`;
+        if (event.energia !== undefined) {
+            message += ` | Energía: ${Math.round(event.energia)}`;
+        } else if (event.fitness !== undefined) {
+            message += ` | Fitness: ${Math.round(event.fitness)}`;
+        }
+        message += ` | ${event.transcurrido_s.toFixed(1)}s`;
+    }
+    text.textContent = message;
+}
+
 // Load History
 async function loadHistory() {
     try {
-        const response = await axios.get('/api/history');
+        const response = await axios.get('/api/history', { params: { limit: 5, metrics: 1 } });
         
         if (response.data.success && response.data.history.length > 0) {
             let html = '';